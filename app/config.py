@@ -66,8 +66,95 @@ class Settings:
         "VIV.PA":   {"ticker": "VIV.PA",   "name": "Vivendi",                 "alternate_ticker": "VIVHY"},
         "WLN.PA":   {"ticker": "WLN.PA",   "name": "Worldline",               "alternate_ticker": "WRDLY"},
     }
+    # Tickers scraped concurrently per news provider, still bounded by each provider's rate limiter
+    SCRAPER_MAX_WORKERS: int = int(os.getenv("SCRAPER_MAX_WORKERS", "8"))
+    # Reddit is searched with combined multireddit (a+b+c) queries OR-ing several company names
+    REDDIT_BATCHED_SEARCH: bool = os.getenv("REDDIT_BATCHED_SEARCH", "true").lower() == "true"
+    REDDIT_SUBREDDITS_PER_QUERY: int = int(os.getenv("REDDIT_SUBREDDITS_PER_QUERY", "30"))
+    REDDIT_QUERY_MAX_CHARS: int = int(os.getenv("REDDIT_QUERY_MAX_CHARS", "480"))
+    # Posts fetched per combined search (Reddit listings stop at 1000)
+    REDDIT_SEARCH_LIMIT: int = int(os.getenv("REDDIT_SEARCH_LIMIT", "1000"))
+    # Results NewsAPI serves per query across all pages (100 on the developer plan); past it,
+    # a ticker's remaining (older) articles are paged through with an earlier "to" bound
+    NEWSAPI_MAX_RESULTS: int = int(os.getenv("NEWSAPI_MAX_RESULTS", "100"))
+    # Company metadata is fetched in parallel and cached per ticker on disk for this long
+    METADATA_CACHE_TTL_HOURS: float = float(os.getenv("METADATA_CACHE_TTL_HOURS", "168"))
+    METADATA_MAX_WORKERS: int = int(os.getenv("METADATA_MAX_WORKERS", "8"))
+    # Rolling correlation windows (in observations) written by populate_correlation; 0 is the expanding window
+    CORRELATION_WINDOWS: str = os.getenv("CORRELATION_WINDOWS", "0,30,90")
+    # Observations buffered beyond the largest window, so revisions of recent days (re-scored
+    # sentiment, a refreshed last bar) are refolded without rereading a ticker's history
+    CORRELATION_REVISION_OBSERVATIONS: int = int(os.getenv("CORRELATION_REVISION_OBSERVATIONS", "30"))
+    # Background jobs run by the /database and /inference endpoints; jobs of one kind never overlap
+    JOB_MAX_WORKERS: int = int(os.getenv("JOB_MAX_WORKERS", "2"))
+    JOB_HISTORY_SIZE: int = int(os.getenv("JOB_HISTORY_SIZE", "200"))
+    # Incremental news ingestion re-requests this many hours before each (medium, ticker) watermark, for late arrivals
+    INGESTION_OVERLAP_HOURS: float = float(os.getenv("INGESTION_OVERLAP_HOURS", "6"))
+    # Retries for transient provider errors (connection errors, timeouts, 429, 5xx), with jittered exponential backoff
+    HTTP_MAX_RETRIES: int = int(os.getenv("HTTP_MAX_RETRIES", "4"))
+    HTTP_BACKOFF_BASE: float = float(os.getenv("HTTP_BACKOFF_BASE", "1.0"))
+    HTTP_BACKOFF_MAX: float = float(os.getenv("HTTP_BACKOFF_MAX", "30.0"))
+    # Upper bound on a server-sent Retry-After, in seconds
+    HTTP_RETRY_AFTER_MAX: float = float(os.getenv("HTTP_RETRY_AFTER_MAX", "120.0"))
+
     CACHE_DIR = os.getenv("CACHE_DIR", None)
     FINANCE_MODEL = "ProsusAI/finbert" 
 
+    # Batched inference: texts are bucketed by token length, a bucket is closed
+    # once it reaches NLP_MAX_BATCH_SIZE texts or NLP_MAX_BATCH_TOKENS padded tokens
+    NLP_MAX_BATCH_SIZE: int = int(os.getenv("NLP_MAX_BATCH_SIZE", "32"))
+    NLP_MAX_BATCH_TOKENS: int = int(os.getenv("NLP_MAX_BATCH_TOKENS", "8192"))
+    # Comma-separated model kinds (semantic, sentiment, keyword) to load at startup,
+    # empty to load every model lazily on first use
+    NLP_WARMUP_MODELS: str = os.getenv("NLP_WARMUP_MODELS", "")
+    # Articles fetched, scored and bulk-written per step of the news inference pipeline
+    NLP_PIPELINE_CHUNK_SIZE: int = int(os.getenv("NLP_PIPELINE_CHUNK_SIZE", "256"))
+
+    # Load FinBERT and MiniLM with dynamically quantized INT8 Linear layers (CPU only).
+    # Compare both modes first with `python -m app.scripts.evaluate_quantization`
+    NLP_QUANTIZE_INT8: bool = os.getenv("NLP_QUANTIZE_INT8", "false").lower() == "true"
+
+    # Long-document sentiment: score overlapping 512-token windows instead of truncating.
+    # Consecutive windows start SENTIMENT_WINDOW_STRIDE tokens apart
+    SENTIMENT_CHUNKING: bool = os.getenv("SENTIMENT_CHUNKING", "true").lower() == "true"
+    SENTIMENT_WINDOW_STRIDE: int = int(os.getenv("SENTIMENT_WINDOW_STRIDE", "384"))
+    SENTIMENT_MAX_WINDOWS: int = int(os.getenv("SENTIMENT_MAX_WINDOWS", "16"))
+
+    # Keyword backend: "extractive" (n-grams ranked against the MiniLM document embedding)
+    # or "bart" (BART-large generation, slower and sampled)
+    KEYWORD_BACKEND: str = os.getenv("KEYWORD_BACKEND", "extractive")
+
+    # Relevance gate: articles whose embedding is less similar than RELEVANCE_THRESHOLD to
+    # their company's embedding skip FinBERT and keyword extraction and are either tagged
+    # (RELEVANCE_ACTION="tag") or reduced to a tombstone without content or embedding
+    # (RELEVANCE_ACTION="drop"), which keeps the ingestion key so they are not scraped again
+    RELEVANCE_GATE_ENABLED: bool = os.getenv("RELEVANCE_GATE_ENABLED", "true").lower() == "true"
+    RELEVANCE_THRESHOLD: float = float(os.getenv("RELEVANCE_THRESHOLD", "0.15"))
+    RELEVANCE_ACTION: str = os.getenv("RELEVANCE_ACTION", "tag")
+
+    # Near-duplicate detection at ingestion: estimated Jaccard similarity of title+content
+    # word shingles above which an article is linked to an existing canonical one
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+    DEDUP_MAX_CANDIDATES: int = int(os.getenv("DEDUP_MAX_CANDIDATES", "50"))
+
+    # Local state (indexes, caches, rate-limit buckets) lives under CACHE_DIR, or ./state
+    STATE_DIR: str = os.getenv("STATE_DIR", CACHE_DIR or "state")
+
+    # Memory-mapped embedding indexes behind the /search endpoints
+    VECTOR_INDEX_DIR: str = os.getenv("VECTOR_INDEX_DIR", os.path.join(STATE_DIR, "vector_index"))
+    # Sync the indexes in a background job when the API starts
+    VECTOR_INDEX_SYNC_ON_STARTUP: bool = os.getenv("VECTOR_INDEX_SYNC_ON_STARTUP", "true").lower() == "true"
+
+    # SQLite file holding the API rate-limit token buckets, shared by all workers
+    RATE_LIMIT_DB: str = os.getenv("RATE_LIMIT_DB", os.path.join(STATE_DIR, "rate_limits.db"))
+
+    # Content-hash cache of model outputs (sentiment, embeddings, keywords)
+    INFERENCE_CACHE_ENABLED: bool = os.getenv("INFERENCE_CACHE_ENABLED", "true").lower() == "true"
+    INFERENCE_CACHE_PATH: str = os.getenv("INFERENCE_CACHE_PATH", os.path.join(STATE_DIR, "inference_cache.db"))
+    INFERENCE_CACHE_MAX_ENTRIES: int = int(os.getenv("INFERENCE_CACHE_MAX_ENTRIES", "500000"))
+
+    # Per-ticker JSON files caching yfinance company metadata
+    METADATA_CACHE_DIR: str = os.getenv("METADATA_CACHE_DIR", os.path.join(STATE_DIR, "metadata_cache"))
+
 
 settings = Settings()
\ No newline at end of file
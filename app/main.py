@@ -1,12 +1,32 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import database_router, metadata_router, prices_router, nlp_router, news_router, sentiment_router, correlation_router
+from app.config import settings
+from app.routers import database_router, metadata_router, prices_router, nlp_router, news_router, sentiment_router, correlation_router, search_router, jobs_router
 import uvicorn
 import logging
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Inference models are loaded lazily; NLP_WARMUP_MODELS preloads them on inference workers
+    warmup_kinds = [kind.strip() for kind in settings.NLP_WARMUP_MODELS.split(",") if kind.strip()]
+    if warmup_kinds:
+        from app.services.nlp_tasks import NLPTasks
+        loaded = NLPTasks.warm_up(warmup_kinds)
+        logging.info(f"Warmed up NLP models: {loaded}")
+    from app.services.jobs import get_job_manager
+    if settings.VECTOR_INDEX_SYNC_ON_STARTUP:
+        # Catch the search indexes up in the background instead of in the first search request
+        from app.services.vector_index import EmbeddingIndexes
+        get_job_manager().submit("vector_index", "sync_index", EmbeddingIndexes.sync, params={"full": False})
+    yield
+    get_job_manager().shutdown()
+
 app = FastAPI(
     title="CAC40 Sentiment-Price Correlation API",
     description="API for analyzing correlations between sentiment and price variations for CAC40 stocks",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +42,8 @@ app.include_router(nlp_router)
 app.include_router(news_router)
 app.include_router(sentiment_router)
 app.include_router(correlation_router)
+app.include_router(search_router)
+app.include_router(jobs_router)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="localhost", port=8000)
@@ -1,34 +1,31 @@
-# Export MongoDB models and collections
-from app.models.mongo_models import (
-    news_collection,
-    company_collection,
-    NewsDocument,
-    CompanyDocument
-)
+# Imported on first access, so the table declarations (sql_schema), migrations and
+# bulk_upsert can be used without connecting to MongoDB or the configured SQL server
+_EXPORTS = {
+    # MongoDB models and collections
+    "news_collection": "app.models.mongo_models",
+    "company_collection": "app.models.mongo_models",
+    "ingestion_checkpoints_collection": "app.models.mongo_models",
+    "ingestion_watermarks_collection": "app.models.mongo_models",
+    "NewsDocument": "app.models.mongo_models",
+    "CompanyDocument": "app.models.mongo_models",
+    # SQL models and session
+    "SessionLocal": "app.models.sql_models",
+    "Base": "app.models.sql_schema",
+    "StockPrice": "app.models.sql_schema",
+    "CompanyMetadata": "app.models.sql_schema",
+    "SentimentRecord": "app.models.sql_schema",
+    "CorrelationRecord": "app.models.sql_schema",
+    "CorrelationStats": "app.models.sql_schema",
+    "engine": "app.models.sql_models",
+    "bulk_upsert": "app.models.upsert",
+}
 
-# Export SQL models and session
-from app.models.sql_models import (
-    SessionLocal,
-    Base,
-    StockPrice,
-    CompanyMetadata,
-    SentimentRecord,
-    CorrelationRecord,
-    engine
-)
 
-__all__ = [
-    # MongoDB
-    "news_collection",
-    "company_collection",
-    "NewsDocument",
-    "CompanyDocument",
-    # SQL
-    "SessionLocal",
-    "Base",
-    "StockPrice",
-    "CompanyMetadata",
-    "SentimentRecord",
-    "CorrelationRecord",
-    "engine"
-]
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
+
+
+__all__ = list(_EXPORTS)
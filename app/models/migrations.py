@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime, timezone
+from typing import Callable, List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+
+def has_unique_key(engine: Engine, table: str, name: str) -> bool:
+    inspector = inspect(engine)
+    if not inspector.has_table(table):
+        return False
+    constraints = [constraint["name"] for constraint in inspector.get_unique_constraints(table)]
+    indexes = [index["name"] for index in inspector.get_indexes(table) if index.get("unique")]
+    return name in constraints + indexes
+
+
+def ensure_unique_key(engine: Engine, table: str, columns: List[str], name: str) -> int:
+    """
+    Add a unique index on columns to an existing table, first deleting duplicate rows
+    (the row with the highest id is kept). Returns the number of rows deleted.
+    """
+    if has_unique_key(engine, table, name):
+        return 0
+    key = ", ".join(columns)
+    with engine.begin() as conn:
+        # The derived table lets MySQL delete from the table it selects from
+        deleted = conn.execute(text(
+            f"DELETE FROM {table} WHERE id NOT IN ("
+            f"SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM {table} GROUP BY {key}) AS keep_rows)"
+        )).rowcount
+        conn.execute(text(f"CREATE UNIQUE INDEX {name} ON {table} ({key})"))
+    logging.info(f"Added unique key {name} on {table}({key}), removing {deleted} duplicate rows")
+    return deleted
+
+
+def ensure_column(engine: Engine, table: str, column: str, ddl: str) -> bool:
+    """Add a column (given as its DDL type and constraints) if the table lacks it"""
+    inspector = inspect(engine)
+    if not inspector.has_table(table) or column in [c["name"] for c in inspector.get_columns(table)]:
+        return False
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    logging.info(f"Added column {table}.{column}")
+    return True
+
+
+def drop_index(engine: Engine, table: str, name: str) -> bool:
+    """Drop an index if the table has it"""
+    inspector = inspect(engine)
+    if not inspector.has_table(table) or name not in [index["name"] for index in inspector.get_indexes(table)]:
+        return False
+    statement = f"DROP INDEX {name} ON {table}" if engine.dialect.name == "mysql" else f"DROP INDEX {name}"
+    with engine.begin() as conn:
+        conn.execute(text(statement))
+    logging.info(f"Dropped index {name} on {table}")
+    return True
+
+
+def _stock_prices_unique_key(engine: Engine):
+    ensure_unique_key(engine, "stock_prices", ["ticker", "date"], "uq_stock_prices_ticker_date")
+
+
+def _sentiment_records_unique_key(engine: Engine):
+    ensure_unique_key(engine, "sentiment_records", ["ticker", "date"], "uq_sentiment_records_ticker_date")
+
+
+def _correlation_records_window_size(engine: Engine):
+    # Rows written before rolling windows existed hold the expanding correlation
+    ensure_column(engine, "correlation_records", "window_size", "INTEGER NOT NULL DEFAULT 0")
+    ensure_unique_key(engine, "correlation_records", ["ticker", "date", "window_size"],
+                      "uq_correlation_records_ticker_date_window")
+
+
+def _correlation_records_key_order(engine: Engine):
+    # Router queries fix ticker and window_size and scan a date range: with date last the
+    # key serves them as one ordered range, without filtering or sorting
+    ensure_unique_key(engine, "correlation_records", ["ticker", "window_size", "date"],
+                      "uq_correlation_records_ticker_window_date")
+    drop_index(engine, "correlation_records", "uq_correlation_records_ticker_date_window")
+
+
+def _drop_single_column_ticker_indexes(engine: Engine):
+    # The composite unique keys lead with ticker; the date indexes stay for MAX(date) lookups
+    for table in ("stock_prices", "sentiment_records", "correlation_records"):
+        drop_index(engine, table, f"ix_{table}_ticker")
+
+
+# Applied in order, once each, and recorded in schema_migrations. Every step is also safe
+# to run on a table that already has the change (e.g. created by create_all).
+MIGRATIONS: List[Tuple[str, Callable[[Engine], None]]] = [
+    ("0001_stock_prices_unique_key", _stock_prices_unique_key),
+    ("0002_sentiment_records_unique_key", _sentiment_records_unique_key),
+    ("0003_correlation_records_window_size", _correlation_records_window_size),
+    ("0004_correlation_records_key_order", _correlation_records_key_order),
+    ("0005_drop_single_column_ticker_indexes", _drop_single_column_ticker_indexes),
+]
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """Bring tables created by older versions up to the current schema; returns the versions applied"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations "
+            "(version VARCHAR(64) NOT NULL PRIMARY KEY, applied_at DATETIME NOT NULL)"
+        ))
+        done = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+    applied = []
+    for version, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        migrate(engine)
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO schema_migrations (version, applied_at) VALUES (:version, :applied_at)"),
+                         {"version": version, "applied_at": datetime.now(timezone.utc).replace(tzinfo=None)})
+        logging.info(f"Applied migration {version}")
+        applied.append(version)
+    return applied
@@ -17,6 +17,10 @@ try:
 
     news_collection = db["news"]
     company_collection = db["companies"]
+    # Resumable cursors of paginated backfills, one document per (medium, ticker)
+    ingestion_checkpoints_collection = db["ingestion_checkpoints"]
+    # Newest published_at ingested per (medium, ticker), for incremental scraping
+    ingestion_watermarks_collection = db["ingestion_watermarks"]
     logging.info(f"Connected to MongoDB at {settings.MONGODB_URL}, using database '{settings.MONGODB_DB}'")
 except ConnectionFailure as e:
     logging.error(f"Could not connect to MongoDB: {e}")
@@ -24,6 +28,8 @@ except ConnectionFailure as e:
     db = None
     news_collection = None
     company_collection = None
+    ingestion_checkpoints_collection = None
+    ingestion_watermarks_collection = None
 
 class NewsDocument:
     @staticmethod
@@ -37,6 +43,7 @@ class NewsDocument:
         description: Optional[str] = None,
         keywords: Optional[List[str]] = None,
         url: Optional[str] = None,
+        external_id: Optional[str] = None,
         sentiment_dict: Optional[Dict] = None,
         sentiment_label: Optional[str] = None,
         sentiment_confidence: Optional[float] = None,
@@ -51,6 +58,7 @@ class NewsDocument:
             "description": description,
             "keywords": keywords or [],
             "url": url,
+            "external_id": external_id,   # provider article id (or URL), unique per medium and ticker
             "published_at": published_at,
             "created_at": datetime.now(timezone.utc),
             "embedding": embedding,
@@ -63,9 +71,6 @@ class NewsDocument:
             }
         }
     
-news_collection.create_index([("ticker", ASCENDING)])
-news_collection.create_index([("published_at", DESCENDING)])
-
 class CompanyDocument:
     @staticmethod
     def create(
@@ -83,6 +88,24 @@ class CompanyDocument:
         }
     
 
-company_collection.create_index([("symbol", ASCENDING)], unique=True)
+def ensure_indexes():
+    """Create the collections' indexes; a no-op for those that already exist"""
+    news_collection.create_index([("ticker", ASCENDING)])
+    news_collection.create_index([("published_at", DESCENDING)])
+    # Pending-inference scans: filter on sentiment.updated_at, page by _id
+    news_collection.create_index([("sentiment.updated_at", ASCENDING), ("_id", ASCENDING)])
+    # MinHash LSH band keys of canonical articles, used for near-duplicate lookups at ingestion
+    news_collection.create_index([("lsh_bands", ASCENDING)])
+    # Idempotent ingestion: one article per (medium, ticker, provider id); legacy documents without an id are left out
+    news_collection.create_index(
+        [("medium", ASCENDING), ("ticker", ASCENDING), ("external_id", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"external_id": {"$type": "string"}}
+    )
+    # Same-ticker near-duplicates recorded on their canonical article, so re-ingestion skips them
+    news_collection.create_index([("duplicates.external_id", ASCENDING)])
+    company_collection.create_index([("symbol", ASCENDING)], unique=True)
+
 
+ensure_indexes()
 logging.info("MongoDB indexes created successfully")
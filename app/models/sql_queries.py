@@ -0,0 +1,85 @@
+"""
+Read queries behind the prices, sentiment and correlation routers. They take the session
+to run on, so they can be pointed at any database with the schema of sql_schema.
+"""
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+def _ranged(query: str, params: Dict, start_date: Optional[date], end_date: Optional[date]) -> str:
+    if start_date:
+        query += " AND date >= :start_date"
+        params["start_date"] = start_date
+    if end_date:
+        query += " AND date <= :end_date"
+        params["end_date"] = end_date
+    return query + " ORDER BY date ASC"
+
+
+def historical_prices(session: Session, ticker: str, start_date: date, end_date: date) -> List[Dict]:
+    query = text("""
+        SELECT * FROM stock_prices
+        WHERE ticker = :ticker
+        AND date >= :start_date
+        AND date <= :end_date
+        ORDER BY date ASC
+    """)
+    params = {
+        "ticker": ticker,
+        "start_date": start_date,
+        "end_date": end_date
+    }
+    return [dict(row._mapping) for row in session.execute(query, params).fetchall()]
+
+
+def latest_price(session: Session, ticker: str) -> Optional[Dict]:
+    query = text("""
+        SELECT * FROM stock_prices
+        WHERE ticker = :ticker
+        ORDER BY date DESC
+        LIMIT 1
+    """)
+    price = session.execute(query, {"ticker": ticker}).fetchone()
+    return dict(price._mapping) if price else None
+
+
+def sentiment_on(session: Session, ticker: str, query_date: date) -> Optional[Dict]:
+    query = text("""
+        SELECT * FROM sentiment_records
+        WHERE ticker = :ticker AND date = :query_date
+    """)
+    sentiment = session.execute(query, {"ticker": ticker, "query_date": query_date}).fetchone()
+    return dict(sentiment._mapping) if sentiment else None
+
+
+def sentiment_series(session: Session, ticker: str, start_date: Optional[date] = None,
+                     end_date: Optional[date] = None) -> List[Dict]:
+    params = {"ticker": ticker}
+    query = _ranged("""
+        SELECT * FROM sentiment_records
+        WHERE ticker = :ticker
+    """, params, start_date, end_date)
+    return [dict(row._mapping) for row in session.execute(text(query), params).fetchall()]
+
+
+def correlation_on(session: Session, ticker: str, query_date: date, window_size: int = 0) -> Optional[Dict]:
+    query = text("""
+        SELECT * FROM correlation_records
+        WHERE ticker = :ticker AND date = :query_date AND window_size = :window_size
+    """)
+    params = {"ticker": ticker, "query_date": query_date, "window_size": window_size}
+    correlation = session.execute(query, params).fetchone()
+    return dict(correlation._mapping) if correlation else None
+
+
+def correlation_series(session: Session, ticker: str, start_date: Optional[date] = None,
+                       end_date: Optional[date] = None, window_size: int = 0) -> List[Dict]:
+    params = {"ticker": ticker, "window_size": window_size}
+    query = _ranged("""
+        SELECT * FROM correlation_records
+        WHERE ticker = :ticker AND window_size = :window_size
+    """, params, start_date, end_date)
+    return [dict(row._mapping) for row in session.execute(text(query), params).fetchall()]
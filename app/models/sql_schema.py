@@ -0,0 +1,86 @@
+"""SQL table declarations, with no engine attached, so they can be bound to any database"""
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, UniqueConstraint
+from sqlalchemy.ext.declarative import declarative_base
+from datetime import datetime, timezone
+
+Base = declarative_base()
+
+
+class StockPrice(Base):
+    __tablename__ = "stock_prices"
+    __table_args__ = (UniqueConstraint("ticker", "date", name="uq_stock_prices_ticker_date"),)
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String(32), nullable=False)
+    date = Column(Date, index=True, nullable=False)
+    open_price = Column(Float)
+    high_price = Column(Float)
+    low_price = Column(Float)
+    close_price = Column(Float, nullable=False)
+    volume = Column(Float)
+    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+
+
+class CompanyMetadata(Base):
+    __tablename__ = "company_metadata"
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String(32), unique=True, index=True, nullable=False)
+    name = Column(String(255))
+    sector = Column(String(255))
+    industry = Column(String(255))
+    country = Column(String(128))
+    city = Column(String(128))
+    address = Column(String(255))
+    employees = Column(Integer)
+    website = Column(String(255))
+    summary = Column(String(1000))
+    logo_url = Column(String(255))
+    currency = Column(String(16))
+    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+
+
+class SentimentRecord(Base):
+    __tablename__ = "sentiment_records"
+    __table_args__ = (UniqueConstraint("ticker", "date", name="uq_sentiment_records_ticker_date"),)
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String(32), nullable=False)
+    date = Column(Date, index=True, nullable=False)
+    sentiment_score = Column(Float, nullable=False)
+    news_id = Column(String(64), nullable=False)
+
+class CorrelationRecord(Base):
+    __tablename__ = "correlation_records"
+    __table_args__ = (UniqueConstraint("ticker", "window_size", "date", name="uq_correlation_records_ticker_window_date"),)
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String(32), nullable=False)
+    date = Column(Date, index=True, nullable=False)
+    # Trailing window in observations; 0 is the expanding correlation over all history up to date
+    window_size = Column(Integer, nullable=False, default=0, server_default="0")
+    correlation_coefficient = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+
+
+class CorrelationStats(Base):
+    """Running sufficient statistics of each ticker's daily changes, for incremental correlation updates"""
+    __tablename__ = "correlation_stats"
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String(32), unique=True, index=True, nullable=False)
+    # CORRELATION_WINDOWS the statistics were built for
+    windows = Column(String(64))
+    # Last common (sentiment and price) date folded in, with its values
+    last_date = Column(Date)
+    last_sentiment = Column(Float(53))
+    last_close = Column(Float(53))
+    n = Column(Integer, nullable=False, default=0)
+    # Double precision: the sums are uncentered, so single-precision FLOAT would lose the variances
+    sum_x = Column(Float(53), nullable=False, default=0)
+    sum_y = Column(Float(53), nullable=False, default=0)
+    sum_xy = Column(Float(53), nullable=False, default=0)
+    sum_xx = Column(Float(53), nullable=False, default=0)
+    sum_yy = Column(Float(53), nullable=False, default=0)
+    # JSON [[date, x, y], ...] of the last max(window) observations, for the rolling windows
+    recent = Column(Text)
+    # Earliest date with new or changed inputs not yet folded in; NULL when up to date
+    dirty_from = Column(Date)
+    # Bumped by every mark, so an update only clears dirty_from if no write landed while it ran
+    marks = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime)
@@ -0,0 +1,47 @@
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+
+def bulk_upsert(session: Session,
+                model,
+                rows: List[Dict],
+                key_columns: Sequence[str],
+                update_columns: Optional[Sequence[str]] = None,
+                chunk_size: int = 5000) -> int:
+    """
+    Insert rows into model's table, updating update_columns of rows whose unique key
+    (key_columns) already exists. Uses the dialect's native upsert: ON DUPLICATE KEY UPDATE
+    on MySQL, ON CONFLICT DO UPDATE on SQLite and PostgreSQL. Does not commit.
+    """
+    if not rows:
+        return 0
+    table = model.__table__
+    dialect = session.get_bind().dialect.name
+    if update_columns is None:
+        update_columns = [column for column in rows[0] if column not in key_columns]
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        # Stay under SQLite's bound-parameter limit
+        chunk_size = min(chunk_size, max(1, 900 // len(rows[0])))
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise NotImplementedError(f"bulk_upsert does not support the {dialect} dialect")
+
+    for start in range(0, len(rows), chunk_size):
+        statement = insert(table).values(rows[start:start + chunk_size])
+        if dialect == "mysql":
+            statement = statement.on_duplicate_key_update(
+                {column: statement.inserted[column] for column in update_columns}
+            )
+        else:
+            statement = statement.on_conflict_do_update(
+                index_elements=list(key_columns),
+                set_={column: statement.excluded[column] for column in update_columns}
+            )
+        session.execute(statement)
+    return len(rows)
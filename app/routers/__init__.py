@@ -4,4 +4,6 @@ from app.routers.prices import router as prices_router
 from app.routers.nlp import router as nlp_router
 from app.routers.news import router as news_router
 from app.routers.sentiment import router as sentiment_router
-from app.routers.correlation import router as correlation_router
\ No newline at end of file
+from app.routers.correlation import router as correlation_router
+from app.routers.search import router as search_router
+from app.routers.jobs import router as jobs_router
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException
-from app.models import SessionLocal
-from sqlalchemy import text
+from app.models import SessionLocal, sql_queries
+from app.services.lead_lag import LeadLagAnalysis
 from datetime import date
 from typing import Optional
 import logging
@@ -13,51 +13,43 @@ router = APIRouter(
 )
 
 @router.get("/{ticker}")
-def get_correlation_by_ticker(ticker: str, start_date: Optional[date] = None, end_date: Optional[date] = None):
+def get_correlation_by_ticker(ticker: str, start_date: Optional[date] = None, end_date: Optional[date] = None, window_size: int = 0):
     """
-    Get correlation records for a specific ticker, optionally filtered by date range.
+    Get the correlation time series of a ticker for one window size (0 = expanding),
+    optionally filtered by date range.
     """
-    query = """
-        SELECT * FROM correlation_records
-        WHERE ticker = :ticker
-    """
-    params = {"ticker": ticker}
-    
-    if start_date:
-        query += " AND date >= :start_date"
-        params["start_date"] = start_date
-    
-    if end_date:
-        query += " AND date <= :end_date"
-        params["end_date"] = end_date
-    
-    query += " ORDER BY date ASC"
-    
     with SessionLocal() as session:
-        result = session.execute(text(query), params)
-        correlations = result.fetchall()
+        correlations = sql_queries.correlation_series(session, ticker, start_date, end_date, window_size)
     
     if not correlations:
         raise HTTPException(status_code=404, detail="No correlation data found for the given ticker.")
     
-    return [dict(row._mapping) for row in correlations]
+    return correlations
+
+@router.get("/{ticker}/lags")
+def get_lead_lag_correlation(ticker: str, min_lag: int = -10, max_lag: int = 10, min_observations: int = 20):
+    """
+    Cross-correlation between daily sentiment and returns for trading-day lags in
+    [min_lag, max_lag]. A positive lag compares sentiment with later returns, so a strong
+    positive-lag correlation means sentiment leads price; a negative one that it follows.
+    Declared before /{ticker}/{query_date} so "lags" is not parsed as a date.
+    """
+    if min_lag > max_lag or max(abs(min_lag), abs(max_lag)) > 60:
+        raise HTTPException(status_code=400, detail="Lags must satisfy min_lag <= max_lag and lie within -60..60.")
+    analysis = LeadLagAnalysis.for_ticker(ticker, min_lag=min_lag, max_lag=max_lag, min_observations=min_observations)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="No sentiment and price data found for the given ticker.")
+    return analysis
 
 @router.get("/{ticker}/{query_date}")
-def get_correlation_by_ticker_and_date(ticker: str, query_date: date):
+def get_correlation_by_ticker_and_date(ticker: str, query_date: date, window_size: int = 0):
     """
-    Get correlation record for a specific ticker on a specific date.
+    Get correlation record for a specific ticker on a specific date, for one window size (0 = expanding).
     """
-    query = text("""
-        SELECT * FROM correlation_records
-        WHERE ticker = :ticker AND date = :query_date
-    """)
-    params = {"ticker": ticker, "query_date": query_date}
-    
     with SessionLocal() as session:
-        result = session.execute(query, params)
-        correlation = result.fetchone()
+        correlation = sql_queries.correlation_on(session, ticker, query_date, window_size)
     
     if not correlation:
         raise HTTPException(status_code=404, detail="No correlation data found for the given ticker and date.")
     
-    return dict(correlation._mapping)
+    return correlation
@@ -5,110 +5,120 @@ from datetime import datetime, timedelta, timezone
 from app.config import settings
 from app.models import *
 from app.services import DatabaseService
+from app.services.news_scraper import NewsScraper
+from app.services.http_client import http_metrics
+from app.services.ingestion_state import IngestionCheckpoints, IngestionWatermarks
+from app.services.jobs import get_job_manager
 import logging
 router = APIRouter(
     prefix="/database",
     tags=["database"],
     responses={404: {"description": "Not found"}},
 )
-@router.post("/populate_sql_metadata")
-def populate_metadata():
-    db_service = DatabaseService()
-    db_service.populate_sql_metadata()
-    logging.info("SQL Metadata population endpoint called.")
-    return ["SQL metadata populated successfully."]
-
-@router.post("/populate_sql_prices")
+def submit_database_job(kind: str, method: str, **kwargs):
+    """Run a DatabaseService method as a background job and describe the job"""
+    def run():
+        db_service = DatabaseService()
+        try:
+            return getattr(db_service, method)(**kwargs)
+        finally:
+            db_service.close()
+    job = get_job_manager().submit(kind, method, run, params=kwargs)
+    logging.info(f"Submitted {method} job {job.id}")
+    return job.to_dict()
+
+@router.post("/populate_sql_metadata", status_code=202)
+def populate_metadata(force_refresh: bool = False):
+    return submit_database_job("populate_sql", "populate_sql_metadata", force_refresh=force_refresh)
+
+@router.post("/populate_sql_prices", status_code=202)
 def populate_prices():
-    db_service = DatabaseService()
-    db_service.populate_sql_prices()
-    logging.info("SQL Prices population endpoint called.")
-    return ["SQL prices populated successfully."]
+    return submit_database_job("populate_sql", "populate_sql_prices")
 
-@router.post("/populate_sql")
+@router.post("/populate_sql", status_code=202)
 def populate_sql():
-    db_service = DatabaseService()
-    db_service.populate_sql()
-    logging.info("SQL Database population endpoint called.")
-    return ["SQL database populated successfully."]
-
-@router.post("/populate_nosql_newsapi")
-def populate_nosql_newsapi(last_n_days: int = 30):
-    db_service = DatabaseService()
-    db_service.populate_nosql_newsapi(last_n_days=last_n_days)
-    logging.info("NoSQL NewsAPI population endpoint called.")
-    return ["NoSQL NewsAPI data populated successfully."]
-
-@router.post("/populate_nosql_polygon")
-def populate_nosql_polygon(start_date: str, end_date: Optional[str] = None, limit: int = 1000):
-    db_service = DatabaseService()
+    return submit_database_job("populate_sql", "populate_sql")
+
+@router.post("/populate_nosql_newsapi", status_code=202)
+def populate_nosql_newsapi(last_n_days: int = 30, incremental: bool = True):
+    return submit_database_job("populate_nosql", "populate_nosql_newsapi",
+                               last_n_days=last_n_days, incremental=incremental)
+
+@router.post("/populate_nosql_polygon", status_code=202)
+def populate_nosql_polygon(start_date: str, end_date: Optional[str] = None, limit: int = 1000, incremental: bool = True):
     start_date = datetime.fromisoformat(start_date).replace(tzinfo=timezone.utc)
     end_date = datetime.fromisoformat(end_date).replace(tzinfo=timezone.utc) if end_date else None
-    db_service.populate_nosql_polygon(start_date=start_date, end_date=end_date, limit=limit)
-    logging.info("NoSQL Polygon population endpoint called.")
-    return ["NoSQL Polygon data populated successfully."]
-
-@router.post("/populate_nosql_reddit")
-def populate_nosql_reddit(last_n_days: int = 30, subreddits: Optional[List[str]] = None):
-    db_service = DatabaseService()
-    db_service.populate_nosql_reddit(last_n_days=last_n_days, subreddits=subreddits)
-    logging.info("NoSQL Reddit population endpoint called.")
-    return ["NoSQL Reddit data populated successfully."]
-
-@router.post("/populate_nosql")
-def populate_nosql(last_n_days: int = 30):
-    db_service = DatabaseService()
-    db_service.populate_nosql_newsapi(last_n_days=last_n_days)
-    start_date = datetime.now(timezone.utc) - timedelta(days=last_n_days)
-    db_service.populate_nosql_polygon(start_date=start_date, limit=1000)
-    db_service.populate_nosql_reddit(last_n_days=last_n_days)
-    return ["NoSQL database populated successfully."]
-@router.post("/export_sql")
+    return submit_database_job("populate_nosql", "populate_nosql_polygon",
+                               start_date=start_date, end_date=end_date, limit=limit, incremental=incremental)
+
+@router.post("/populate_nosql_reddit", status_code=202)
+def populate_nosql_reddit(last_n_days: int = 30, subreddits: Optional[List[str]] = None, incremental: bool = True):
+    return submit_database_job("populate_nosql", "populate_nosql_reddit",
+                               last_n_days=last_n_days, subreddits=subreddits, incremental=incremental)
+
+@router.post("/populate_nosql", status_code=202)
+def populate_nosql(last_n_days: int = 30, incremental: bool = True):
+    return submit_database_job("populate_nosql", "populate_nosql", last_n_days=last_n_days, incremental=incremental)
+
+@router.post("/backfill_news_keys", status_code=202)
+def backfill_news_keys():
+    """
+    Give news documents stored before idempotent ingestion their external_id, drop the
+    copies a later ingestion already stored, and recompute near-duplicate signatures.
+    """
+    return submit_database_job("maintenance", "backfill_news_keys")
+
+@router.post("/export_sql", status_code=202)
 def export_sql(backup_url: Optional[str] = None):
-    db_service = DatabaseService()
-    db_service.backup_sql(backup_url=backup_url)
-    return ["SQL database backup completed successfully."]
+    return submit_database_job("backup", "backup_sql", backup_url=backup_url)
 
-@router.post("/export_nosql")
+@router.post("/export_nosql", status_code=202)
 def export_nosql(output_dir: Optional[str] = "app/backups"):
     """Export NoSQL (MongoDB) database to JSON files"""
-    db_service = DatabaseService()
-    result = db_service.export_nosql(output_dir=output_dir)
-    logging.info("NoSQL export endpoint called.")
-    return result
-@router.post("/import_sql")
+    return submit_database_job("backup", "export_nosql", output_dir=output_dir)
+
+@router.post("/import_sql", status_code=202)
 def import_sql(backup_url: Optional[str] = settings.SQLITE_URL):
-    db_service = DatabaseService()
-    db_service.import_sql(import_url=backup_url)
-    logging.info("SQL import endpoint called.")
-    return ["SQL database restoration completed successfully."]
+    return submit_database_job("restore", "import_sql", import_url=backup_url)
 
-@router.post("/import_nosql")
+@router.post("/import_nosql", status_code=202)
 def import_nosql(input_dir: Optional[str] = "app/backups"):
     """Import NoSQL (MongoDB) database from JSON files"""
-    db_service = DatabaseService()
-    result = db_service.import_nosql(input_dir=input_dir)
-    logging.info("NoSQL import endpoint called.")
-    return result
+    return submit_database_job("restore", "import_nosql", input_dir=input_dir)
 
-@router.post("/populate_sentiment")
+@router.post("/populate_sentiment", status_code=202)
 def populate_sentiment():
     """
     Populate sentiment_records table by aggregating sentiment from news articles.
     For each (date, ticker) pair, calculate the average confidence score.
     """
-    db_service = DatabaseService()
-    db_service.populate_sentiment()
-    logging.info("Sentiment population endpoint called.")
-    return ["Sentiment records populated successfully."]
+    return submit_database_job("populate_sentiment", "populate_sentiment")
 
-@router.post("/populate_correlation")
-def populate_correlation():
+@router.post("/populate_correlation", status_code=202)
+def populate_correlation(full: bool = False):
     """
     Populate correlation_records table by calculating correlation between
-    sentiment changes and price changes for each ticker.
+    sentiment changes and price changes for each ticker. Only tickers with new or
+    changed sentiment or prices are updated unless full is set.
     """
-    db_service = DatabaseService()
-    db_service.populate_correlation()
-    logging.info("Correlation population endpoint called.")
-    return ["Correlation records populated successfully."]
\ No newline at end of file
+    return submit_database_job("populate_correlation", "populate_correlation", full=full)
+
+@router.get("/rate_limits")
+def get_rate_limits():
+    """Remaining request budget of each news provider's rate limiter"""
+    return NewsScraper().rate_limit_status()
+
+@router.get("/http_metrics")
+def get_http_metrics():
+    """Per-endpoint latency, retry and error counts of the news providers' HTTP clients"""
+    return http_metrics()
+
+@router.get("/ingestion_checkpoints")
+def get_ingestion_checkpoints(medium: Optional[str] = None):
+    """Cursor checkpoints of paginated backfills, per (medium, ticker)"""
+    return IngestionCheckpoints.status(medium)
+
+@router.get("/ingestion_watermarks")
+def get_ingestion_watermarks(medium: Optional[str] = None):
+    """Newest ingested publication time per (medium, ticker)"""
+    return IngestionWatermarks.status(medium)
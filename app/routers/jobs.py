@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from app.services.jobs import get_job_manager
+import logging
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("")
+def list_jobs(kind: Optional[str] = None, status: Optional[str] = None):
+    """Recent background jobs, newest first, optionally filtered by kind and status"""
+    return [job.to_dict() for job in get_job_manager().list(kind=kind, status=status)]
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """Status, progress counters, timings and result of a background job"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.to_dict()
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job(job_id: str):
+    """Drop a queued job, or ask a running one to stop at its next progress report"""
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    logging.info(f"Cancellation requested for job {job.name} ({job_id})")
+    return job.to_dict()
@@ -17,7 +17,8 @@ router = APIRouter(
 def get_news_average_articles(ticker: str, query_date: date):
     start_of_day = datetime.combine(query_date, datetime.min.time()).replace(tzinfo=timezone.utc)
     end_of_day = datetime.combine(query_date, datetime.max.time()).replace(tzinfo=timezone.utc)
-    articles = list(news_collection.find({"ticker": ticker, "published_at": {"$gte": start_of_day, "$lt": end_of_day}}))
+    articles = list(news_collection.find({"ticker": ticker, "published_at": {"$gte": start_of_day, "$lt": end_of_day},
+                                          "relevance.dropped": {"$ne": True}}))
     if not articles:
         raise HTTPException(status_code=404, detail="Articles not found")
     keywords = []
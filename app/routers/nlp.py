@@ -3,6 +3,7 @@ from typing import List
 
 
 
+from contextlib import nullcontext
 from fastapi import APIRouter, HTTPException
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
@@ -11,6 +12,9 @@ from app.config import settings
 from app.models import *
 from app.services import DatabaseService
 from app.services.nlp_tasks import NLPTasks
+from app.services.inference_cache import get_inference_cache
+from app.services.news_inference import NewsInferencePipeline
+from app.services.jobs import get_job_manager, report_progress
 import logging
 import tqdm
 router = APIRouter(
@@ -20,7 +24,6 @@ router = APIRouter(
 )
 
 
-@router.post("/company_embeddings")
 def generate_company_embeddings():
     query = text("""
         SELECT symbol, name, industry, summary FROM company_metadata
@@ -28,11 +31,14 @@ def generate_company_embeddings():
     with SessionLocal() as session:
         result = session.execute(query)
         companies = result.fetchall()
-    for company in tqdm.tqdm(companies):
-        industry = company.industry or ""
-        summary = company.summary or ""
-        emb = NLPTasks.generate_semantic_embedding(industry + " " + summary)
-        keywords = NLPTasks.summarize_into_keywords(summary)
+    cache = get_inference_cache()
+    texts = [(company.industry or "") + " " + (company.summary or "") for company in companies]
+    summaries = [company.summary or "" for company in companies]
+    with cache.tracking() if cache else nullcontext() as cache_tracking:
+        embeddings = NLPTasks.generate_semantic_embedding_batch(texts)
+        report_progress(companies_embedded=len(embeddings))
+        keywords_list = NLPTasks.summarize_into_keywords_batch(summaries, document_embeddings=embeddings)
+    for company, emb, keywords in zip(companies, embeddings, keywords_list):
         company_document = CompanyDocument().create(
             symbol=company.symbol,
             embedding=emb,
@@ -40,35 +46,32 @@ def generate_company_embeddings():
         )
         logging.debug(f"Generated embedding and keywords for {company.symbol}")
         logging.debug(f"Keywords: {keywords}")
-        company_collection.insert_one(company_document)
+        # Replace so regenerating embeddings does not trip the unique symbol index
+        company_collection.replace_one({"symbol": company.symbol}, company_document, upsert=True)
     
     logging.info("Company embeddings and keywords generation complete.")
-    return ["Company embeddings and keywords generated successfully."]
+    return {
+        "message": "Company embeddings and keywords generated successfully.",
+        "companies": len(companies),
+        "cache": cache_tracking.to_dict() if cache_tracking else None
+    }
 
-@router.post("/news_sentiment_analysis")
-def perform_news_sentiment_analysis():
-    nosql_query = { "sentiment.updated_at": None }
-    news_articles = list(news_collection.find(nosql_query))
-    print(f"Found {len(news_articles)} articles to process.")
-    for article in tqdm.tqdm(news_articles):
-        content = article.get("content", "")
-        if not content:
-            continue
-        sentiment_dict = NLPTasks.analyze_sentiment(content)
-        sentiment_confidence = sentiment_dict.get("positive", 0) - sentiment_dict.get("negative", 0) 
-        semantic_embedding = NLPTasks.generate_semantic_embedding(content)
-        keywords = NLPTasks.summarize_into_keywords(content)
-        news_collection.update_one(
-            {"_id": article["_id"]},
-            {"$set": {
-                "sentiment.dict": sentiment_dict,
-                "sentiment.label": max(sentiment_dict, key=sentiment_dict.get),
-                "sentiment.confidence": sentiment_confidence,
-                "sentiment.updated_at": datetime.now(timezone.utc),
-                "keywords": keywords,
-                "embedding": semantic_embedding
-            }}
-        )
+@router.post("/company_embeddings", status_code=202)
+def submit_company_embeddings():
+    """Generate company embeddings and keywords as a background job"""
+    return get_job_manager().submit("inference", "company_embeddings", generate_company_embeddings).to_dict()
 
-        logging.debug(f"Updated sentiment for article ID {article['_id']}: {sentiment_dict} ({sentiment_confidence})")
-        logging.debug(f"Extracted keywords for article ID {article['_id']}: {keywords}")
+@router.post("/news_sentiment_analysis", status_code=202)
+def perform_news_sentiment_analysis(chunk_size: Optional[int] = None,
+                                    limit: Optional[int] = None,
+                                    relevance_gate: Optional[bool] = None):
+    """
+    Stream pending articles through sentiment, embedding and keyword inference, as a background job.
+    Safe to call again after an interruption: only unprocessed articles are picked up.
+    Articles that do not match their company (see RELEVANCE_THRESHOLD) skip sentiment and keywords.
+    """
+    def run():
+        report = NewsInferencePipeline(chunk_size=chunk_size, relevance_gate=relevance_gate).run(limit=limit)
+        return {"message": "News sentiment analysis completed successfully.", **report}
+    params = {"chunk_size": chunk_size, "limit": limit, "relevance_gate": relevance_gate}
+    return get_job_manager().submit("inference", "news_sentiment_analysis", run, params=params).to_dict()
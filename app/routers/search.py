@@ -0,0 +1,102 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from datetime import date
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.models import news_collection, company_collection
+from app.services.jobs import get_job_manager
+from app.services.vector_index import EmbeddingIndexes
+import logging
+
+router = APIRouter(
+    prefix="/search",
+    tags=["search"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+def resolve_query_vector(query: Optional[str] = None,
+                         article_id: Optional[str] = None,
+                         symbol: Optional[str] = None):
+    """Embedding to search with: a free-text query, a stored article or a company"""
+    if article_id:
+        try:
+            article = news_collection.find_one({"_id": ObjectId(article_id)}, {"embedding": 1})
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid article id.")
+        if not article or not article.get("embedding"):
+            raise HTTPException(status_code=404, detail="Article not found or not embedded yet.")
+        return article["embedding"]
+    if symbol:
+        company = company_collection.find_one({"symbol": symbol}, {"embedding": 1})
+        if not company or not company.get("embedding"):
+            raise HTTPException(status_code=404, detail="Company embedding not found.")
+        return company["embedding"]
+    if query:
+        from app.services.nlp_tasks import NLPTasks
+        return NLPTasks.generate_semantic_embedding(query)
+    raise HTTPException(status_code=400, detail="Provide one of query, article_id or symbol.")
+
+
+@router.get("/similar_news")
+def search_similar_news(query: Optional[str] = None,
+                        article_id: Optional[str] = None,
+                        symbol: Optional[str] = None,
+                        ticker: Optional[str] = None,
+                        start_date: Optional[date] = None,
+                        end_date: Optional[date] = None,
+                        k: int = Query(10, ge=1, le=1000)):
+    """
+    Top-k articles by embedding cosine similarity to a text query, an article or a company,
+    optionally restricted to a ticker and a publication date range. Index rows of articles
+    deleted since the last full sync are skipped. Articles embedded since the last sync job
+    (POST /search/sync_index, also run at startup) are not searched yet.
+    """
+    vector = resolve_query_vector(query=query, article_id=article_id, symbol=symbol)
+    index = EmbeddingIndexes.news()
+    fetch = k
+    while True:
+        hits = index.search(vector, k=fetch, ticker=ticker, start_date=start_date, end_date=end_date, exclude_id=article_id)
+        articles = news_collection.find(
+            {"_id": {"$in": [ObjectId(hit["id"]) for hit in hits]}},
+            {"title": 1, "url": 1, "source": 1, "medium": 1, "sentiment.label": 1}
+        )
+        details = {str(article["_id"]): article for article in articles}
+        live = [hit for hit in hits if hit["id"] in details]
+        # Deleted articles take slots in the index: search deeper until k live ones are found
+        if len(live) >= k or len(hits) < fetch:
+            break
+        fetch *= 2
+    hits = live[:k]
+    for hit in hits:
+        article = details[hit["id"]]
+        hit.update({
+            "title": article.get("title"),
+            "url": article.get("url"),
+            "source": article.get("source"),
+            "medium": article.get("medium"),
+            "sentiment_label": article.get("sentiment", {}).get("label"),
+        })
+    return hits
+
+
+@router.get("/similar_companies")
+def search_similar_companies(query: Optional[str] = None,
+                             article_id: Optional[str] = None,
+                             symbol: Optional[str] = None,
+                             k: int = Query(5, ge=1, le=1000)):
+    """Top-k companies by embedding cosine similarity to a text query, an article or another company"""
+    vector = resolve_query_vector(query=query, article_id=article_id, symbol=symbol)
+    index = EmbeddingIndexes.companies()
+    hits = index.search(vector, k=k, exclude_id=symbol)
+    return [{"symbol": hit["id"], "score": hit["score"]} for hit in hits]
+
+
+@router.post("/sync_index", status_code=202)
+def sync_index(full: bool = False):
+    """Append newly embedded articles to the news index (or rebuild it) and rebuild the company index, as a background job"""
+    job = get_job_manager().submit("vector_index", "sync_index", lambda: EmbeddingIndexes.sync(full=full),
+                                   params={"full": full})
+    logging.info(f"Submitted sync_index job {job.id}")
+    return job.to_dict()
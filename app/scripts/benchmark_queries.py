@@ -0,0 +1,212 @@
+"""
+Measure the latency of the routers' SQL queries on a synthetic dataset.
+
+Usage:
+    python -m app.scripts.benchmark_queries --tickers 40 --years 20 --repeat 200
+    python -m app.scripts.benchmark_queries --legacy-indexes
+
+Builds stock_prices, sentiment_records and correlation_records for the given number of
+tickers and years in a scratch database (a temporary SQLite file unless --url names an
+empty one), brings it to the current schema through the migrations, then runs each
+router query (app.models.sql_queries) with random tickers, dates and one-year ranges.
+Only the scratch database is touched: neither MongoDB nor the configured SQL server is
+connected to. Reports p50/p95/max latency
+in milliseconds, the mean number of rows returned and the query plan of each query.
+--legacy-indexes builds the schema as it was before the composite unique keys (separate
+ticker and date indexes) for comparison.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+import numpy as np
+from sqlalchemy import Index, MetaData, UniqueConstraint, create_engine, event, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import sql_queries
+from app.models.migrations import run_migrations
+from app.models.sql_schema import StockPrice, SentimentRecord, CorrelationRecord
+from app.services.correlation_engine import correlation_windows
+
+TABLES = [StockPrice.__table__, SentimentRecord.__table__, CorrelationRecord.__table__]
+
+
+def create_schema(engine: Engine, legacy: bool):
+    if not legacy:
+        StockPrice.metadata.create_all(engine, tables=TABLES)
+        run_migrations(engine)
+        return
+    # No uniqueness, and separate single-column ticker and date indexes
+    metadata = MetaData()
+    for table in TABLES:
+        legacy_table = table.to_metadata(metadata)
+        for constraint in [c for c in legacy_table.constraints if isinstance(c, UniqueConstraint)]:
+            legacy_table.constraints.discard(constraint)
+        Index(f"ix_{table.name}_ticker", legacy_table.c.ticker)
+    metadata.create_all(engine)
+
+
+def populate(engine: Engine, tickers: List[str], first: date, last: date, windows: List[int], seed: int) -> Dict[str, int]:
+    """
+    Weekday prices (a random walk), sentiment on about 60% of calendar days and one
+    correlation row per window on each day with both; returns the row count per table.
+    """
+    rng = np.random.default_rng(seed)
+    days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+    trading_days = [day for day in days if day.weekday() < 5]
+    counts = {table.name: 0 for table in TABLES}
+    with engine.begin() as conn:
+        for ticker in tickers:
+            closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, len(trading_days))))
+            prices = [
+                {"ticker": ticker, "date": day, "open_price": close, "high_price": close,
+                 "low_price": close, "close_price": close, "volume": 1e6}
+                for day, close in zip(trading_days, closes.tolist())
+            ]
+            sentiment_days = [day for day, keep in zip(days, rng.random(len(days)) < 0.6) if keep]
+            sentiment = [
+                {"ticker": ticker, "date": day, "sentiment_score": score, "news_id": "synthetic"}
+                for day, score in zip(sentiment_days, rng.uniform(-1, 1, len(sentiment_days)).tolist())
+            ]
+            common = sorted(set(trading_days) & set(sentiment_days))
+            correlations = [
+                {"ticker": ticker, "date": day, "window_size": window, "correlation_coefficient": coefficient}
+                for window in windows
+                for day, coefficient in zip(common, rng.uniform(-1, 1, len(common)).tolist())
+            ]
+            for table, rows in zip(TABLES, (prices, sentiment, correlations)):
+                conn.execute(table.insert(), rows)
+                counts[table.name] += len(rows)
+    return counts
+
+
+def router_queries(session: Session, tickers: List[str], first: date, last: date,
+                   windows: List[int]) -> Dict[str, Callable[[random.Random], object]]:
+    span = (last - first).days
+
+    def one_year(rng: random.Random):
+        start = first + timedelta(days=rng.randrange(max(1, span - 365)))
+        return start, min(last, start + timedelta(days=365))
+
+    def any_day(rng: random.Random) -> date:
+        return first + timedelta(days=rng.randrange(span + 1))
+
+    return {
+        "GET /prices/historical/{ticker} (1 year)":
+            lambda rng: sql_queries.historical_prices(session, rng.choice(tickers), *one_year(rng)),
+        "GET /prices/latest/{ticker}":
+            lambda rng: sql_queries.latest_price(session, rng.choice(tickers)),
+        "GET /sentiment/{ticker} (1 year)":
+            lambda rng: sql_queries.sentiment_series(session, rng.choice(tickers), *one_year(rng)),
+        "GET /sentiment/{ticker} (all)":
+            lambda rng: sql_queries.sentiment_series(session, rng.choice(tickers)),
+        "GET /sentiment/{ticker}/{query_date}":
+            lambda rng: sql_queries.sentiment_on(session, rng.choice(tickers), any_day(rng)),
+        "GET /correlation/{ticker} (1 year)":
+            lambda rng: sql_queries.correlation_series(session, rng.choice(tickers), *one_year(rng),
+                                                       window_size=rng.choice(windows)),
+        "GET /correlation/{ticker}/{query_date}":
+            lambda rng: sql_queries.correlation_on(session, rng.choice(tickers), any_day(rng),
+                                                   window_size=rng.choice(windows)),
+    }
+
+
+def query_plan(engine: Engine, statement: str, parameters) -> List[str]:
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+    if engine.dialect.name == "sqlite":
+        return [str(row[-1]) for row in rows]
+    return [" | ".join(str(value) for value in row) for row in rows]
+
+
+def returned_rows(query: Callable, rng: random.Random) -> int:
+    result = query(rng)
+    if result is None:
+        return 0  # The router answers 404: nothing stored for that ticker and date
+    return len(result) if isinstance(result, list) else 1
+
+
+def benchmark(engine: Engine, queries: Dict[str, Callable], repeat: int, seed: int) -> Dict[str, Dict]:
+    executed = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, parameters, context, many: executed.append((statement, parameters)))
+    rng = random.Random(seed)
+    report = {}
+    for name, query in queries.items():
+        returned_rows(query, rng)  # warm-up, and the statement for the plan
+        statement, parameters = executed[-1]
+        latencies, rows = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows.append(returned_rows(query, rng))
+            latencies.append((time.perf_counter() - started) * 1000)
+        quantiles = statistics.quantiles(latencies, n=20) if len(latencies) > 1 else latencies * 19
+        report[name] = {
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(quantiles[18], 3),
+            "max_ms": round(max(latencies), 3),
+            "mean_rows": round(statistics.fmean(rows), 1),
+            "plan": query_plan(engine, statement, parameters),
+        }
+    return report
+
+
+def run(url: str, tickers: int, years: int, repeat: int, legacy: bool, seed: int) -> Dict:
+    engine = create_engine(url)
+    existing = [table.name for table in TABLES if inspect(engine).has_table(table.name)]
+    with engine.connect() as conn:
+        if any(conn.execute(text(f"SELECT 1 FROM {name} LIMIT 1")).first() for name in existing):
+            raise SystemExit(f"{url} already holds data; point --url at an empty scratch database.")
+
+    create_schema(engine, legacy)
+    symbols = [f"SYN{number:02d}.PA" for number in range(tickers)]
+    last = date.today()
+    first = last - timedelta(days=365 * years)
+    windows = correlation_windows()
+    started = time.perf_counter()
+    counts = populate(engine, symbols, first, last, windows, seed)
+    logging.info(f"Generated {counts} in {time.perf_counter() - started:.1f}s")
+
+    with Session(engine) as session:
+        queries = benchmark(engine, router_queries(session, symbols, first, last, windows), repeat, seed)
+    report = {
+        "dialect": engine.dialect.name,
+        "schema": "legacy single-column indexes" if legacy else "composite unique keys",
+        "tickers": tickers,
+        "years": years,
+        "rows": counts,
+        "repeat": repeat,
+        "queries": queries,
+    }
+    engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="SQLAlchemy URL of an empty scratch database (default: temporary SQLite file)")
+    parser.add_argument("--tickers", type=int, default=40, help="number of synthetic tickers")
+    parser.add_argument("--years", type=int, default=20, help="years of daily history per ticker")
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls per query")
+    parser.add_argument("--legacy-indexes", action="store_true", help="benchmark the schema without composite keys")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with tempfile.TemporaryDirectory() as scratch:
+        url = args.url or f"sqlite:///{os.path.join(scratch, 'benchmark.db')}"
+        report = run(url, args.tickers, args.years, args.repeat, args.legacy_indexes, args.seed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
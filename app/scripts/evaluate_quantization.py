@@ -0,0 +1,97 @@
+"""
+Compare FP32 and dynamically quantized INT8 inference on a sample of stored articles.
+
+Usage:
+    python -m app.scripts.evaluate_quantization --sample 200
+
+Reports, for FinBERT and MiniLM, the throughput of each mode, the INT8 speedup, the
+serialized model size, and how closely INT8 outputs agree with FP32 (sentiment label
+agreement, mean absolute confidence difference, mean embedding cosine similarity).
+"""
+import argparse
+import io
+import json
+import logging
+import time
+from typing import Dict, List
+
+import torch
+
+from app.models import news_collection
+from app.services.nlp_tasks import NLPTasks
+
+
+def model_size_mb(model: torch.nn.Module) -> float:
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes / 1024 ** 2
+
+
+def sample_contents(sample_size: int) -> List[str]:
+    pipeline = [
+        {"$match": {"content": {"$nin": [None, ""]}}},
+        {"$sample": {"size": sample_size}},
+        {"$project": {"content": 1}},
+    ]
+    return [doc["content"] for doc in news_collection.aggregate(pipeline)]
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def evaluate(contents: List[str]) -> Dict:
+    report = {"articles": len(contents), "device": str(NLPTasks.device)}
+    if NLPTasks.device.type != "cpu":
+        logging.warning("INT8 dynamic quantization only applies on CPU; both modes will be FP32")
+
+    sentiments, embeddings = {}, {}
+    for quantized in (False, True):
+        mode = "int8" if quantized else "fp32"
+        for kind in ("sentiment", "semantic"):
+            _, model = NLPTasks._load(kind, quantized)
+            report.setdefault(kind, {})[f"{mode}_size_mb"] = round(model_size_mb(model), 1)
+
+        sentiments[mode], seconds = timed(NLPTasks.analyze_sentiment_batch, contents, use_cache=False, quantized=quantized)
+        report["sentiment"][f"{mode}_articles_per_second"] = round(len(contents) / seconds, 2)
+        embeddings[mode], seconds = timed(NLPTasks.generate_semantic_embedding_batch, contents, use_cache=False, quantized=quantized)
+        report["semantic"][f"{mode}_articles_per_second"] = round(len(contents) / seconds, 2)
+
+    for kind in ("sentiment", "semantic"):
+        stats = report[kind]
+        stats["speedup"] = round(stats["int8_articles_per_second"] / stats["fp32_articles_per_second"], 2)
+
+    if contents:
+        labels_agree = sum(
+            NLPTasks.classify_sentiment(fp32) == NLPTasks.classify_sentiment(int8)
+            for fp32, int8 in zip(sentiments["fp32"], sentiments["int8"])
+        )
+        confidence_diff = sum(
+            abs((fp32["positive"] - fp32["negative"]) - (int8["positive"] - int8["negative"]))
+            for fp32, int8 in zip(sentiments["fp32"], sentiments["int8"])
+        )
+        cosine = torch.nn.functional.cosine_similarity(
+            torch.tensor(embeddings["fp32"]), torch.tensor(embeddings["int8"]), dim=-1
+        )
+        report["sentiment"]["label_agreement"] = round(labels_agree / len(contents), 4)
+        report["sentiment"]["mean_abs_confidence_diff"] = round(confidence_diff / len(contents), 4)
+        report["semantic"]["mean_cosine_similarity"] = round(float(cosine.mean()), 4)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample", type=int, default=200, help="number of stored articles to evaluate on")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    contents = sample_contents(args.sample)
+    if not contents:
+        raise SystemExit("No articles with content found in the news collection.")
+    print(json.dumps(evaluate(contents), indent=2))
+
+
+if __name__ == "__main__":
+    main()
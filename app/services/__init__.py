@@ -1,3 +1,17 @@
-from app.services.metadata_scraper import MetadataScraper
-from app.services.price_scraper import PriceScraper
-from app.services.database import DatabaseService
\ No newline at end of file
+# Imported on first access, so modules that do not need the databases (minhash,
+# http_client, correlation_engine) can be imported without connecting to them
+_EXPORTS = {
+    "MetadataScraper": "app.services.metadata_scraper",
+    "PriceScraper": "app.services.price_scraper",
+    "DatabaseService": "app.services.database",
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
+
+
+__all__ = list(_EXPORTS)
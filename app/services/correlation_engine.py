@@ -0,0 +1,223 @@
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+
+EXPANDING = 0
+
+
+def correlation_windows() -> List[int]:
+    """Window sizes from CORRELATION_WINDOWS, in observations; 0 means expanding (all history so far)"""
+    return sorted({int(window) for window in settings.CORRELATION_WINDOWS.split(",") if window.strip()})
+
+
+def common_days(sentiment: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    """Dates with both a sentiment score and a close price: ticker, date, sentiment_score, close_price"""
+    return sentiment[["ticker", "date", "sentiment_score"]].merge(
+        prices[["ticker", "date", "close_price"]], on=["ticker", "date"], how="inner"
+    ).sort_values(["ticker", "date"], kind="mergesort").reset_index(drop=True)
+
+
+def daily_changes(sentiment: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sentiment changes (x) and price returns (y) between consecutive dates that have both
+    a sentiment score and a close price, for all tickers at once.
+
+    sentiment has columns ticker, date, sentiment_score; prices has ticker, date, close_price.
+    Returns ticker, date, x, y sorted by ticker and date. Days whose previous close is 0
+    are dropped, as are each ticker's first common date.
+    """
+    return changes_between(common_days(sentiment, prices))
+
+
+def changes_between(merged: pd.DataFrame) -> pd.DataFrame:
+    """daily_changes over rows already merged and sorted by common_days"""
+    previous = merged.groupby("ticker", sort=False)[["sentiment_score", "close_price"]].shift(1)
+    valid = previous["close_price"].notna() & (previous["close_price"] != 0)
+    changes = pd.DataFrame({
+        "ticker": merged["ticker"],
+        "date": merged["date"],
+        "x": merged["sentiment_score"] - previous["sentiment_score"],
+        "y": (merged["close_price"] - previous["close_price"]) / previous["close_price"],
+    })
+    return changes[valid.to_numpy()].reset_index(drop=True)
+
+
+def group_starts(tickers: np.ndarray) -> np.ndarray:
+    """Index of the first row of each row's ticker, for rows sorted by ticker"""
+    if len(tickers) == 0:
+        return np.zeros(0, dtype=np.int64)
+    boundaries = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1
+    starts = np.r_[0, boundaries]
+    lengths = np.diff(np.r_[starts, len(tickers)])
+    return np.repeat(starts, lengths)
+
+
+def pearson(n: np.ndarray, sx: np.ndarray, sy: np.ndarray, sxy: np.ndarray, sxx: np.ndarray, syy: np.ndarray) -> np.ndarray:
+    """Pearson coefficients from sufficient statistics; 0 where either variance vanishes"""
+    numerator = n * sxy - sx * sy
+    variance_x = n * sxx - sx * sx
+    variance_y = n * syy - sy * sy
+    denominator = np.sqrt(np.clip(variance_x, 0, None) * np.clip(variance_y, 0, None))
+    tolerance = 1e-12 * np.maximum(n * n, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = np.where(denominator > tolerance, numerator / denominator, 0.0)
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def rolling_correlations(changes: pd.DataFrame, windows: Iterable[int]) -> pd.DataFrame:
+    """
+    Pearson correlation of x and y over trailing windows of observations, for every
+    ticker and window in one pass.
+
+    Window sums come from differences of cumulative sums, so the cost is O(rows) per window
+    regardless of its size. Values are centered per ticker first (correlation is
+    shift-invariant) to keep the cumulative sums well conditioned. A rolling window needs
+    `window` observations, an expanding one (0) at least two.
+    Returns ticker, date, window_size, correlation_coefficient.
+    """
+    if changes.empty:
+        return pd.DataFrame(columns=["ticker", "date", "window_size", "correlation_coefficient"])
+    tickers = changes["ticker"].to_numpy()
+    x = changes["x"].to_numpy(dtype=float)
+    y = changes["y"].to_numpy(dtype=float)
+    x = x - changes.groupby("ticker", sort=False)["x"].transform("mean").to_numpy()
+    y = y - changes.groupby("ticker", sort=False)["y"].transform("mean").to_numpy()
+
+    rows = np.arange(len(x))
+    starts = group_starts(tickers)
+    sums = {
+        name: np.r_[0.0, np.cumsum(values)]
+        for name, values in (("sx", x), ("sy", y), ("sxy", x * y), ("sxx", x * x), ("syy", y * y))
+    }
+
+    frames = []
+    for window in windows:
+        lower = starts if window == EXPANDING else np.maximum(rows + 1 - window, starts)
+        n = (rows + 1 - lower).astype(float)
+        valid = n >= (2 if window == EXPANDING else max(window, 2))
+        stats = {name: cumulative[rows + 1] - cumulative[lower] for name, cumulative in sums.items()}
+        correlation = pearson(n, **stats)
+        frames.append(pd.DataFrame({
+            "ticker": tickers[valid],
+            "date": changes["date"].to_numpy()[valid],
+            "window_size": window,
+            "correlation_coefficient": correlation[valid],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+SUM_NAMES = ("sx", "sy", "sxy", "sxx", "syy")
+
+
+def observation_sums(changes: pd.DataFrame) -> Dict[str, float]:
+    """Uncentered sums of x, y, xy, x² and y² over observations (ticker, date, x, y)"""
+    x = changes["x"].to_numpy(dtype=float)
+    y = changes["y"].to_numpy(dtype=float)
+    return dict(zip(SUM_NAMES, (float(values.sum()) for values in (x, y, x * y, x * x, y * y))))
+
+
+def fold_changes(n: int, sums: Dict[str, float], recent: pd.DataFrame, changes: pd.DataFrame,
+                 windows: Iterable[int]) -> Tuple[pd.DataFrame, int, Dict[str, float]]:
+    """
+    Correlations of one ticker's new observations, from its running state before them.
+
+    n and sums cover all earlier observations; recent holds the latest of them, at least
+    max(window) - 1 (or all there are). The cost depends on the new observations only.
+    Returns the rows for the new observations' dates (as rolling_correlations) and n and
+    sums including them.
+    """
+    x = changes["x"].to_numpy(dtype=float)
+    y = changes["y"].to_numpy(dtype=float)
+    cumulative = {
+        name: sums[name] + np.cumsum(values)
+        for name, values in zip(SUM_NAMES, (x, y, x * y, x * x, y * y))
+    }
+    counts = n + np.arange(1, len(x) + 1, dtype=float)
+
+    windows = list(windows)
+    frames = []
+    if EXPANDING in windows:
+        valid = counts >= 2
+        frames.append(pd.DataFrame({
+            "ticker": changes["ticker"].to_numpy()[valid],
+            "date": changes["date"].to_numpy()[valid],
+            "window_size": EXPANDING,
+            "correlation_coefficient": pearson(counts, **cumulative)[valid],
+        }))
+    rolling_windows = [window for window in windows if window != EXPANDING]
+    if rolling_windows and len(changes):
+        rolling = rolling_correlations(pd.concat([recent, changes], ignore_index=True), rolling_windows)
+        if len(recent):
+            rolling = rolling[rolling["date"] > recent["date"].iloc[-1]]
+        frames.append(rolling)
+    columns = ["ticker", "date", "window_size", "correlation_coefficient"]
+    correlations = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+    if len(x) == 0:
+        return correlations, n, dict(sums)
+    return correlations, n + len(x), {name: float(values[-1]) for name, values in cumulative.items()}
+
+
+def unfold_changes(n: int, sums: Dict[str, float], removed: pd.DataFrame) -> Tuple[int, Dict[str, float]]:
+    """Take observations back out of running sums, e.g. recent days about to be revised"""
+    removed_sums = observation_sums(removed)
+    return n - len(removed), {name: sums[name] - removed_sums[name] for name in SUM_NAMES}
+
+
+def trading_day_panels(sentiment: pd.DataFrame, prices: pd.DataFrame):
+    """
+    Ticker x trading-day matrices of daily sentiment scores and returns.
+
+    Returns are close-to-close over each ticker's own trading days. Sentiment from
+    non-trading days (weekends, holidays) is assigned to the next trading day and
+    averaged with it. Missing values are NaN. Returns (tickers, dates, X, Y).
+    """
+    prices = prices.sort_values(["ticker", "date"], kind="mergesort").reset_index(drop=True)
+    previous_close = prices.groupby("ticker", sort=False)["close_price"].shift(1)
+    prices["return"] = (prices["close_price"] / previous_close.where(previous_close != 0)) - 1
+
+    trading_days = prices[["ticker", "date"]].rename(columns={"date": "trading_date"})
+    sentiment = sentiment[sentiment["ticker"].isin(trading_days["ticker"].unique())]
+    aligned = pd.merge_asof(
+        sentiment.assign(date=pd.to_datetime(sentiment["date"])).sort_values("date"),
+        trading_days.assign(key=pd.to_datetime(trading_days["trading_date"])).sort_values("key"),
+        left_on="date", right_on="key", by="ticker", direction="forward"
+    ).dropna(subset=["trading_date"])
+    daily_sentiment = aligned.groupby(["ticker", "trading_date"])["sentiment_score"].mean()
+
+    returns = prices.set_index(["ticker", "date"])["return"]
+    returns.index.names = ["ticker", "trading_date"]
+    X = daily_sentiment.unstack("trading_date")
+    Y = returns.unstack("trading_date")
+    tickers = sorted(set(X.index) & set(Y.index))
+    dates = sorted(set(Y.columns))
+    X = X.reindex(index=tickers, columns=dates).to_numpy(dtype=float)
+    Y = Y.reindex(index=tickers, columns=dates).to_numpy(dtype=float)
+    return tickers, dates, X, Y
+
+
+def cross_correlations(X: np.ndarray, Y: np.ndarray, lags: np.ndarray):
+    """
+    corr(X[:, t], Y[:, t + lag]) for every row and lag at once, over pairwise-complete days.
+    A positive lag pairs sentiment with later returns (sentiment leads price).
+    Returns (correlations, observations), both of shape (rows, len(lags)).
+    """
+    pad = int(np.max(np.abs(lags))) if len(lags) else 0
+    days = X.shape[1]
+    with np.errstate(invalid="ignore"):
+        X = X - np.nanmean(X, axis=1, keepdims=True)
+        Y = Y - np.nanmean(Y, axis=1, keepdims=True)
+    Y_padded = np.pad(Y, ((0, 0), (pad, pad)), constant_values=np.nan)
+    # (rows, offsets, days) view: offset o holds Y shifted by o - pad days
+    shifted = np.lib.stride_tricks.sliding_window_view(Y_padded, days, axis=1)[:, lags + pad, :]
+    x = np.broadcast_to(X[:, None, :], shifted.shape)
+    mask = ~np.isnan(x) & ~np.isnan(shifted)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, shifted, 0.0)
+    n = mask.sum(axis=2).astype(float)
+    correlations = pearson(
+        n, x.sum(axis=2), y.sum(axis=2), (x * y).sum(axis=2), (x * x).sum(axis=2), (y * y).sum(axis=2)
+    )
+    return correlations, n.astype(int)
@@ -0,0 +1,283 @@
+import json
+import logging
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, or_, text
+
+from app.config import settings
+from app.models import CorrelationRecord, CorrelationStats, bulk_upsert
+from app.services.correlation_engine import (
+    EXPANDING, changes_between, common_days, correlation_windows, fold_changes, observation_sums,
+    rolling_correlations, unfold_changes
+)
+from app.services.jobs import report_progress
+
+# correlation_stats column of each running sum
+SUMS = {"sum_x": "sx", "sum_y": "sy", "sum_xy": "sxy", "sum_xx": "sxx", "sum_yy": "syy"}
+
+
+def as_dates(values) -> pd.Series:
+    """Dates as datetime.date objects, whatever the driver returned (date, datetime or ISO string)"""
+    return pd.to_datetime(pd.Series(values)).dt.date
+
+
+def changed_rows(session, model, value_column: str, rows: List[Dict],
+                 tolerance: float = 1e-6) -> Tuple[List[Dict], Dict[str, date]]:
+    """
+    Rows keyed by (ticker, date) that are new or whose value_column differs from the stored
+    row, and the first such date per ticker. The relative tolerance absorbs the rounding
+    of MySQL's single-precision FLOAT columns.
+    """
+    by_ticker: Dict[str, List[Dict]] = {}
+    for row in rows:
+        by_ticker.setdefault(row["ticker"], []).append(row)
+    changed, first_dates = [], {}
+    column = getattr(model, value_column)
+    for ticker, ticker_rows in by_ticker.items():
+        stored = dict(
+            session.query(model.date, column)
+            .filter(model.ticker == ticker, model.date >= min(row["date"] for row in ticker_rows))
+            .all()
+        )
+        for row in ticker_rows:
+            previous, value = stored.get(row["date"]), row[value_column]
+            if previous is None or abs(previous - value) > tolerance * max(1.0, abs(value)):
+                changed.append(row)
+                first_dates[ticker] = min(first_dates.get(ticker, row["date"]), row["date"])
+    return changed, first_dates
+
+
+def mark_dirty(session, first_dates: Dict[str, date]):
+    """Record that tickers' sentiment or prices changed from the given dates on (does not commit)"""
+    if not first_dates:
+        return
+    known = {
+        ticker for (ticker,) in
+        session.query(CorrelationStats.ticker).filter(CorrelationStats.ticker.in_(list(first_dates)))
+    }
+    for ticker, first in first_dates.items():
+        if ticker not in known:
+            session.add(CorrelationStats(ticker=ticker, dirty_from=first, marks=1))
+            continue
+        stats = session.query(CorrelationStats).filter(CorrelationStats.ticker == ticker)
+        stats.update({"marks": CorrelationStats.marks + 1}, synchronize_session=False)
+        stats.filter(or_(CorrelationStats.dirty_from.is_(None), CorrelationStats.dirty_from > first)).update(
+            {"dirty_from": first}, synchronize_session=False
+        )
+    session.flush()
+
+
+class IncrementalCorrelation:
+    """
+    Keeps correlation_records up to date from per-ticker running sums instead of rereading
+    all history on every run.
+
+    Each ticker's correlation_stats row holds n, Σx, Σy, Σxy, Σx², Σy² of its daily changes up
+    to last_date, the sentiment and close on that date (to difference the next day against)
+    and its latest observations (max(window) plus CORRELATION_REVISION_OBSERVATIONS). Writers
+    of sentiment_records and stock_prices mark the first date they changed (mark_dirty).
+
+    Days after last_date are folded into the sums: expanding correlations come straight from
+    them and rolling ones from the buffer. A revision within the buffer (the current day
+    re-scored, the last bar re-downloaded) first takes the buffered observations from that
+    date on back out of the sums, then folds the revised days in again. Either way the cost
+    follows the changed days. Only a revision older than the buffer recomputes the ticker
+    from its history, rewriting its rows from the changed date on.
+    """
+
+    def __init__(self, session, windows: Optional[List[int]] = None):
+        self.session = session
+        self.windows = sorted(set(windows)) if windows else correlation_windows()
+        self.windows_key = ",".join(str(window) for window in self.windows)
+        self.rolling_windows = [window for window in self.windows if window != EXPANDING]
+        # A rolling value needs the window's previous observations; the rest is room for revisions
+        self.needed = max(max(self.rolling_windows, default=0) - 1, 1)
+        self.buffer_size = max(self.rolling_windows, default=0) + settings.CORRELATION_REVISION_OBSERVATIONS
+
+    def update(self, full: bool = False) -> Dict:
+        stats = {row.ticker: row for row in self.session.query(CorrelationStats).all()}
+        if full or not any(row.windows for row in stats.values()):
+            # First run (or forced): one vectorized pass over every ticker
+            rows, recomputed = self._recompute(None, stats)
+            summary = {"mode": "full", "tickers_recomputed": recomputed, "tickers_folded": 0}
+        else:
+            folded, recompute_from = [], {}
+            for ticker, row in stats.items():
+                if row.windows != self.windows_key:
+                    recompute_from[ticker] = None
+                elif row.dirty_from is None:
+                    continue
+                elif row.last_date is not None and (row.dirty_from > row.last_date or self._can_refold(row)):
+                    folded.append(row)
+                else:
+                    recompute_from[ticker] = row.dirty_from
+            rows, _ = self._recompute(recompute_from, stats) if recompute_from else (0, 0)
+            for done, row in enumerate(folded, start=1):
+                rows += self._fold(row)
+                report_progress(tickers_folded=done, rows=rows)
+            summary = {"mode": "incremental", "tickers_recomputed": len(recompute_from), "tickers_folded": len(folded)}
+        self.session.commit()
+        summary.update({"rows": rows, "windows": self.windows})
+        logging.info(f"Correlation update: {summary}")
+        return summary
+
+    def _load(self, tickers: Optional[List[str]], after: Optional[date] = None,
+              inclusive: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Sentiment scores and close prices of tickers (all tickers with sentiment if None), after a date"""
+        if tickers is None:
+            scope, params = "ticker IN (SELECT DISTINCT ticker FROM sentiment_records)", {}
+        else:
+            scope, params = "ticker IN :tickers", {"tickers": list(tickers)}
+        if after is not None:
+            scope += " AND date >= :after" if inclusive else " AND date > :after"
+            params["after"] = after
+        frames = []
+        for query in ("SELECT ticker, date, sentiment_score FROM sentiment_records WHERE " + scope,
+                      "SELECT ticker, date, close_price FROM stock_prices WHERE " + scope):
+            statement = text(query)
+            if tickers is not None:
+                statement = statement.bindparams(bindparam("tickers", expanding=True))
+            frame = pd.read_sql(statement, self.session.connection(), params=params)
+            frame["date"] = as_dates(frame["date"]).to_numpy()
+            frames.append(frame)
+        return frames[0], frames[1]
+
+    def _write_correlations(self, correlations: pd.DataFrame) -> int:
+        rows = correlations.to_dict("records")
+        for start in range(0, len(rows), 20000):
+            bulk_upsert(self.session, CorrelationRecord, rows[start:start + 20000],
+                        key_columns=("ticker", "window_size", "date"))
+            report_progress(rows=len(rows), rows_written=min(start + 20000, len(rows)))
+        return len(rows)
+
+    def _recompute(self, since: Optional[Dict[str, Optional[date]]],
+                   stats: Dict[str, CorrelationStats]) -> Tuple[int, int]:
+        """
+        Recompute tickers from their full history: all tickers when since is None, else the
+        tickers in since, rewriting their rows from since[ticker] on (everything if None).
+        Returns (rows written, tickers recomputed).
+        """
+        sentiment, prices = self._load(None if since is None else list(since))
+        merged = common_days(sentiment, prices)
+        changes = changes_between(merged)
+        correlations = rolling_correlations(changes, self.windows)
+        report_progress(observations=len(changes), rows=len(correlations))
+
+        if since is None:
+            self.session.execute(text("DELETE FROM correlation_records"))
+            tickers = sorted(set(sentiment["ticker"]) | set(stats))
+        else:
+            tickers = sorted(since)
+            for ticker, first in since.items():
+                if first is None:
+                    self.session.execute(text("DELETE FROM correlation_records WHERE ticker = :ticker"),
+                                         {"ticker": ticker})
+                else:
+                    self.session.execute(text(
+                        "DELETE FROM correlation_records WHERE ticker = :ticker AND date >= :first"
+                    ), {"ticker": ticker, "first": first})
+            # Rows before the first changed date are unaffected by the change
+            keep = [since[ticker] is None or day >= since[ticker]
+                    for ticker, day in zip(correlations["ticker"], correlations["date"])]
+            correlations = correlations[np.array(keep, dtype=bool)]
+        written = self._write_correlations(correlations)
+
+        by_ticker = dict(tuple(changes.groupby("ticker", sort=False)))
+        last_days = merged.groupby("ticker", sort=False).tail(1).set_index("ticker")
+        for ticker in tickers:
+            ticker_changes = by_ticker.get(ticker, changes.iloc[0:0])
+            sums = observation_sums(ticker_changes)
+            last = last_days.loc[ticker] if ticker in last_days.index else None
+            self._save_stats(ticker, stats.get(ticker), {
+                "last_date": last["date"] if last is not None else None,
+                "last_sentiment": float(last["sentiment_score"]) if last is not None else None,
+                "last_close": float(last["close_price"]) if last is not None else None,
+                "n": len(ticker_changes),
+                **{column: sums[name] for column, name in SUMS.items()},
+                "recent": self._dump_recent(ticker_changes),
+            })
+        return written, len(tickers)
+
+    def _can_refold(self, stats: CorrelationStats) -> bool:
+        """Whether a revision from dirty_from on lies within the buffered observations"""
+        recent = self._load_recent(stats)
+        kept = int((recent["date"] < stats.dirty_from).sum())
+        # An unchanged observation before the revision anchors the refold
+        return kept >= 1 and (kept >= self.needed or len(recent) == stats.n)
+
+    def _fold(self, stats: CorrelationStats) -> int:
+        """
+        Fold a ticker's changed days into its running sums and buffer: the days after
+        last_date, or for a revision within the buffer, every day from dirty_from on once the
+        buffered observations from that date have been taken back out of the sums.
+        """
+        n, sums = stats.n, {name: getattr(stats, column) for column, name in SUMS.items()}
+        recent = self._load_recent(stats)
+        revision = stats.dirty_from is not None and stats.dirty_from <= stats.last_date
+        if revision:
+            n, sums = unfold_changes(n, sums, recent[recent["date"] >= stats.dirty_from])
+            recent = recent[recent["date"] < stats.dirty_from].reset_index(drop=True)
+            # Reread from the last unchanged observation, which the first revised one differences against
+            sentiment, prices = self._load([stats.ticker], after=recent["date"].iloc[-1], inclusive=True)
+            merged = common_days(sentiment, prices)
+            if merged.empty or merged["date"].iloc[0] != recent["date"].iloc[-1]:
+                # The anchoring day itself is gone: fall back to the ticker's history
+                return self._recompute({stats.ticker: stats.dirty_from}, {stats.ticker: stats})[0]
+            self.session.execute(text(
+                "DELETE FROM correlation_records WHERE ticker = :ticker AND date >= :first"
+            ), {"ticker": stats.ticker, "first": stats.dirty_from})
+        else:
+            sentiment, prices = self._load([stats.ticker], after=stats.last_date)
+            anchor = pd.DataFrame([{"ticker": stats.ticker, "date": stats.last_date,
+                                    "sentiment_score": stats.last_sentiment, "close_price": stats.last_close}])
+            merged = pd.concat([anchor, common_days(sentiment, prices)], ignore_index=True)
+        if len(merged) < 2 and not revision:
+            self._save_stats(stats.ticker, stats, {})
+            return 0
+
+        changes = changes_between(merged)
+        correlations, n, sums = fold_changes(n, sums, recent, changes, self.windows)
+        written = self._write_correlations(correlations)
+
+        last = merged.iloc[-1]
+        self._save_stats(stats.ticker, stats, {
+            "last_date": last["date"],
+            "last_sentiment": float(last["sentiment_score"]),
+            "last_close": float(last["close_price"]),
+            "n": n,
+            **{column: sums[name] for column, name in SUMS.items()},
+            "recent": self._dump_recent(pd.concat([recent, changes], ignore_index=True)),
+        })
+        return written
+
+    def _dump_recent(self, changes: pd.DataFrame) -> str:
+        tail = changes.tail(self.buffer_size) if self.buffer_size else changes.iloc[0:0]
+        return json.dumps([[day.isoformat(), float(x), float(y)]
+                           for day, x, y in zip(tail["date"], tail["x"], tail["y"])])
+
+    @staticmethod
+    def _load_recent(stats: CorrelationStats) -> pd.DataFrame:
+        recent = json.loads(stats.recent or "[]")
+        return pd.DataFrame({
+            "ticker": stats.ticker,
+            "date": [date.fromisoformat(day) for day, _, _ in recent],
+            "x": [x for _, x, _ in recent],
+            "y": [y for _, _, y in recent],
+        }, columns=["ticker", "date", "x", "y"])
+
+    def _save_stats(self, ticker: str, seen: Optional[CorrelationStats], values: Dict):
+        """
+        Store a ticker's statistics, then clear its dirty mark unless a writer marked it again
+        after this update read the statistics (marks moved).
+        """
+        values = {**values, "windows": self.windows_key, "updated_at": datetime.now(timezone.utc)}
+        if seen is None:
+            # Upsert: a writer may have created the row since; its dirty mark is kept
+            bulk_upsert(self.session, CorrelationStats, [{"ticker": ticker, **values}], key_columns=("ticker",))
+            return
+        query = self.session.query(CorrelationStats).filter(CorrelationStats.ticker == ticker)
+        query.update(values, synchronize_session=False)
+        query.filter(CorrelationStats.marks == seen.marks).update({"dirty_from": None}, synchronize_session=False)
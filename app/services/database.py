@@ -2,17 +2,27 @@ from app.models import *
 from .metadata_scraper import MetadataScraper
 from .price_scraper import PriceScraper
 from .news_scraper import NewsScraper
+from .dedup import NewsDeduplicator
+from .ingestion_state import IngestionCheckpoints, IngestionWatermarks
+from .jobs import JobCancelled, report_progress
+from .correlation_stats import IncrementalCorrelation, changed_rows, mark_dirty
 from app.config import settings
 
-from sqlalchemy import create_engine
+from bson import ObjectId, json_util
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from sqlalchemy import create_engine, func
 from sqlalchemy.orm import Session
 
 from datetime import datetime, timezone, timedelta, date
 from typing import List, Dict, Optional, Union
 import logging
-import json
 import os
+import re
 
+import pandas as pd
+
+from app.models.mongo_models import ensure_indexes
 from app.models.sql_models import Base, StockPrice, CompanyMetadata, SentimentRecord, CorrelationRecord
 
 class DatabaseService:
@@ -20,12 +30,16 @@ class DatabaseService:
     def __init__(self):
         self.session = SessionLocal()
 
-    def populate_sql_metadata(self):
-        scraped_metadata = MetadataScraper().get_multiple_tickers_metadata(list(settings.CAC40_TICKERS.keys()))
+    def populate_sql_metadata(self, force_refresh: bool = False):
+        """Upsert company metadata by symbol; only tickers whose cached metadata is stale are refetched"""
+        scraped_metadata = MetadataScraper().get_multiple_tickers_metadata(
+            list(settings.CAC40_TICKERS.keys()), force_refresh=force_refresh
+        )
+        rows = []
         for data in scraped_metadata.values():
             if "error" in data:
                 continue  # Skip entries with errors
-            company_metadata = {
+            rows.append({
                 "symbol": data.get("symbol"),
                 "name": data.get("name"),
                 "sector": data.get("sector"),
@@ -35,293 +49,473 @@ class DatabaseService:
                 "address": data.get("address"),
                 "employees": data.get("employees"),
                 "website": data.get("website"),
-                "summary": data.get("summary"),
+                "summary": (data.get("summary") or "")[:1000] or None,
                 "logo_url": data.get("logo_url"),
                 "currency": data.get("currency")
-            }
-            company = CompanyMetadata(**company_metadata)
-            self.session.merge(company)  # Use merge to avoid duplicates
+            })
+        bulk_upsert(self.session, CompanyMetadata, rows, key_columns=("symbol",))
         self.session.commit()
         logging.info("SQL Metadata population complete.")
     
     def populate_sql_prices(self):
-        prices_data = PriceScraper().get_price_data(list(settings.CAC40_TICKERS.keys()))
-        for ticker, df in prices_data.items():
-            for index, row in df.iterrows():
-                stock_price = {
+        """
+        Download prices from each ticker's last stored date (inclusive, so a partial last bar
+        is refreshed) and upsert them on the unique (ticker, date) key.
+        """
+        tickers = list(settings.CAC40_TICKERS.keys())
+        last_dates = dict(
+            self.session.query(StockPrice.ticker, func.max(StockPrice.date))
+            .filter(StockPrice.ticker.in_(tickers))
+            .group_by(StockPrice.ticker)
+            .all()
+        )
+        # One download per distinct start date; after the first run all tickers usually share one
+        tickers_by_start = {}
+        for ticker in tickers:
+            start = last_dates.get(ticker)
+            tickers_by_start.setdefault(start.isoformat() if start else None, []).append(ticker)
+
+        rows_written = 0
+        for start_date, group in tickers_by_start.items():
+            if start_date is not None and start_date > date.today().isoformat():
+                continue
+            prices_data = PriceScraper().get_price_data(group, start_date=start_date)
+            for ticker, df in prices_data.items():
+                df = df.dropna(subset=["Close"])
+                if df.empty:
+                    continue
+                frame = pd.DataFrame({
                     "ticker": ticker,
-                    "date": index,
-                    "open_price": row["Open"],
-                    "high_price": row["High"],
-                    "low_price": row["Low"],
-                    "close_price": row["Close"],
-                    "volume": row["Volume"]
-                }
-                price = StockPrice(**stock_price)
-                self.session.merge(price)
+                    "date": pd.to_datetime(df.index).date,
+                    "open_price": df["Open"].to_numpy(dtype=float),
+                    "high_price": df["High"].to_numpy(dtype=float),
+                    "low_price": df["Low"].to_numpy(dtype=float),
+                    "close_price": df["Close"].to_numpy(dtype=float),
+                    "volume": df["Volume"].to_numpy(dtype=float),
+                })
+                rows = frame.astype(object).where(frame.notna(), None).to_dict("records")
+                _, first_changed = changed_rows(self.session, StockPrice, "close_price", rows)
+                mark_dirty(self.session, first_changed)
+                rows_written += bulk_upsert(self.session, StockPrice, rows, key_columns=("ticker", "date"))
+                report_progress(ticker=ticker, rows_upserted=rows_written)
         self.session.commit()
-        logging.info("SQL Prices population complete.")
+        logging.info(f"SQL Prices population complete: {rows_written} rows upserted.")
+        return {"rows_upserted": rows_written}
 
-    def populate_nosql_newsapi(self, last_n_days: int = 30):
-        tickers_data = [{"ticker": t.get("ticker"), "name": t.get("name"), "alternate_ticker": t.get("alternate_ticker")} for t in settings.CAC40_TICKERS.values()]
-        news_data = NewsScraper().scrape_newsapi(tickers_data, last_n_days=last_n_days)
-        for articles in news_data.get("articles_by_ticker", {}).values():
+    # Scraped fields refreshed on re-ingestion; everything else is only written on insert
+    SCRAPED_FIELDS = ("title", "content", "description", "source", "url", "published_at")
+
+    @staticmethod
+    def _empty_counts() -> Dict[str, int]:
+        return {"inserted": 0, "linked": 0, "duplicates": 0, "updated": 0, "skipped": 0}
+
+    @staticmethod
+    def _same_value(stored, scraped) -> bool:
+        # Mongo returns naive UTC datetimes while scrapers produce aware ones
+        if isinstance(stored, datetime) and isinstance(scraped, datetime):
+            return stored.replace(tzinfo=None) == scraped.astimezone(timezone.utc).replace(tzinfo=None)
+        return stored == scraped
+
+    def _ingest_articles(self, news_data: Dict, medium: str) -> Dict[str, int]:
+        """
+        Store scraped articles, skipping near-duplicates of articles we already have.
+
+        A near-duplicate of an article for the same ticker is not stored: it is recorded
+        in the canonical article's `duplicates` list instead. A copy filed under another
+        ticker is stored with `duplicate_of` pointing at the canonical article, so the
+        inference pipeline reuses the canonical results instead of running the models again.
+        """
+        deduplicator = NewsDeduplicator()
+        counts = self._empty_counts()
+        for ticker, articles in news_data.get("articles_by_ticker", {}).items():
             if isinstance(articles, dict) and "error" in articles:
                 continue  # Skip entries with errors
-            for article in articles:
-                news_document = NewsDocument.create(
-                    ticker=article.get("ticker"),
-                    title=article.get("title"),
-                    content=article.get("content"),
-                    medium="newsapi",
-                    source=article.get("source"),
-                    description=article.get("description"),
-                    url=article.get("url"),
-                    published_at=article.get("published_at"),
+            self._ingest_batch(articles, medium, deduplicator, counts)
+            IngestionWatermarks.advance(medium, ticker, (article.get("published_at") for article in articles))
+            report_progress(medium=medium, ticker=ticker, **counts)
+        return counts
+
+    def _known_articles(self, medium: str, keys: List[tuple], urls: Optional[List[Optional[str]]] = None) -> Dict[tuple, Optional[Dict]]:
+        """
+        Stored articles among (ticker, external_id) keys, with their scraped fields.
+        Keys recorded as same-ticker duplicates map to None. Documents stored before articles
+        had an external_id are matched on (ticker, url) instead, urls being parallel to keys.
+        """
+        if not keys:
+            return {}
+        external_ids = list({external_id for _, external_id in keys})
+        tickers = list({ticker for ticker, _ in keys})
+        known = {}
+        for doc in news_collection.find(
+            {"medium": medium, "ticker": {"$in": tickers}, "external_id": {"$in": external_ids}},
+            {field: 1 for field in ("ticker", "external_id", "relevance.dropped") + self.SCRAPED_FIELDS}
+        ):
+            known[(doc["ticker"], doc["external_id"])] = doc
+        for doc in news_collection.find(
+            {"duplicates": {"$elemMatch": {"medium": medium, "external_id": {"$in": external_ids}}}},
+            {"ticker": 1, "duplicates.medium": 1, "duplicates.external_id": 1}
+        ):
+            for duplicate in doc.get("duplicates", []):
+                if duplicate.get("medium") == medium:
+                    known.setdefault((doc["ticker"], duplicate.get("external_id")), None)
+        legacy = {(key[0], url): key for key, url in zip(keys, urls or []) if url and key not in known}
+        if legacy:
+            for doc in news_collection.find(
+                {"medium": medium, "ticker": {"$in": list({ticker for ticker, _ in legacy})},
+                 "url": {"$in": list({url for _, url in legacy})}, "external_id": {"$not": {"$type": "string"}}},
+                {field: 1 for field in ("ticker", "relevance.dropped") + self.SCRAPED_FIELDS}
+            ):
+                key = legacy.get((doc["ticker"], doc.get("url")))
+                if key is not None:
+                    known.setdefault(key, doc)
+        return known
+
+    def _ingest_batch(self, articles: List[Dict], medium: str, deduplicator: NewsDeduplicator, counts: Dict[str, int]):
+        """
+        Upsert one batch of scraped articles with a single bulk_write, accumulating into counts.
+
+        Articles are keyed by (medium, ticker, external_id). Known articles are rewritten only
+        when a scraped field changed (and re-queued for inference if their text did), so a
+        repeated run over the same window writes nothing. Near-duplicate detection
+        (see _ingest_articles) only runs for keys seen for the first time.
+        """
+        keys = [(article.get("ticker"), article.get("external_id") or article.get("url")) for article in articles]
+        keyed = [(key, article.get("url")) for article, key in zip(articles, keys) if key[1]]
+        known = self._known_articles(medium, [key for key, _ in keyed], [url for _, url in keyed])
+        operations, seen = [], set()
+        for article, key in zip(articles, keys):
+            if key[1] and key in seen:
+                counts["skipped"] += 1
+                continue
+            seen.add(key)
+
+            if key[1] and key in known:
+                stored = known[key]
+                if stored is not None and stored.get("relevance", {}).get("dropped"):
+                    counts["skipped"] += 1  # Dropped by the relevance gate: only its tombstone is kept
+                    continue
+                changes = {} if stored is None else {
+                    field: article.get(field) for field in self.SCRAPED_FIELDS
+                    if not self._same_value(stored.get(field), article.get(field))
+                }
+                if stored is not None and not stored.get("external_id"):
+                    changes["external_id"] = key[1]  # Legacy document matched on its url: claim it
+                if not changes:
+                    counts["skipped"] += 1
+                    continue
+                if "title" in changes or "content" in changes:
+                    changes["sentiment.updated_at"] = None
+                operations.append(UpdateOne({"_id": stored["_id"]}, {"$set": changes}))
+                counts["updated"] += 1
+                continue
+
+            news_document = NewsDocument.create(
+                ticker=article.get("ticker"),
+                title=article.get("title"),
+                content=article.get("content"),
+                medium=medium,
+                source=article.get("source"),
+                description=article.get("description"),
+                url=article.get("url"),
+                external_id=key[1],
+                published_at=article.get("published_at"),
+            )
+            signature, bands = deduplicator.fingerprint(news_document)
+            canonical = deduplicator.find_canonical(signature, bands)
+            if canonical is not None and canonical["ticker"] == news_document["ticker"]:
+                operations.append(UpdateOne(
+                    {"_id": canonical["_id"]},
+                    {"$addToSet": {"duplicates": {
+                        "medium": medium,
+                        "external_id": key[1],
+                        "source": news_document["source"],
+                        "url": news_document["url"],
+                        "published_at": news_document["published_at"],
+                    }}}
+                ))
+                counts["duplicates"] += 1
+                continue
+            if canonical is not None:
+                news_document["duplicate_of"] = canonical["_id"]
+                counts["linked"] += 1
+            else:
+                if signature is not None:
+                    news_document["minhash"] = signature.tolist()
+                    news_document["lsh_bands"] = bands
+                counts["inserted"] += 1
+            # The _id is assigned here so later articles of the run can reference this one
+            news_document["_id"] = ObjectId()
+            if canonical is None:
+                deduplicator.remember({"_id": news_document["_id"], "ticker": news_document["ticker"]}, signature, bands)
+            if key[1] is None:
+                operations.append(InsertOne(news_document))
+                continue
+            scraped = {field: news_document.pop(field) for field in self.SCRAPED_FIELDS}
+            identity = {field: news_document.pop(field) for field in ("medium", "ticker", "external_id")}
+            operations.append(UpdateOne(identity, {"$set": scraped, "$setOnInsert": news_document}, upsert=True))
+
+        if not operations:
+            return
+        try:
+            news_collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # A concurrent ingestion may have inserted the same key first; the rest of the batch is written
+            logging.warning(f"{medium} ingestion: {len(e.details.get('writeErrors', []))} writes rejected")
+
+    # Reddit self posts link to their own permalink, which carries the post id
+    REDDIT_PERMALINK = re.compile(r"reddit\.com/r/[^/]+/comments/(\w+)")
+
+    @classmethod
+    def _legacy_external_id(cls, doc: Dict) -> Optional[str]:
+        """The external_id ingestion assigns to an article, recovered from a legacy document's url"""
+        url = doc.get("url")
+        if not url:
+            return None
+        if doc.get("medium") == "newsapi":
+            return url
+        match = cls.REDDIT_PERMALINK.search(url)
+        return f"t3_{match.group(1)}" if match else None
+
+    def backfill_news_keys(self, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Bring documents stored before idempotent ingestion in line with it.
+
+        NewsAPI and Reddit documents without an external_id get the one ingestion assigns
+        (the URL, or t3_<id> parsed from a Reddit permalink). A document whose key is already
+        taken, by an earlier legacy copy or by a re-ingested one, is deleted. Documents left
+        without a key are matched on their url at ingestion (see _known_articles). Canonical
+        articles then get their MinHash signature and LSH bands recomputed, since signatures
+        stored before the 64-bit MinHash are not comparable with new ones.
+        """
+        if news_collection is None:
+            logging.error("MongoDB news collection is not available.")
+            return
+        counts = {"keyed": 0, "removed": 0, "unkeyed": 0, "fingerprinted": 0}
+        legacy = news_collection.find(
+            {"medium": {"$in": ["newsapi", "reddit"]}, "external_id": {"$not": {"$type": "string"}}},
+            {"medium": 1, "ticker": 1, "url": 1}
+        ).sort("_id", 1)
+        for batch in self._batches(legacy, batch_size):
+            keys = {doc["_id"]: (doc.get("medium"), doc.get("ticker"), self._legacy_external_id(doc)) for doc in batch}
+            taken = {
+                (doc["medium"], doc["ticker"], doc["external_id"])
+                for doc in news_collection.find(
+                    {"medium": {"$in": list({medium for medium, _, _ in keys.values()})},
+                     "ticker": {"$in": list({ticker for _, ticker, _ in keys.values()})},
+                     "external_id": {"$in": [key[2] for key in keys.values() if key[2]]}},
+                    {"medium": 1, "ticker": 1, "external_id": 1}
                 )
-                logging.info(f"Inserting article for ticker {article.get('ticker')}: {article.get('title')}")
-                news_collection.insert_one(news_document)
+            }
+            operations = []
+            for _id, key in keys.items():
+                if key[2] is None:
+                    counts["unkeyed"] += 1
+                elif key in taken:
+                    operations.append(DeleteOne({"_id": _id}))
+                    counts["removed"] += 1
+                else:
+                    operations.append(UpdateOne({"_id": _id}, {"$set": {"external_id": key[2]}}))
+                    taken.add(key)
+                    counts["keyed"] += 1
+            if operations:
+                news_collection.bulk_write(operations, ordered=False)
+            report_progress(**counts)
+
+        deduplicator = NewsDeduplicator()
+        canonical = news_collection.find(
+            {"duplicate_of": {"$exists": False}, "relevance.dropped": {"$ne": True}}, {"title": 1, "content": 1}
+        )
+        for batch in self._batches(canonical, batch_size):
+            operations = []
+            for doc in batch:
+                signature, bands = deduplicator.fingerprint(doc)
+                if signature is None:
+                    operations.append(UpdateOne({"_id": doc["_id"]}, {"$unset": {"minhash": "", "lsh_bands": ""}}))
+                else:
+                    operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"minhash": signature.tolist(), "lsh_bands": bands}}))
+            news_collection.bulk_write(operations, ordered=False)
+            counts["fingerprinted"] += len(operations)
+            report_progress(**counts)
+        logging.info(f"News key backfill complete: {counts}")
+        return counts
+
+    @staticmethod
+    def _batches(cursor, size: int):
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def populate_nosql_newsapi(self, last_n_days: int = 30, incremental: bool = True):
+        """Ingest NewsAPI articles; incremental runs only request what is newer than each ticker's watermark"""
+        tickers_data = [{"ticker": t.get("ticker"), "name": t.get("name"), "alternate_ticker": t.get("alternate_ticker")} for t in settings.CAC40_TICKERS.values()]
+        since = IngestionWatermarks.starts("newsapi", [t["ticker"] for t in tickers_data]) if incremental else None
+        news_data = NewsScraper().scrape_newsapi(tickers_data, last_n_days=last_n_days, since=since)
+        counts = self._ingest_articles(news_data, medium="newsapi")
+        logging.info(f"NewsAPI ingestion counts: {counts}")
         logging.info("NoSQL NewsAPI population complete.")
+        return counts
 
-    def populate_nosql_polygon(self, start_date: date, limit: int = 1000, end_date: Optional[date] = None):
-        logging.info(type(start_date))
+    def populate_nosql_polygon(self, start_date: date, limit: int = 1000, end_date: Optional[date] = None, incremental: bool = True):
+        """
+        Backfill Polygon news page by page: each page is stored as soon as it arrives and
+        the ticker's cursor is checkpointed, so an interrupted run resumes where it stopped.
+        Incremental runs start each ticker at its watermark when that is later than start_date.
+        """
         logging.info(f"Polygon start_date resolved to: {start_date}")
         if end_date is None:
             end_date = date.today()
+        if not isinstance(start_date, datetime):
+            start_date = datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc)
+
+        scraper = NewsScraper()
+        if not scraper.polygon_api_url or not scraper.polygon_api_key:
+            logging.error("POLYGON_API_URL or POLYGON_API_KEY not configured")
+            return
 
         tickers = list(settings.CAC40_TICKERS.keys())
-        news_data = NewsScraper().scrape_polygon(tickers, start_date, end_date=end_date, limit=limit)
-        for articles in news_data.get("articles_by_ticker", {}).values():
-            if isinstance(articles, dict) and "error" in articles:
-                continue  # Skip entries with errors
-            for article in articles:
-                news_document= NewsDocument.create(
-                    ticker=article.get("ticker"),
-                    title=article.get("title"),
-                    content=article.get("content"),
-                    medium="polygon",
-                    source=article.get("source"),
-                    description=article.get("description"),
-                    url=article.get("url"),
-                    published_at=article.get("published_at"),
-                )
-                news_collection.insert_one(news_document)
+        since = IngestionWatermarks.starts("polygon", tickers) if incremental else {}
+        deduplicator = NewsDeduplicator()
+        counts = {**self._empty_counts(), "pages": 0, "failed_tickers": 0}
+        for ticker in tickers:
+            ticker_start = max(start_date, since.get(ticker) or start_date)
+            resume_url = IngestionCheckpoints.resume_url("polygon", ticker, ticker_start)
+            restart, newest, failed = resume_url is None, [], False
+            for page in scraper.iter_polygon_pages(ticker, ticker_start, end_date, limit=limit, next_url=resume_url):
+                if "error" in page:
+                    # The checkpoint still points at the failed page; the next run retries from there
+                    logging.error(f"Polygon backfill for {ticker} stopped: {page['error']}")
+                    counts["failed_tickers"] += 1
+                    failed = True
+                    break
+                self._ingest_batch(page["articles"], "polygon", deduplicator, counts)
+                IngestionCheckpoints.save("polygon", ticker, ticker_start, end_date,
+                                          next_url=page["next_url"], articles=len(page["articles"]), restart=restart)
+                restart = False
+                counts["pages"] += 1
+                report_progress(medium="polygon", ticker=ticker, **counts)
+                newest.append(max((article["published_at"] for article in page["articles"] if article.get("published_at")), default=None))
+            if not failed:
+                IngestionWatermarks.advance("polygon", ticker, newest)
+        logging.info(f"Polygon ingestion counts: {counts}")
         logging.info("NoSQL Polygon population complete.")
+        return counts
             
-    def populate_nosql_reddit(self, last_n_days: int = 30, subreddits: Optional[List[str]] = None):
+    def populate_nosql_reddit(self, last_n_days: int = 30, subreddits: Optional[List[str]] = None, incremental: bool = True):
+        """Ingest Reddit posts; incremental runs only keep posts newer than each ticker's watermark"""
         tickers_data = [{"ticker": t.get("ticker"), "name": t.get("name"), "alternate_ticker": t.get("alternate_ticker")} for t in settings.CAC40_TICKERS.values()]
-        news_data = NewsScraper().scrape_reddit(tickers_data, last_n_days=last_n_days, subreddits=subreddits)
-        for articles in news_data.get("articles_by_ticker", {}).values():
-            if isinstance(articles, dict) and "error" in articles:
-                continue  # Skip entries with errors
-            for article in articles:
-                news_data = NewsDocument.create(
-                    ticker=article.get("ticker"),
-                    title=article.get("title"),
-                    content=article.get("content"),
-                    medium="reddit",
-                    source=article.get("source"),
-                    description=article.get("description"),
-                    url=article.get("url"),
-                    published_at=article.get("published_at"),
-                )
-                news_collection.insert_one(news_data)
+        since = IngestionWatermarks.starts("reddit", [t["ticker"] for t in tickers_data]) if incremental else None
+        news_data = NewsScraper().scrape_reddit(tickers_data, last_n_days=last_n_days, subreddits=subreddits, since=since)
+        counts = self._ingest_articles(news_data, medium="reddit")
+        logging.info(f"Reddit ingestion counts: {counts}")
         logging.info("NoSQL Reddit population complete.")
+        return counts
 
-    def populate_sentiment(self):
+    def populate_sentiment(self, batch_size: int = 5000):
         """
         Populate the sentiment_records table by aggregating sentiment from news articles.
         For each (date, ticker) pair, calculate the average confidence score from all articles
-        published on that date for that ticker.
+        published on that (UTC) date for that ticker.
+
+        The grouping runs as a Mongo aggregation that only reads ticker, publication time and
+        confidence; its results are streamed into bulk upserts on the (ticker, date) key.
         """
         if news_collection is None:
             logging.error("MongoDB news collection is not available.")
             return
         
-        # Query all news articles that have sentiment data
-        query = {"sentiment.confidence": {"$exists": True, "$ne": None}}
-        articles = list(news_collection.find(query))
-        
-        if not articles:
-            logging.warning("No articles with sentiment data found.")
-            return
-        
-        # Group articles by (date, ticker)
-        sentiment_by_date_ticker = {}
-        for article in articles:
-            ticker = article.get("ticker")
-            published_at = article.get("published_at")
-            confidence = article.get("sentiment", {}).get("confidence")
-            news_id = str(article.get("_id"))
-            
-            if not ticker or not published_at or confidence is None:
-                continue
-            
-            # Extract just the date part
-            if isinstance(published_at, str):
-                article_date = datetime.fromisoformat(published_at).date()
-            else:
-                article_date = published_at.date()
-            
-            key = (article_date, ticker)
-            if key not in sentiment_by_date_ticker:
-                sentiment_by_date_ticker[key] = {
-                    "confidences": [],
-                    "news_ids": []
-                }
-            
-            sentiment_by_date_ticker[key]["confidences"].append(confidence)
-            sentiment_by_date_ticker[key]["news_ids"].append(news_id)
-        
-        # Calculate average confidence for each (date, ticker) and insert into SQL
-        for (article_date, ticker), data in sentiment_by_date_ticker.items():
-            avg_confidence = sum(data["confidences"]) / len(data["confidences"])
-            
-            # Use the first news_id as a representative (or could concatenate all)
-            news_id = data["news_ids"][0] if data["news_ids"] else "unknown"
-            
-            sentiment_record = SentimentRecord(
-                ticker=ticker,
-                date=article_date,
-                sentiment_score=avg_confidence,
-                news_id=news_id
-            )
-            
-            # Use merge to avoid duplicates based on ticker and date
-            existing = self.session.query(SentimentRecord).filter_by(
-                ticker=ticker,
-                date=article_date
-            ).first()
-            
-            if existing:
-                existing.sentiment_score = avg_confidence
-                existing.news_id = news_id
-            else:
-                self.session.add(sentiment_record)
-        
+        pipeline = [
+            {"$match": {
+                "sentiment.confidence": {"$ne": None},
+                "ticker": {"$nin": [None, ""]},
+                "published_at": {"$ne": None},
+            }},
+            {"$project": {
+                "_id": 1,
+                "ticker": 1,
+                "confidence": "$sentiment.confidence",
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": {"$toDate": "$published_at"}}},
+            }},
+            {"$group": {
+                "_id": {"ticker": "$ticker", "day": "$day"},
+                "mean": {"$avg": "$confidence"},
+                "count": {"$sum": 1},
+                # Representative article of the day, as before
+                "news_id": {"$min": "$_id"},
+            }},
+        ]
+        groups, articles, changed, rows = 0, 0, 0, []
+        for group in news_collection.aggregate(pipeline, allowDiskUse=True, batchSize=batch_size):
+            rows.append({
+                "ticker": group["_id"]["ticker"],
+                "date": date.fromisoformat(group["_id"]["day"]),
+                "sentiment_score": group["mean"],
+                "news_id": str(group["news_id"]),
+            })
+            groups += 1
+            articles += group["count"]
+            if len(rows) >= batch_size:
+                changed += self._upsert_sentiment(rows)
+                rows = []
+                report_progress(pairs=groups, articles=articles, changed=changed)
+        changed += self._upsert_sentiment(rows)
         self.session.commit()
-        logging.info(f"Sentiment population complete. Processed {len(sentiment_by_date_ticker)} unique (date, ticker) pairs.")
 
-    def populate_correlation(self):
+        if not groups:
+            logging.warning("No articles with sentiment data found.")
+        logging.info(f"Sentiment population complete. Processed {groups} unique (date, ticker) pairs from {articles} articles, {changed} new or changed.")
+        return {"pairs": groups, "articles": articles, "changed": changed}
+
+    def _upsert_sentiment(self, rows: List[Dict]) -> int:
+        """Write the new or changed daily scores and mark their tickers for the correlation update"""
+        rows, first_changed = changed_rows(self.session, SentimentRecord, "sentiment_score", rows)
+        bulk_upsert(self.session, SentimentRecord, rows, key_columns=("ticker", "date"))
+        mark_dirty(self.session, first_changed)
+        return len(rows)
+
+    def populate_correlation(self, windows: Optional[List[int]] = None, full: bool = False):
         """
-        Populate the correlation_records table by calculating correlation between
-        sentiment changes and price changes for each ticker.
+        Update the correlation_records table with rolling correlations between daily
+        sentiment changes and price returns: one row per (ticker, date, window) for every
+        window in CORRELATION_WINDOWS (0 = expanding).
+
+        Only tickers whose sentiment or prices changed since the last run are touched, from
+        running per-ticker statistics (see IncrementalCorrelation); full=True recomputes all
+        tickers from scratch in one vectorized pass.
         """
-        # Get all unique tickers from sentiment records
-        tickers = self.session.query(SentimentRecord.ticker).distinct().all()
-        tickers = [t[0] for t in tickers]
-        
-        for ticker in tickers:
-            # Get sentiment data ordered by date
-            sentiment_data = self.session.query(SentimentRecord).filter_by(
-                ticker=ticker
-            ).order_by(SentimentRecord.date).all()
-            
-            # Get price data ordered by date
-            price_data = self.session.query(StockPrice).filter_by(
-                ticker=ticker
-            ).order_by(StockPrice.date).all()
-            
-            if len(sentiment_data) < 2 or len(price_data) < 2:
-                logging.warning(f"Not enough data for ticker {ticker} to calculate correlation.")
-                continue
-            
-            # Create dictionaries for easy lookup
-            sentiment_dict = {record.date: record.sentiment_score for record in sentiment_data}
-            price_dict = {record.date: record.close_price for record in price_data}
-            
-            # Find common dates and calculate changes
-            common_dates = sorted(set(sentiment_dict.keys()) & set(price_dict.keys()))
-            
-            if len(common_dates) < 2:
-                logging.warning(f"Not enough common dates for ticker {ticker} to calculate correlation.")
-                continue
-            
-            # Calculate changes for dates where we have both sentiment and price
-            sentiment_changes = []
-            price_changes = []
-            correlation_dates = []
-            
-            for i in range(1, len(common_dates)):
-                prev_date = common_dates[i - 1]
-                curr_date = common_dates[i]
-                
-                sentiment_change = sentiment_dict[curr_date] - sentiment_dict[prev_date]
-                
-                # Avoid division by zero
-                if price_dict[prev_date] == 0:
-                    continue
-                    
-                price_change = (price_dict[curr_date] - price_dict[prev_date]) / price_dict[prev_date]
-                
-                sentiment_changes.append(sentiment_change)
-                price_changes.append(price_change)
-                correlation_dates.append(curr_date)
-            
-            # Calculate correlation coefficient
-            if len(sentiment_changes) < 2 or not correlation_dates:
-                logging.warning(f"Not enough valid data points for ticker {ticker} to calculate correlation.")
-                continue
-            
-            # Simple Pearson correlation
-            n = len(sentiment_changes)
-            sum_x = sum(sentiment_changes)
-            sum_y = sum(price_changes)
-            sum_xy = sum(x * y for x, y in zip(sentiment_changes, price_changes))
-            sum_x2 = sum(x * x for x in sentiment_changes)
-            sum_y2 = sum(y * y for y in price_changes)
-            
-            numerator = n * sum_xy - sum_x * sum_y
-            denominator_x = (n * sum_x2 - sum_x * sum_x) ** 0.5
-            denominator_y = (n * sum_y2 - sum_y * sum_y) ** 0.5
-            
-            if denominator_x == 0 or denominator_y == 0:
-                correlation = 0.0
-            else:
-                correlation = numerator / (denominator_x * denominator_y)
-            
-            # Store correlation with the most recent date in the analysis
-            # This represents the correlation calculated using all available data up to this date
-            # Note: common_dates is guaranteed to have at least 2 elements due to earlier check
-            latest_date = correlation_dates[-1] if correlation_dates else common_dates[-1]
-            
-            correlation_record = CorrelationRecord(
-                ticker=ticker,
-                date=latest_date,
-                correlation_coefficient=correlation
-            )
-            
-            # Use merge to avoid duplicates
-            existing = self.session.query(CorrelationRecord).filter_by(
-                ticker=ticker,
-                date=latest_date
-            ).first()
-            
-            if existing:
-                existing.correlation_coefficient = correlation
-            else:
-                self.session.add(correlation_record)
-        
-        self.session.commit()
-        logging.info(f"Correlation population complete for {len(tickers)} tickers.")
+        return IncrementalCorrelation(self.session, windows).update(full=full)
+
     def populate_sql(self):
+        """Metadata then prices; errors are re-raised so a job running this reports them as failed"""
         try:
             self.populate_sql_metadata()
             self.populate_sql_prices()
             logging.info("SQL database population complete.")
         except Exception as e:
-            logging.error(f"Error populating SQL database: {e}")
+            if not isinstance(e, JobCancelled):
+                logging.error(f"Error populating SQL database: {e}")
             self.session.rollback()
-    def populate_nosql(self, last_n_days: int = 600, subreddits: Optional[List[str]] = None):
+            raise
+
+    def populate_nosql(self, last_n_days: int = 600, subreddits: Optional[List[str]] = None, incremental: bool = True):
+        """NewsAPI, Polygon then Reddit; errors are re-raised so a job running this reports them as failed"""
+        counts = {}
         try:
-            self.populate_nosql_newsapi(last_n_days=last_n_days)
+            counts["newsapi"] = self.populate_nosql_newsapi(last_n_days=last_n_days, incremental=incremental)
             start_date = datetime.now(timezone.utc) - timedelta(days=last_n_days)
-            self.populate_nosql_polygon(start_date=start_date, limit=1000)
-            self.populate_nosql_reddit(last_n_days=last_n_days, subreddits=subreddits)
+            counts["polygon"] = self.populate_nosql_polygon(start_date=start_date, limit=1000, incremental=incremental)
+            counts["reddit"] = self.populate_nosql_reddit(last_n_days=last_n_days, subreddits=subreddits, incremental=incremental)
             logging.info("NoSQL database population complete.")
-
+        except JobCancelled:
+            raise
         except Exception as e:
-            logging.error(f"Error populating NoSQL database: {e}")
+            logging.error(f"Error populating NoSQL database after {list(counts)}: {e}")
+            raise
+        return counts
 
     def backup_sql(self, backup_url:  Optional[str] = None):
         backup_uri = backup_url or settings.SQLITE_URL
@@ -359,39 +553,16 @@ class DatabaseService:
             # Export news collection
             if news_collection is not None:
                 news_docs = list(news_collection.find())
-                # Convert ObjectId and datetime objects to strings for JSON serialization
-                for doc in news_docs:
-                    if '_id' in doc:
-                        doc['_id'] = str(doc['_id'])
-                    # Convert datetime objects to ISO format strings
-                    for key, value in doc.items():
-                        if isinstance(value, datetime):
-                            doc[key] = value.isoformat()
-                        elif isinstance(value, dict):
-                            for subkey, subvalue in value.items():
-                                if isinstance(subvalue, datetime):
-                                    doc[key][subkey] = subvalue.isoformat()
-                
                 news_file = os.path.join(output_dir, "news.json")
-                with open(news_file, 'w', encoding='utf-8') as f:
-                    json.dump(news_docs, f, ensure_ascii=False, indent=2)
+                self._dump_documents(news_docs, news_file)
                 collections_exported.append(f"news ({len(news_docs)} documents)")
                 logging.info(f"Exported {len(news_docs)} documents from news collection")
             
             # Export company collection
             if company_collection is not None:
                 company_docs = list(company_collection.find())
-                # Convert ObjectId and datetime objects to strings for JSON serialization
-                for doc in company_docs:
-                    if '_id' in doc:
-                        doc['_id'] = str(doc['_id'])
-                    for key, value in doc.items():
-                        if isinstance(value, datetime):
-                            doc[key] = value.isoformat()
-                
                 company_file = os.path.join(output_dir, "companies.json")
-                with open(company_file, 'w', encoding='utf-8') as f:
-                    json.dump(company_docs, f, ensure_ascii=False, indent=2)
+                self._dump_documents(company_docs, company_file)
                 collections_exported.append(f"companies ({len(company_docs)} documents)")
                 logging.info(f"Exported {len(company_docs)} documents from companies collection")
             
@@ -410,6 +581,28 @@ class DatabaseService:
             logging.error(error_msg)
             raise Exception(error_msg)
 
+    @staticmethod
+    def _dump_documents(docs: List[Dict], path: str):
+        """
+        Write documents as MongoDB Extended JSON, so ObjectIds (duplicate_of) and datetimes
+        (duplicates[].published_at) at any depth survive a round trip
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json_util.dumps(docs, json_options=json_util.RELAXED_JSON_OPTIONS, ensure_ascii=False, indent=2))
+
+    @staticmethod
+    def _load_documents(path: str) -> List[Dict]:
+        """
+        Read documents written by _dump_documents, keeping their _id so references between
+        documents (duplicate_of) stay valid. _ids of older plain-JSON backups are strings.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            docs = json_util.loads(f.read())
+        for doc in docs:
+            if isinstance(doc.get('_id'), str) and ObjectId.is_valid(doc['_id']):
+                doc['_id'] = ObjectId(doc['_id'])
+        return docs
+
     def import_nosql(self, input_dir: Optional[str] = None):
         """Import MongoDB database from JSON files"""
         if input_dir is None:
@@ -428,28 +621,17 @@ class DatabaseService:
             # Import news collection
             news_file = os.path.join(input_dir, "news.json")
             if os.path.exists(news_file) and news_collection is not None:
-                with open(news_file, 'r', encoding='utf-8') as f:
-                    news_docs = json.load(f)
-                
-                # Convert ISO format strings back to datetime objects
+                news_docs = self._load_documents(news_file)
                 for doc in news_docs:
-                    # Remove _id to let MongoDB generate new ones or use existing
-                    if '_id' in doc:
-                        del doc['_id']
-                    
-                    # Convert string dates back to datetime objects
-                    if 'published_at' in doc and isinstance(doc['published_at'], str):
-                        doc['published_at'] = datetime.fromisoformat(doc['published_at'])
-                    if 'created_at' in doc and isinstance(doc['created_at'], str):
-                        doc['created_at'] = datetime.fromisoformat(doc['created_at'])
-                    
-                    # Handle nested sentiment dates
-                    if 'sentiment' in doc and isinstance(doc['sentiment'], dict):
-                        if 'updated_at' in doc['sentiment'] and isinstance(doc['sentiment']['updated_at'], str):
-                            doc['sentiment']['updated_at'] = datetime.fromisoformat(doc['sentiment']['updated_at'])
-                
-                # Drop existing collection and insert new data
-                news_collection.drop()
+                    # Backups written before Extended JSON hold dates as ISO strings
+                    for key in ('published_at', 'created_at'):
+                        if isinstance(doc.get(key), str):
+                            doc[key] = datetime.fromisoformat(doc[key])
+                    if isinstance(doc.get('sentiment'), dict) and isinstance(doc['sentiment'].get('updated_at'), str):
+                        doc['sentiment']['updated_at'] = datetime.fromisoformat(doc['sentiment']['updated_at'])
+
+                # Replace the documents; delete_many keeps the collection's indexes, which drop() would remove
+                news_collection.delete_many({})
                 if news_docs:
                     news_collection.insert_many(news_docs)
                 collections_imported.append(f"news ({len(news_docs)} documents)")
@@ -458,27 +640,20 @@ class DatabaseService:
             # Import company collection
             company_file = os.path.join(input_dir, "companies.json")
             if os.path.exists(company_file) and company_collection is not None:
-                with open(company_file, 'r', encoding='utf-8') as f:
-                    company_docs = json.load(f)
-                
-                # Convert ISO format strings back to datetime objects
+                company_docs = self._load_documents(company_file)
                 for doc in company_docs:
-                    # Remove _id to let MongoDB generate new ones
-                    if '_id' in doc:
-                        del doc['_id']
-                    
-                    if 'created_at' in doc and isinstance(doc['created_at'], str):
-                        doc['created_at'] = datetime.fromisoformat(doc['created_at'])
-                    if 'updated_at' in doc and isinstance(doc['updated_at'], str):
-                        doc['updated_at'] = datetime.fromisoformat(doc['updated_at'])
-                
-                # Drop existing collection and insert new data
-                company_collection.drop()
+                    for key in ('created_at', 'updated_at'):
+                        if isinstance(doc.get(key), str):
+                            doc[key] = datetime.fromisoformat(doc[key])
+
+                # Replace the documents; delete_many keeps the collection's indexes, which drop() would remove
+                company_collection.delete_many({})
                 if company_docs:
                     company_collection.insert_many(company_docs)
                 collections_imported.append(f"companies ({len(company_docs)} documents)")
                 logging.info(f"Imported {len(company_docs)} documents to companies collection")
             
+            ensure_indexes()
             message = f"NoSQL database imported successfully: {', '.join(collections_imported)}"
             logging.info(f"MongoDB import completed successfully from {input_dir}")
             
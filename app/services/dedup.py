@@ -0,0 +1,61 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.models import news_collection
+from app.services.minhash import MinHasher
+
+
+class NewsDeduplicator:
+    """
+    Near-duplicate lookup for articles being ingested.
+
+    Canonical articles persist their signature (`minhash`) and LSH band keys
+    (`lsh_bands`, indexed) in the news collection, which acts as the signature index.
+    Articles accepted earlier in the same ingestion run are matched from memory.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, hasher: Optional[MinHasher] = None):
+        self.threshold = settings.DEDUP_THRESHOLD if threshold is None else threshold
+        self.hasher = hasher or MinHasher()
+        self._pending: Dict[str, List[Tuple[np.ndarray, Dict]]] = {}
+
+    @staticmethod
+    def text_of(article: Dict) -> str:
+        return f"{article.get('title') or ''} {article.get('content') or ''}"
+
+    def fingerprint(self, article: Dict) -> Tuple[Optional[np.ndarray], List[str]]:
+        signature = self.hasher.signature(self.text_of(article))
+        if signature is None:
+            return None, []
+        return signature, self.hasher.band_keys(signature)
+
+    def find_canonical(self, signature: Optional[np.ndarray], bands: List[str]) -> Optional[Dict]:
+        """Most similar known article above the threshold, as {"_id", "ticker"}, or None"""
+        if signature is None:
+            return None
+        best, best_score = None, self.threshold
+        for band in bands:
+            for other_signature, ref in self._pending.get(band, []):
+                score = self.hasher.similarity(signature, other_signature)
+                if score >= best_score:
+                    best, best_score = ref, score
+        candidates = news_collection.find(
+            {"lsh_bands": {"$in": bands}}, {"minhash": 1, "ticker": 1}
+        ).limit(settings.DEDUP_MAX_CANDIDATES)
+        for candidate in candidates:
+            other_signature = np.asarray(candidate.get("minhash") or [], dtype=np.uint32)
+            if other_signature.shape != signature.shape:
+                continue
+            score = self.hasher.similarity(signature, other_signature)
+            if score >= best_score:
+                best, best_score = {"_id": candidate["_id"], "ticker": candidate.get("ticker")}, score
+        return best
+
+    def remember(self, ref: Dict, signature: Optional[np.ndarray], bands: List[str]):
+        """Register a newly accepted canonical article for the rest of this run"""
+        if signature is None:
+            return
+        for band in bands:
+            self._pending.setdefault(band, []).append((signature, ref))
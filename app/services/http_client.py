@@ -0,0 +1,141 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import settings
+
+
+class HttpClient:
+    """
+    Keep-alive HTTP client for one provider.
+
+    Requests go through a pooled requests.Session, so TLS connections are reused across
+    calls and threads. Connection errors, timeouts, 429 and 5xx responses are retried
+    with full-jitter exponential backoff, honoring Retry-After when the server sends it.
+    Latency, retries and errors are recorded per endpoint (host + path).
+    """
+
+    retry_statuses = {429, 500, 502, 503, 504}
+
+    def __init__(self,
+                 name: str,
+                 max_retries: Optional[int] = None,
+                 backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None,
+                 pool_size: Optional[int] = None,
+                 timeout: float = 15,
+                 session: Optional[requests.Session] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.name = name
+        self.max_retries = settings.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base or settings.HTTP_BACKOFF_BASE
+        self.backoff_max = backoff_max or settings.HTTP_BACKOFF_MAX
+        self.timeout = timeout
+        self.sleep = sleep
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size or settings.SCRAPER_MAX_WORKERS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._metrics: Dict[str, Dict[str, float]] = {}
+        self._metrics_lock = threading.Lock()
+
+    def _record(self, endpoint: str, latency: Optional[float] = None, retried: bool = False, failed: bool = False):
+        with self._metrics_lock:
+            stats = self._metrics.setdefault(endpoint, {
+                "requests": 0, "retries": 0, "errors": 0, "latency_total": 0.0, "latency_max": 0.0
+            })
+            if latency is not None:
+                stats["requests"] += 1
+                stats["latency_total"] += latency
+                stats["latency_max"] = max(stats["latency_max"], latency)
+            stats["retries"] += int(retried)
+            stats["errors"] += int(failed)
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(max(0.0, seconds), settings.HTTP_RETRY_AFTER_MAX)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            rate_limiter=None) -> requests.Response:
+        """GET with retries; the rate limiter is charged for every attempt. Raises the last error"""
+        endpoint = f"{urlparse(url).netloc}{urlparse(url).path}"
+        for attempt in range(self.max_retries + 1):
+            if rate_limiter:
+                rate_limiter.wait_if_needed()
+            started = time.perf_counter()
+            retry_after = None
+            try:
+                response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+                self._record(endpoint, time.perf_counter() - started)
+            else:
+                self._record(endpoint, time.perf_counter() - started)
+                if response.status_code not in self.retry_statuses:
+                    if not response.ok:
+                        self._record(endpoint, failed=True)
+                    response.raise_for_status()
+                    return response
+                error = requests.HTTPError(f"{response.status_code} from {endpoint}", response=response)
+                retry_after = self._retry_after(response)
+
+            if attempt == self.max_retries:
+                break
+            delay = retry_after if retry_after is not None else self._backoff(attempt)
+            logging.warning(f"{self.name}: {error}; retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            self._record(endpoint, retried=True)
+            self.sleep(delay)
+
+        self._record(endpoint, failed=True)
+        raise error
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        with self._metrics_lock:
+            return {
+                endpoint: {
+                    "requests": stats["requests"],
+                    "retries": stats["retries"],
+                    "errors": stats["errors"],
+                    "latency_avg_ms": round(1000 * stats["latency_total"] / stats["requests"], 1) if stats["requests"] else None,
+                    "latency_max_ms": round(1000 * stats["latency_max"], 1),
+                }
+                for endpoint, stats in self._metrics.items()
+            }
+
+
+_clients: Dict[str, HttpClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(name: str) -> HttpClient:
+    """Process-wide client per provider, so connection pools and metrics outlive scraper instances"""
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = HttpClient(name)
+        return _clients[name]
+
+
+def http_metrics() -> Dict[str, Dict]:
+    with _clients_lock:
+        clients = dict(_clients)
+    return {name: client.metrics() for name, client in clients.items()}
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from app.config import settings
+
+
+class CacheStats:
+    """Hit/miss counters of the lookups made within one InferenceCache.tracking() block"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class InferenceCache:
+    """
+    Persistent model-output cache keyed by a hash of the normalized text and the model name.
+
+    Entries live in a local SQLite file so they survive restarts and can be shared by
+    several workers. When the number of entries exceeds max_entries, the least recently
+    used ones are evicted.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.path = path or settings.INFERENCE_CACHE_PATH
+        self.max_entries = max_entries or settings.INFERENCE_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Stack of the tracking() blocks open in each thread
+        self._tracked = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS inference_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                value TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_inference_cache_last_used ON inference_cache (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Unicode-normalize and collapse whitespace so trivially different copies share a key"""
+        text = unicodedata.normalize("NFKC", text or "")
+        return " ".join(text.split())
+
+    @staticmethod
+    def make_key(text: str, model: str) -> str:
+        normalized = InferenceCache.normalize(text)
+        return hashlib.sha256(f"{model}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return the cached values for the given keys, counting hits and misses"""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM inference_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update({key: json.loads(value) for key, value in rows})
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE inference_cache SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        for stats in getattr(self._tracked, "stack", ()):
+            stats.hits += len(found)
+            stats.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, model: str, values: Dict[str, Any]):
+        """Store values computed by the given model, evicting old entries if needed"""
+        if not values:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO inference_cache (key, model, value, last_used) VALUES (?, ?, ?, ?)",
+                [(key, model, json.dumps(value), now) for key, value in values.items()]
+            )
+            self._conn.commit()
+            self._evict()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM inference_cache").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        # Evict down to 90% of capacity so we don't evict on every insert
+        excess = count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM inference_cache WHERE key IN "
+            "(SELECT key FROM inference_cache ORDER BY last_used ASC LIMIT ?)",
+            (excess,)
+        )
+        self._conn.commit()
+        logging.info(f"Evicted {excess} entries from the inference cache")
+
+    def stats(self) -> Dict[str, float]:
+        """Counters of every lookup this instance has served in the process"""
+        stats = CacheStats()
+        stats.hits, stats.misses = self.hits, self.misses
+        return stats.to_dict()
+
+    @contextmanager
+    def tracking(self) -> Iterator[CacheStats]:
+        """Count the lookups this thread makes inside the block, apart from concurrent runs"""
+        stack = self._tracked.__dict__.setdefault("stack", [])
+        stats = CacheStats()
+        stack.append(stats)
+        try:
+            yield stats
+        finally:
+            stack.remove(stats)
+
+
+_cache: Optional[InferenceCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_inference_cache() -> Optional[InferenceCache]:
+    """Shared cache instance, or None when INFERENCE_CACHE_ENABLED is off"""
+    global _cache
+    if not settings.INFERENCE_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = InferenceCache()
+    return _cache
@@ -0,0 +1,123 @@
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.models import ingestion_checkpoints_collection, ingestion_watermarks_collection
+
+
+def as_day(value) -> str:
+    """ISO day of a date/datetime, as recorded on checkpoints"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+class IngestionCheckpoints:
+    """
+    Cursor checkpoints for paginated backfills, stored in Mongo.
+
+    A checkpoint records the next page URL of an in-progress fetch for one (medium, ticker),
+    keyed by the lower bound the fetch started from: the ticker's watermark on incremental
+    runs, the requested start otherwise. It is saved after each page has been written, so
+    an interrupted backfill resumes from the first page that was not stored, whatever day
+    the next run starts on. The resumed cursor keeps the end of range it was created with;
+    anything published after it is fetched by the next incremental run, once the
+    completed backfill has moved the watermark.
+    """
+
+    @staticmethod
+    def _id(medium: str, ticker: str) -> str:
+        return f"{medium}:{ticker}"
+
+    @staticmethod
+    def resume_url(medium: str, ticker: str, since: datetime) -> Optional[str]:
+        """Cursor to continue from, or None to start from the first page"""
+        checkpoint = ingestion_checkpoints_collection.find_one({"_id": IngestionCheckpoints._id(medium, ticker)})
+        if not checkpoint or checkpoint.get("completed") or checkpoint.get("since") != since.isoformat():
+            return None
+        logging.info(f"Resuming {medium} backfill for {ticker} after {checkpoint.get('pages', 0)} pages")
+        return checkpoint.get("next_url")
+
+    @staticmethod
+    def save(medium: str, ticker: str, since: datetime, end_date: date,
+             next_url: Optional[str], articles: int, restart: bool = False):
+        """Record a stored page; next_url=None marks the backfill as completed"""
+        update = {
+            "$set": {
+                "medium": medium,
+                "ticker": ticker,
+                "since": since.isoformat(),
+                "next_url": next_url,
+                "completed": next_url is None,
+                "updated_at": datetime.now(timezone.utc),
+            },
+            "$inc": {"pages": 1, "articles": articles},
+        }
+        if restart:
+            # First page of a fresh backfill: reset the counters and record the range it covers
+            update["$set"].update({"end_date": as_day(end_date), "pages": 1, "articles": articles})
+            del update["$inc"]
+        ingestion_checkpoints_collection.update_one(
+            {"_id": IngestionCheckpoints._id(medium, ticker)}, update, upsert=True
+        )
+
+    @staticmethod
+    def status(medium: Optional[str] = None) -> Dict[str, Dict]:
+        query = {"medium": medium} if medium else {}
+        return {
+            checkpoint["_id"]: {key: value for key, value in checkpoint.items() if key != "_id"}
+            for checkpoint in ingestion_checkpoints_collection.find(query)
+        }
+
+
+class IngestionWatermarks:
+    """
+    Newest published_at ingested per (medium, ticker), stored in Mongo.
+
+    Incremental scrapes start from the watermark minus INGESTION_OVERLAP_HOURS instead of
+    the full window; the overlap catches articles indexed late by the provider, and the
+    keyed upserts make the re-fetched ones no-ops. A watermark only advances once a
+    ticker's fetch has completed, so a failed run never leaves a gap behind it.
+    """
+
+    @staticmethod
+    def _id(medium: str, ticker: str) -> str:
+        return f"{medium}:{ticker}"
+
+    @staticmethod
+    def starts(medium: str, tickers: List[str]) -> Dict[str, datetime]:
+        """Per-ticker lower bound on publication time for the next scrape (tickers without a watermark are omitted)"""
+        overlap = timedelta(hours=settings.INGESTION_OVERLAP_HOURS)
+        starts = {}
+        for watermark in ingestion_watermarks_collection.find(
+            {"_id": {"$in": [IngestionWatermarks._id(medium, ticker) for ticker in tickers]}}
+        ):
+            newest = watermark["newest_published_at"]
+            if newest.tzinfo is None:
+                newest = newest.replace(tzinfo=timezone.utc)
+            starts[watermark["ticker"]] = newest - overlap
+        return starts
+
+    @staticmethod
+    def advance(medium: str, ticker: str, published: Iterable[Optional[datetime]]):
+        """Move the watermark up to the newest of a ticker's ingested publication times"""
+        published = [value for value in published if value is not None]
+        if not published:
+            return
+        ingestion_watermarks_collection.update_one(
+            {"_id": IngestionWatermarks._id(medium, ticker)},
+            {
+                "$max": {"newest_published_at": max(published)},
+                "$set": {"medium": medium, "ticker": ticker, "updated_at": datetime.now(timezone.utc)},
+            },
+            upsert=True
+        )
+
+    @staticmethod
+    def status(medium: Optional[str] = None) -> Dict[str, Dict]:
+        query = {"medium": medium} if medium else {}
+        return {
+            watermark["_id"]: {key: value for key, value in watermark.items() if key != "_id"}
+            for watermark in ingestion_watermarks_collection.find(query)
+        }
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.config import settings
+
+_current = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when its cancellation has been requested"""
+
+
+class Job:
+    """A unit of background work with its status, progress counters and timings"""
+
+    def __init__(self, kind: str, name: str, function: Callable[[], Any], params: Optional[Dict] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.name = name
+        self.function = function
+        self.params = params or {}
+        self.status = "queued"   # queued | running | succeeded | failed | cancelled
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.cancel_requested = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def to_dict(self) -> Dict:
+        end = self.finished_at or datetime.now(timezone.utc)
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "name": self.name,
+            "params": self.params,
+            "status": self.status,
+            "cancel_requested": self.cancel_requested.is_set(),
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queued_seconds": round(((self.started_at or end) - self.created_at).total_seconds(), 3),
+            "run_seconds": round((end - self.started_at).total_seconds(), 3) if self.started_at else None,
+        }
+
+
+class JobManager:
+    """
+    In-process background job runner on a bounded thread pool, with no external broker.
+
+    Jobs of the same kind run one at a time in submission order: a job waits in its kind's
+    queue until the previous one has finished, without holding a pool thread. Cancellation
+    is cooperative: queued jobs are dropped, running jobs stop at their next
+    report_progress call.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, history_size: Optional[int] = None):
+        self.history_size = history_size or settings.JOB_HISTORY_SIZE
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or settings.JOB_MAX_WORKERS,
+                                            thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._queues: Dict[str, Deque[Job]] = {}
+        self._running_kinds = set()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, name: str, function: Callable[[], Any], params: Optional[Dict] = None) -> Job:
+        job = Job(kind, name, function, params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+            if kind in self._running_kinds:
+                self._queues.setdefault(kind, deque()).append(job)
+                return job
+            self._running_kinds.add(kind)
+        self._executor.submit(self._run, job)
+        return job
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.done]
+        # Runs outside the lock may be between their final status and finished_at
+        for job in sorted(finished, key=lambda j: j.finished_at or j.created_at)[:max(0, len(finished) - self.history_size)]:
+            del self._jobs[job.id]
+
+    def _run(self, job: Job):
+        if job.cancel_requested.is_set():
+            status = "cancelled"
+        else:
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc)
+            _current.job = job
+            status = "failed"
+            try:
+                job.result = job.function()
+                status = "succeeded"
+            except JobCancelled:
+                status = "cancelled"
+                logging.info(f"Job {job.name} ({job.id}) cancelled")
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                logging.exception(f"Job {job.name} ({job.id}) failed")
+            finally:
+                _current.job = None
+        # finished_at is set before the status makes the job done
+        job.finished_at = datetime.now(timezone.utc)
+        job.status = status
+        self._start_next(job.kind)
+
+    def _start_next(self, kind: str):
+        with self._lock:
+            queue = self._queues.get(kind)
+            while queue:
+                job = queue.popleft()
+                if not job.cancel_requested.is_set():
+                    break
+                job.finished_at = datetime.now(timezone.utc)
+                job.status = "cancelled"
+            else:
+                self._running_kinds.discard(kind)
+                return
+        self._executor.submit(self._run, job)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, kind: Optional[str] = None, status: Optional[str] = None) -> List[Job]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return sorted(
+            (job for job in jobs if (kind is None or job.kind == kind) and (status is None or job.status == status)),
+            key=lambda job: job.created_at, reverse=True
+        )
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None and not job.done:
+            job.cancel_requested.set()
+        return job
+
+    def shutdown(self):
+        """Ask running jobs to stop and drop queued ones"""
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.done:
+                    job.cancel_requested.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def current_job() -> Optional[Job]:
+    return getattr(_current, "job", None)
+
+
+def report_progress(**counters):
+    """
+    Record progress counters on the job running in this thread (no-op outside jobs),
+    and raise JobCancelled if the job has been asked to stop.
+    """
+    job = current_job()
+    if job is None:
+        return
+    job.progress.update(counters)
+    job.progress["updated_at"] = time.time()
+    if job.cancel_requested.is_set():
+        raise JobCancelled()
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = JobManager()
+    return _manager
@@ -0,0 +1,142 @@
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+import torch
+
+from app.services.nlp_tasks import NLPTasks
+
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just like more most my myself
+new no nor not now of off on once only or other our ours ourselves out over own per said same says she
+should so some such than that the their theirs them themselves then there these they this those through
+to too under until up us very via was we were what when where which while who whom why will with would
+year years you your yours yourself yourselves
+""".split())
+
+WORD_PATTERN = re.compile(r"[^\W_][\w'&.-]*[^\W_]|[^\W_]")
+
+
+class KeywordBackend:
+    """Interface for keyword extractors used by NLPTasks.summarize_into_keywords_batch"""
+    name = ""
+
+    def extract(self,
+                contents: List[str],
+                top_n: int = 5,
+                document_embeddings: Optional[List[List[float]]] = None) -> List[List[str]]:
+        raise NotImplementedError
+
+
+class BartKeywordBackend(KeywordBackend):
+    """Abstractive keywords from BART-large generation"""
+    name = "bart"
+
+    def extract(self, contents, top_n=5, document_embeddings=None):
+        return NLPTasks.generate_keywords_batch(contents, top_n=top_n)
+
+
+class ExtractiveKeywordBackend(KeywordBackend):
+    """
+    KeyBERT-style extraction: candidate n-grams from the text are embedded with MiniLM
+    and ranked by cosine similarity to the document embedding, with maximal marginal
+    relevance to avoid near-identical keywords. Output is deterministic.
+    """
+    name = "extractive"
+
+    def __init__(self, ngram_range=(1, 3), max_candidates: int = 30, diversity: float = 0.3):
+        self.ngram_range = ngram_range
+        self.max_candidates = max_candidates
+        self.diversity = diversity
+
+    def candidates(self, text: str) -> List[str]:
+        """Most frequent n-grams that neither start nor end with a stopword, ties broken by first position"""
+        words = WORD_PATTERN.findall(text or "")
+        counts: Counter = Counter()
+        first_position: Dict[str, int] = {}
+        surface: Dict[str, str] = {}
+        min_n, max_n = self.ngram_range
+        for n in range(min_n, max_n + 1):
+            for i in range(len(words) - n + 1):
+                gram = words[i:i + n]
+                first, last = gram[0].lower(), gram[-1].lower()
+                if first in STOPWORDS or last in STOPWORDS:
+                    continue
+                if len(gram) == 1 and (len(first) < 3 or first.isdigit()):
+                    continue
+                phrase = " ".join(gram)
+                key = phrase.lower()
+                counts[key] += 1
+                first_position.setdefault(key, i)
+                surface.setdefault(key, phrase)
+        ranked = sorted(counts, key=lambda key: (-counts[key], first_position[key], key))
+        return [surface[key] for key in ranked[:self.max_candidates]]
+
+    def _select(self, document: torch.Tensor, candidates: List[str], embeddings: torch.Tensor, top_n: int) -> List[str]:
+        relevance = embeddings @ document
+        similarity = embeddings @ embeddings.T
+        selected: List[int] = []
+        remaining = list(range(len(candidates)))
+        while remaining and len(selected) < top_n:
+            if selected:
+                redundancy = similarity[remaining][:, selected].max(dim=1).values
+            else:
+                redundancy = torch.zeros(len(remaining))
+            scores = (1 - self.diversity) * relevance[remaining] - self.diversity * redundancy
+            best = remaining[int(torch.argmax(scores))]
+            selected.append(best)
+            remaining.remove(best)
+        return [candidates[i] for i in selected]
+
+    def _extract_uncached(self, contents: List[str], top_n: int,
+                          document_embeddings: Optional[List[List[float]]]) -> List[List[str]]:
+        if document_embeddings is None:
+            document_embeddings = NLPTasks.generate_semantic_embedding_batch(contents)
+        candidates_per_doc = [self.candidates(content) for content in contents]
+
+        # Embed every distinct candidate of the chunk in one uncached pass; n-grams are short,
+        # so large batches stay cheap and would only crowd real documents out of the cache
+        unique_candidates = list(dict.fromkeys(c for candidates in candidates_per_doc for c in candidates))
+        if not unique_candidates:
+            return [[] for _ in contents]
+        candidate_vectors = torch.nn.functional.normalize(torch.tensor(
+            NLPTasks.generate_semantic_embedding_batch(unique_candidates, max_batch_size=256, use_cache=False)
+        ), dim=-1)
+        position = {candidate: i for i, candidate in enumerate(unique_candidates)}
+
+        keywords = []
+        for candidates, document_embedding in zip(candidates_per_doc, document_embeddings):
+            if not candidates:
+                keywords.append([])
+                continue
+            document = torch.nn.functional.normalize(torch.tensor(document_embedding), dim=-1)
+            embeddings = candidate_vectors[[position[c] for c in candidates]]
+            keywords.append(self._select(document, candidates, embeddings, top_n))
+        return keywords
+
+    def extract(self, contents, top_n=5, document_embeddings=None):
+        embedding_by_text = dict(zip(contents, document_embeddings)) if document_embeddings is not None else None
+
+        def compute(batch_contents: List[str]) -> List[List[str]]:
+            embeddings = [embedding_by_text[c] for c in batch_contents] if embedding_by_text is not None else None
+            return self._extract_uncached(batch_contents, top_n, embeddings)
+
+        return NLPTasks._cached(NLPTasks.model_key("semantic", f"keywords-extractive:{top_n}"), contents, compute)
+
+
+KEYWORD_BACKENDS: Dict[str, KeywordBackend] = {
+    backend.name: backend for backend in (ExtractiveKeywordBackend(), BartKeywordBackend())
+}
+
+
+def register_keyword_backend(backend: KeywordBackend):
+    KEYWORD_BACKENDS[backend.name] = backend
+
+
+def get_keyword_backend(name: str) -> KeywordBackend:
+    if name not in KEYWORD_BACKENDS:
+        raise ValueError(f"Unknown keyword backend '{name}', expected one of {sorted(KEYWORD_BACKENDS)}")
+    return KEYWORD_BACKENDS[name]
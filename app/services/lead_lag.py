@@ -0,0 +1,93 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from app.models import SessionLocal
+from app.services.correlation_engine import cross_correlations, trading_day_panels
+
+
+class LeadLagAnalysis:
+    """
+    Cross-correlation of daily sentiment with returns over a range of trading-day lags,
+    computed for all tickers at once and cached per input version.
+
+    The input version is a cheap fingerprint (row count, last date, value sum) of
+    sentiment_records and stock_prices, so the cache is invalidated by any repopulation.
+    """
+
+    max_cached = 8
+    _cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def input_version(session) -> str:
+        sentiment = session.execute(text(
+            "SELECT COUNT(*), MAX(date), SUM(sentiment_score) FROM sentiment_records"
+        )).fetchone()
+        prices = session.execute(text(
+            "SELECT COUNT(*), MAX(date), SUM(close_price) FROM stock_prices"
+        )).fetchone()
+        return "|".join(str(value) for value in (*sentiment, *prices))
+
+    @staticmethod
+    def _compute(session, min_lag: int, max_lag: int) -> Dict[str, Dict]:
+        connection = session.connection()
+        sentiment = pd.read_sql(text("SELECT ticker, date, sentiment_score FROM sentiment_records"), connection)
+        prices = pd.read_sql(text(
+            "SELECT ticker, date, close_price FROM stock_prices "
+            "WHERE ticker IN (SELECT DISTINCT ticker FROM sentiment_records)"
+        ), connection)
+        if sentiment.empty or prices.empty:
+            return {}
+        tickers, _, X, Y = trading_day_panels(sentiment, prices)
+        lags = np.arange(min_lag, max_lag + 1)
+        correlations, observations = cross_correlations(X, Y, lags)
+        return {
+            ticker: {
+                "lags": lags.tolist(),
+                "correlations": correlations[row].tolist(),
+                "observations": observations[row].tolist(),
+            }
+            for row, ticker in enumerate(tickers)
+        }
+
+    @staticmethod
+    def for_ticker(ticker: str, min_lag: int = -10, max_lag: int = 10, min_observations: int = 20) -> Optional[Dict]:
+        """Correlation per lag for a ticker, with the strongest lag; None when the ticker has no data"""
+        with SessionLocal() as session:
+            version = LeadLagAnalysis.input_version(session)
+            key = (min_lag, max_lag, version)
+            with LeadLagAnalysis._lock:
+                results = LeadLagAnalysis._cache.get(key)
+                if results is not None:
+                    LeadLagAnalysis._cache.move_to_end(key)
+            if results is None:
+                results = LeadLagAnalysis._compute(session, min_lag, max_lag)
+                logging.info(f"Computed lead/lag correlations for {len(results)} tickers, lags {min_lag}..{max_lag}")
+                with LeadLagAnalysis._lock:
+                    LeadLagAnalysis._cache[key] = results
+                    while len(LeadLagAnalysis._cache) > LeadLagAnalysis.max_cached:
+                        LeadLagAnalysis._cache.popitem(last=False)
+
+        series = results.get(ticker)
+        if series is None:
+            return None
+        points = [
+            {"lag": lag, "correlation": correlation if n >= min_observations else None, "observations": n}
+            for lag, correlation, n in zip(series["lags"], series["correlations"], series["observations"])
+        ]
+        candidates = [point for point in points if point["correlation"] is not None]
+        return {
+            "ticker": ticker,
+            "min_lag": min_lag,
+            "max_lag": max_lag,
+            "input_version": version,
+            # Positive lags pair sentiment with later returns: sentiment leads price
+            "best_lag": max(candidates, key=lambda point: abs(point["correlation"])) if candidates else None,
+            "lags": points,
+        }
@@ -1,6 +1,14 @@
+import json
 import logging
+import os
+import time
 from typing import List, Dict, Optional
 import yfinance as yf
+
+from app.config import settings
+from app.services.misc import run_concurrently
+
+
 class MetadataScraper:
     @staticmethod
     def get_ticker_metadata(ticker: str) -> Dict:
@@ -27,11 +35,57 @@ class MetadataScraper:
         except Exception as e:
             logging.warning(f"Error fetching metadata for {ticker}: {e}")
             return {"symbol": ticker, "error": str(e)}
+
+    @staticmethod
+    def _cache_path(ticker: str) -> str:
+        return os.path.join(settings.METADATA_CACHE_DIR, f"{ticker}.json")
+
     @staticmethod
-    def get_multiple_tickers_metadata(tickers : List[str]) -> List[Dict]:
-        """Fetch metadata for multiple tickers"""
-        results = {}
+    def _read_cache(ticker: str) -> Optional[Dict]:
+        """Cached entry as {"fetched_at", "metadata"}, or None"""
+        try:
+            with open(MetadataScraper._cache_path(ticker), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_cache(ticker: str, metadata: Dict):
+        os.makedirs(settings.METADATA_CACHE_DIR, exist_ok=True)
+        path = MetadataScraper._cache_path(ticker)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": time.time(), "metadata": metadata}, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def get_multiple_tickers_metadata(tickers: List[str],
+                                      force_refresh: bool = False,
+                                      max_workers: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Fetch metadata for multiple tickers. Entries cached on disk for less than
+        METADATA_CACHE_TTL_HOURS are reused; only stale tickers are fetched, in parallel.
+        If a refetch fails, the stale cached entry is returned instead of the error.
+        """
+        ttl_seconds = settings.METADATA_CACHE_TTL_HOURS * 3600
+        cached = {ticker: MetadataScraper._read_cache(ticker) for ticker in tickers}
+        results, stale = {}, []
         for ticker in tickers:
-            metadata = MetadataScraper.get_ticker_metadata(ticker)
+            entry = cached[ticker]
+            if not force_refresh and entry and time.time() - entry["fetched_at"] < ttl_seconds:
+                results[ticker] = entry["metadata"]
+            else:
+                stale.append(ticker)
+
+        fetched = run_concurrently(
+            MetadataScraper.get_ticker_metadata, stale, max_workers or settings.METADATA_MAX_WORKERS
+        )
+        for ticker, metadata in zip(stale, fetched):
+            if "error" not in metadata:
+                MetadataScraper._write_cache(ticker, metadata)
+            elif cached[ticker]:
+                logging.warning(f"Using stale cached metadata for {ticker}")
+                metadata = cached[ticker]["metadata"]
             results[ticker] = metadata
-        return results
\ No newline at end of file
+        logging.info(f"Company metadata: {len(tickers) - len(stale)} cached, {len(stale)} fetched")
+        return {ticker: results[ticker] for ticker in tickers}
@@ -0,0 +1,63 @@
+import hashlib
+import re
+import unicodedata
+from typing import List, Optional
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class MinHasher:
+    """
+    MinHash signatures over word 3-gram shingles, banded for locality-sensitive hashing.
+
+    Permutations come from a fixed seed so signatures stay comparable with the ones
+    already persisted in Mongo. Signatures stored before shingle hashes were widened to
+    64 bits are not comparable and have to be recomputed
+    (DatabaseService.backfill_news_keys).
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing of 64-bit shingle hashes: h(x) = ((a * x + b) mod 2^64) >> 32
+        # with odd a. The product must wrap for the permutations to differ: with 32-bit inputs
+        # and multipliers it never does, and every permutation keeps the order of x.
+        self.a = rng.integers(1, 1 << 64, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 1 << 64, size=num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def shingles(text: str, size: int = 3) -> set:
+        text = unicodedata.normalize("NFKC", text or "").lower()
+        words = TOKEN_PATTERN.findall(text)
+        if len(words) < size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(hashes, self.a) + self.b) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[str]:
+        return [
+            f"{band}:{hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8).hexdigest()}"
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the underlying shingle sets"""
+        return float(np.mean(first == second))
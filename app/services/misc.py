@@ -1,35 +1,106 @@
+import os
 import re
+import sqlite3
 import time
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import timedelta
-from typing import Optional
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 class RateLimiter:
-    """Simple rate limiter to manage API request timing"""
+    """
+    Token-bucket rate limiter whose state is persisted in a local SQLite file.
+
+    A bucket holds up to calls_limit tokens and refills at calls_limit / period_seconds
+    tokens per second. Buckets are identified by name, so every limiter named e.g.
+    "newsapi" shares one budget across threads, worker processes and restarts.
+    Each acquire runs in an IMMEDIATE transaction, which serializes concurrent callers.
+    """
     
-    def __init__(self, calls_limit: int, period_seconds: float):
+    def __init__(self, calls_limit: int, period_seconds: float, name: str = "default", path: Optional[str] = None):
         self.calls_limit = calls_limit
         self.period_seconds = period_seconds
-        self.timestamps = deque(maxlen=calls_limit)
+        self.name = name
+        self.rate = calls_limit / period_seconds
+        self.path = path or settings.RATE_LIMIT_DB
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _refilled(self, conn: sqlite3.Connection, now: float) -> float:
+        row = conn.execute("SELECT tokens, updated_at FROM rate_limit_buckets WHERE name = ?", (self.name,)).fetchone()
+        if row is None:
+            return float(self.calls_limit)
+        tokens, updated_at = row
+        return min(float(self.calls_limit), tokens + max(0.0, now - updated_at) * self.rate)
+
+    def try_acquire(self, tokens: int = 1) -> float:
+        """Take tokens if available; return 0 on success, otherwise the seconds until they will be"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            available = self._refilled(conn, now)
+            wait_time = 0.0 if available >= tokens else (tokens - available) / self.rate
+            if wait_time == 0.0:
+                available -= tokens
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (self.name, available, now)
+            )
+            conn.execute("COMMIT")
+            return wait_time
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None, tokens: int = 1) -> bool:
+        """Take tokens, waiting for the bucket to refill if blocking (up to timeout seconds)"""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            wait_time = self.try_acquire(tokens)
+            if wait_time == 0.0:
+                return True
+            if not blocking or (deadline is not None and time.time() + wait_time > deadline):
+                return False
+            # Other threads/processes may take the refilled token first, so re-check after sleeping
+            time.sleep(wait_time)
+
+    def remaining(self) -> float:
+        """Tokens currently available, without consuming any"""
+        with closing(self._connect()) as conn:
+            return self._refilled(conn, time.time())
     
     def wait_if_needed(self):
         """Wait if we've hit the rate limit"""
-        now = time.time()
-        
-        # If we haven't made enough requests yet, no need to wait
-        if len(self.timestamps) < self.calls_limit:
-            self.timestamps.append(now)
-            return
-            
-        # Check if oldest request is outside our time window
-        elapsed = now - self.timestamps[0]
-        if elapsed < self.period_seconds:
-            # Need to wait until oldest request is outside window
-            wait_time = self.period_seconds - elapsed
-            time.sleep(wait_time)
-        
-        # Add current timestamp and remove oldest if at limit
-        self.timestamps.append(time.time())
+        self.acquire(blocking=True)
+
+
+def run_concurrently(function: Callable[[T], R], items: Iterable[T], max_workers: int) -> List[R]:
+    """Apply function to every item on a bounded thread pool, returning results in input order"""
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(function, items))
 
 
 def clean_text(s: Optional[str]) -> str:
@@ -0,0 +1,202 @@
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+import logging
+import time
+
+import numpy as np
+from pymongo import ASCENDING, UpdateOne
+
+from app.config import settings
+from app.models import news_collection, company_collection
+from app.services.inference_cache import get_inference_cache
+from app.services.jobs import report_progress
+from app.services.nlp_tasks import NLPTasks
+
+
+class RelevanceGate:
+    """
+    Scores how well each article matches its ticker's company embedding.
+
+    Company embeddings from company_collection are stacked into one normalized matrix,
+    so a chunk is scored with a single matrix multiply. Articles whose ticker has no
+    company embedding are always considered relevant.
+    """
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = settings.RELEVANCE_THRESHOLD if threshold is None else threshold
+        companies = [doc for doc in company_collection.find({"embedding": {"$ne": None}}, {"symbol": 1, "embedding": 1})]
+        self.columns = {doc["symbol"]: i for i, doc in enumerate(companies)}
+        matrix = np.asarray([doc["embedding"] for doc in companies], dtype=np.float32).reshape(len(companies), -1)
+        self.matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+    def scores(self, tickers: List[Optional[str]], embeddings: List[List[float]]) -> List[Optional[float]]:
+        if not self.columns or not embeddings:
+            return [None] * len(tickers)
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        similarities = vectors @ self.matrix.T
+        return [
+            float(similarities[row, self.columns[ticker]]) if ticker in self.columns else None
+            for row, ticker in enumerate(tickers)
+        ]
+
+    def is_relevant(self, score: Optional[float]) -> bool:
+        return score is None or score >= self.threshold
+
+
+class NewsInferencePipeline:
+    """
+    Streams pending news articles through batch inference chunk by chunk.
+
+    Articles are read with keyset pagination on _id and a projection, each chunk is
+    scored with the NLPTasks batch APIs and written back with a single bulk_write.
+    Processed articles leave the pending filter, so an interrupted run resumes where
+    it stopped and memory use is bounded by the chunk size.
+    """
+
+    pending_query = {"sentiment.updated_at": None}
+    projection = {"content": 1, "ticker": 1, "duplicate_of": 1}
+
+    def __init__(self, chunk_size: Optional[int] = None, relevance_gate: Optional[bool] = None):
+        self.chunk_size = chunk_size or settings.NLP_PIPELINE_CHUNK_SIZE
+        relevance_gate = settings.RELEVANCE_GATE_ENABLED if relevance_gate is None else relevance_gate
+        self.gate = RelevanceGate() if relevance_gate else None
+        self.irrelevant = 0
+
+    def _pending_chunks(self, limit: Optional[int] = None) -> Iterator[List[Dict]]:
+        last_id = None
+        fetched = 0
+        while limit is None or fetched < limit:
+            query = dict(self.pending_query)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            size = self.chunk_size if limit is None else min(self.chunk_size, limit - fetched)
+            chunk = list(news_collection.find(query, self.projection).sort("_id", ASCENDING).limit(size))
+            if not chunk:
+                return
+            fetched += len(chunk)
+            last_id = chunk[-1]["_id"]
+            yield chunk
+
+    @staticmethod
+    def _canonical_results(articles: List[Dict]) -> Dict:
+        """Processed canonical articles for the near-duplicates in a chunk, keyed by canonical _id"""
+        canonical_ids = [article["duplicate_of"] for article in articles if article.get("duplicate_of")]
+        if not canonical_ids:
+            return {}
+        canonicals = news_collection.find(
+            {"_id": {"$in": canonical_ids}, "sentiment.label": {"$ne": None}, "embedding": {"$ne": None}},
+            {"sentiment": 1, "keywords": 1, "embedding": 1}
+        )
+        return {canonical["_id"]: canonical for canonical in canonicals}
+
+    def process_chunk(self, articles: List[Dict]) -> int:
+        """Run inference on a chunk and persist it with one bulk_write, returning the number updated"""
+        # Near-duplicates reuse their canonical article's results; they only go through the
+        # models if the canonical has none (e.g. it was gated out for its own ticker)
+        canonicals = self._canonical_results(articles)
+        copied = {i: canonicals[article["duplicate_of"]] for i, article in enumerate(articles)
+                  if article.get("duplicate_of") in canonicals}
+        to_embed = [i for i in range(len(articles)) if i not in copied]
+        contents = {i: articles[i].get("content") or "" for i in to_embed}
+
+        # Embeddings come first: the relevance gate needs them to decide what reaches FinBERT
+        embedded = NLPTasks.generate_semantic_embedding_batch([contents[i] for i in to_embed])
+        semantic_embeddings = [None] * len(articles)
+        for i, embedding in zip(to_embed, embedded):
+            semantic_embeddings[i] = embedding
+        for i, canonical in copied.items():
+            semantic_embeddings[i] = canonical["embedding"]
+
+        if self.gate is not None:
+            relevance_scores = self.gate.scores([article.get("ticker") for article in articles], semantic_embeddings)
+        else:
+            relevance_scores = [None] * len(articles)
+        relevant = [i for i in to_embed if self.gate is None or self.gate.is_relevant(relevance_scores[i])]
+
+        relevant_contents = [contents[i] for i in relevant]
+        relevant_embeddings = [semantic_embeddings[i] for i in relevant]
+        sentiment_dicts = dict(zip(relevant, NLPTasks.analyze_sentiment_batch(relevant_contents)))
+        keywords_list = dict(zip(relevant, NLPTasks.summarize_into_keywords_batch(
+            relevant_contents, document_embeddings=relevant_embeddings)))
+        for i, canonical in copied.items():
+            if self.gate is None or self.gate.is_relevant(relevance_scores[i]):
+                sentiment_dicts[i] = canonical["sentiment"]["dict"]
+                keywords_list[i] = canonical.get("keywords", [])
+
+        now = datetime.now(timezone.utc)
+        operations = []
+        for i, (article, semantic_embedding, relevance_score) in enumerate(
+                zip(articles, semantic_embeddings, relevance_scores)):
+            relevance = {"score": relevance_score, "relevant": i in sentiment_dicts}
+            if i not in sentiment_dicts:
+                self.irrelevant += 1
+                if settings.RELEVANCE_ACTION == "drop":
+                    # A tombstone rather than a delete: the ingestion key stays, so the next
+                    # scrape skips the article instead of storing and gating it again
+                    operations.append(UpdateOne(
+                        {"_id": article["_id"]},
+                        {"$set": {"relevance": {**relevance, "dropped": True}, "sentiment.updated_at": now},
+                         "$unset": {"content": "", "description": "", "embedding": "", "keywords": ""}}
+                    ))
+                    continue
+                # Tagged as processed without sentiment, so aggregations skip it and it is not retried
+                operations.append(UpdateOne(
+                    {"_id": article["_id"]},
+                    {"$set": {
+                        "relevance": relevance,
+                        "sentiment.updated_at": now,
+                        "embedding": semantic_embedding
+                    }}
+                ))
+                continue
+
+            sentiment_dict = sentiment_dicts[i]
+            sentiment_confidence = sentiment_dict.get("positive", 0) - sentiment_dict.get("negative", 0)
+            operations.append(UpdateOne(
+                {"_id": article["_id"]},
+                {"$set": {
+                    "sentiment.dict": sentiment_dict,
+                    "sentiment.label": NLPTasks.classify_sentiment(sentiment_dict),
+                    "sentiment.confidence": sentiment_confidence,
+                    "sentiment.updated_at": now,
+                    "keywords": keywords_list[i],
+                    "embedding": semantic_embedding,
+                    "relevance": relevance
+                }}
+            ))
+        if not operations:
+            return 0
+        result = news_collection.bulk_write(operations, ordered=False)
+        return result.modified_count
+
+    def run(self, limit: Optional[int] = None) -> Dict:
+        """Process pending articles (at most `limit`) and report throughput"""
+        cache = get_inference_cache()
+        with cache.tracking() if cache else nullcontext() as cache_tracking:
+            processed, skipped = 0, 0
+            started = time.perf_counter()
+
+            for chunk in self._pending_chunks(limit=limit):
+                # Articles without content stay pending; keyset pagination moves past them
+                articles = [article for article in chunk if article.get("content") or article.get("duplicate_of")]
+                skipped += len(chunk) - len(articles)
+                if articles:
+                    processed += self.process_chunk(articles)
+                elapsed = time.perf_counter() - started
+                logging.info(f"Processed {processed} articles ({processed / elapsed:.1f} articles/s), "
+                             f"skipped {skipped}, irrelevant {self.irrelevant}")
+                report_progress(processed=processed, skipped=skipped, irrelevant=self.irrelevant)
+
+        elapsed = time.perf_counter() - started
+        cache_stats = cache_tracking.to_dict() if cache_tracking else None
+        logging.info(f"News sentiment analysis complete for {processed} articles in {elapsed:.1f}s, cache: {cache_stats}")
+        return {
+            "processed": processed,
+            "skipped": skipped,
+            "irrelevant": self.irrelevant,
+            "elapsed_seconds": round(elapsed, 3),
+            "articles_per_second": round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+            "cache": cache_stats
+        }
@@ -1,11 +1,14 @@
 from app.config import settings
-from app.services.misc import RateLimiter, clean_text, clean_company_name, REDDIT_RATE_LIMIT, NEWSAPI_RATE_LIMIT, POLYGON_RATE_LIMIT
+from app.services.http_client import HttpClient, get_http_client
+from app.services.misc import RateLimiter, clean_text, clean_company_name, run_concurrently, REDDIT_RATE_LIMIT, NEWSAPI_RATE_LIMIT, POLYGON_RATE_LIMIT
 
 import requests
 import logging
+import re
 import praw
+import threading
 from datetime import datetime, timezone, timedelta, date
-from typing import List, Dict, Optional, Union
+from typing import Iterator, List, Dict, Optional, Union
 
 class NewsScraper:
     """News scraper for Reddit, NewsAPI and Polygon"""
@@ -23,28 +26,32 @@ class NewsScraper:
     ]
     
     def __init__(self):
-        # Initialize rate limiters
+        # Initialize rate limiters; their budgets persist across scraper instances and restarts
         self.reddit_limiter = RateLimiter(
             calls_limit=REDDIT_RATE_LIMIT["calls"],
-            period_seconds=REDDIT_RATE_LIMIT["period"]
+            period_seconds=REDDIT_RATE_LIMIT["period"],
+            name="reddit"
         )
         self.newsapi_limiter = RateLimiter(
             calls_limit=NEWSAPI_RATE_LIMIT["calls"],
-            period_seconds=NEWSAPI_RATE_LIMIT["period"]
+            period_seconds=NEWSAPI_RATE_LIMIT["period"],
+            name="newsapi"
         )
         self.polygon_limiter = RateLimiter(
             calls_limit=POLYGON_RATE_LIMIT["calls"],
-            period_seconds=POLYGON_RATE_LIMIT["period"]
+            period_seconds=POLYGON_RATE_LIMIT["period"],
+            name="polygon"
         )
 
-        # Configure Reddit client
-        self.reddit = praw.Reddit(
-            client_id=settings.REDDIT_CLIENT_ID,
-            client_secret=settings.REDDIT_CLIENT_SECRET,
-            user_agent=settings.REDDIT_USER_AGENT,
-            ratelimit_seconds=5,
-            check_for_async=False
-        )
+        # Pooled keep-alive HTTP clients, shared process-wide per provider
+        self.newsapi_client = get_http_client("newsapi")
+        self.polygon_client = get_http_client("polygon")
+
+        # Reddit clients are created per thread: PRAW instances are not thread-safe
+        self._reddit_clients = threading.local()
+
+        # Tickers scraped in parallel per provider; each provider's limiter still bounds the request rate
+        self.max_workers = settings.SCRAPER_MAX_WORKERS
         
         # API URLs and keys
         self.news_api_url = settings.NEWS_API_URL
@@ -52,27 +59,235 @@ class NewsScraper:
         self.polygon_api_url = settings.POLYGON_API_URL
         self.polygon_api_key = settings.POLYGON_API_KEY
 
+    @property
+    def reddit(self) -> praw.Reddit:
+        """Reddit client for the current thread"""
+        client = getattr(self._reddit_clients, "client", None)
+        if client is None:
+            client = praw.Reddit(
+                client_id=settings.REDDIT_CLIENT_ID,
+                client_secret=settings.REDDIT_CLIENT_SECRET,
+                user_agent=settings.REDDIT_USER_AGENT,
+                ratelimit_seconds=5,
+                check_for_async=False
+            )
+            self._reddit_clients.client = client
+        return client
+
+    def rate_limit_status(self) -> Dict[str, Dict]:
+        """Remaining request budget per provider"""
+        return {
+            limiter.name: {
+                "remaining": round(limiter.remaining(), 2),
+                "limit": limiter.calls_limit,
+                "period_seconds": limiter.period_seconds
+            }
+            for limiter in (self.reddit_limiter, self.newsapi_limiter, self.polygon_limiter)
+        }
+
+    def _collect(self, scrape_one, items: List, max_workers: Optional[int] = None) -> Dict:
+        """Scrape every (ticker, item) concurrently and merge the per-ticker results in input order"""
+        results = {
+            "total_articles": 0,
+            "tickers_processed": [],
+            "articles_by_ticker": {}
+        }
+        outcomes = run_concurrently(lambda pair: scrape_one(pair[1]), items, max_workers or self.max_workers)
+        for (ticker, _), articles in zip(items, outcomes):
+            results["articles_by_ticker"][ticker] = articles
+            if isinstance(articles, dict) and "error" in articles:
+                continue
+            results["tickers_processed"].append(ticker)
+            results["total_articles"] += len(articles)
+        return results
+
     def _make_api_request(self, url: str, params: Dict, headers: Dict = None, 
-                         rate_limiter: RateLimiter = None) -> Dict:
-        """Make an API request with rate limiting and error handling"""
-        if rate_limiter:
-            rate_limiter.wait_if_needed()
-            
+                         rate_limiter: RateLimiter = None, client: HttpClient = None) -> Dict:
+        """Make an API request with rate limiting, retries and error handling"""
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=15)
-            response.raise_for_status()
+            response = (client or get_http_client("default")).get(
+                url, params=params, headers=headers, rate_limiter=rate_limiter
+            )
             return response.json()
-        except requests.RequestException as e:
+        except (requests.RequestException, ValueError) as e:
             logging.error(f"API request failed: {url} - {str(e)}")
             return {"error": str(e)}
 
+    @staticmethod
+    def _reddit_row(post, created: datetime, ticker: Optional[str], company_name: str, subreddit: str) -> Dict:
+        """A Reddit post in the article shape expected by NewsDocument"""
+        pid = f"t3_{post.id}"
+        return {
+            "ticker": ticker,
+            "company": company_name,
+            "subreddit": subreddit,
+            "source": f"r/{subreddit}",
+            "published_at": created,
+            "id": pid,
+            "external_id": pid,
+            "title": clean_text(post.title),  # Using imported clean_text function
+            "content": clean_text(post.selftext),
+            "url": getattr(post, "url", None)
+        }
+
+    @staticmethod
+    def _reddit_time_filter(min_ts: datetime) -> str:
+        """Narrowest Reddit search time_filter that still covers posts since min_ts"""
+        age = datetime.now(timezone.utc) - min_ts
+        for time_filter, span in (("day", timedelta(days=1)), ("week", timedelta(weeks=1)),
+                                  ("month", timedelta(days=31)), ("year", timedelta(days=365))):
+            if age <= span:
+                return time_filter
+        return "all"
+
+    @staticmethod
+    def _reddit_query_groups(companies: List[Dict]) -> List[List[Dict]]:
+        """Split companies into OR-ed search queries that fit Reddit's query length limit"""
+        groups, current, length = [], [], 0
+        for company in companies:
+            clause = f'"{company["search_term"]}"'
+            if current and length + len(clause) + 4 > settings.REDDIT_QUERY_MAX_CHARS:
+                groups.append(current)
+                current, length = [], 0
+            current.append(company)
+            length += len(clause) + 4
+        if current:
+            groups.append(current)
+        return groups
+
+    def _search_reddit_group(self, subreddits: List[str], companies: List[Dict], min_ts: datetime) -> Dict[str, List[Dict]]:
+        """
+        One search over subreddits joined as a multireddit for several companies at once.
+        Posts are routed to every company whose name appears in the title or body.
+        A search that returns its full limit without reaching min_ts was cut off, so the group
+        is split (companies first, then subreddits) and searched again; a single company in a
+        single subreddit that still overflows is reported as an error so its watermark stays put.
+        """
+        query = " OR ".join(f'"{company["search_term"]}"' for company in companies)
+        self.reddit_limiter.wait_if_needed()
+        routed = {company["ticker"]: [] for company in companies}
+        returned, reached_min_ts = 0, False
+        for post in self.reddit.subreddit("+".join(subreddits)).search(
+            query, sort="new", time_filter=self._reddit_time_filter(min_ts), limit=settings.REDDIT_SEARCH_LIMIT
+        ):
+            returned += 1
+            created = datetime.fromtimestamp(post.created_utc, tz=timezone.utc)
+            if created < min_ts:
+                reached_min_ts = True
+                break  # Results are newest first
+            text = f"{post.title}\n{post.selftext}"
+            subreddit = getattr(post.subreddit, "display_name", None) or str(post.subreddit)
+            for company in companies:
+                if created >= company["min_ts"] and company["pattern"].search(text):
+                    routed[company["ticker"]].append(
+                        self._reddit_row(post, created, company["ticker"], company["name"], subreddit)
+                    )
+        if reached_min_ts or returned < settings.REDDIT_SEARCH_LIMIT:
+            return routed
+
+        if len(companies) > 1:
+            halves = [(subreddits, companies[:len(companies) // 2]), (subreddits, companies[len(companies) // 2:])]
+        elif len(subreddits) > 1:
+            halves = [(subreddits[:len(subreddits) // 2], companies), (subreddits[len(subreddits) // 2:], companies)]
+        else:
+            error = f"Reddit search for {query} in r/{subreddits[0]} hit the {settings.REDDIT_SEARCH_LIMIT} post limit"
+            logging.warning(error)
+            return {company["ticker"]: {"error": error} for company in companies}
+
+        logging.info(f"Reddit search over {len(subreddits)} subreddits for {len(companies)} companies "
+                     f"hit the {settings.REDDIT_SEARCH_LIMIT} post limit; splitting it")
+        routed = {company["ticker"]: [] for company in companies}
+        for sub_group, group in halves:
+            outcome = self._search_reddit_group(sub_group, group, min(company["min_ts"] for company in group))
+            for ticker, rows in outcome.items():
+                if isinstance(routed[ticker], dict):
+                    continue
+                if isinstance(rows, dict):
+                    routed[ticker] = rows
+                    continue
+                routed[ticker].extend(rows)
+        return routed
+
+    def scrape_reddit_batched(self,
+                              tickers_data: List[Dict],
+                              last_n_days: int = 30,
+                              subreddits: Optional[List[str]] = None,
+                              max_workers: Optional[int] = None,
+                              since: Optional[Dict[str, datetime]] = None) -> Dict:
+        """
+        Scrape Reddit with a few combined searches instead of one per (subreddit, company):
+        subreddits are queried together as a+b+c and company names are OR-ed into queries
+        of bounded length, then each post is matched back to its companies locally.
+        """
+        subs = subreddits or self.SUBREDDITS_TO_SCRAPE
+        window_start = datetime.now(timezone.utc) - timedelta(days=max(1, last_n_days))
+        companies = []
+        for ticker_info in tickers_data:
+            name = ticker_info.get("name", "")
+            if not name:
+                logging.warning(f"No company name found for ticker {ticker_info.get('ticker')}")
+                continue
+            search_term = clean_company_name(name) or name
+            companies.append({
+                "ticker": ticker_info["ticker"],
+                "name": name,
+                "search_term": search_term,
+                "pattern": re.compile(rf"(?<!\w){re.escape(search_term)}(?!\w)", re.IGNORECASE),
+                "min_ts": max(window_start, (since or {}).get(ticker_info["ticker"]) or window_start),
+            })
+
+        sub_groups = [subs[i:i + settings.REDDIT_SUBREDDITS_PER_QUERY]
+                      for i in range(0, len(subs), settings.REDDIT_SUBREDDITS_PER_QUERY)]
+        searches = [(sub_group, group) for sub_group in sub_groups for group in self._reddit_query_groups(companies)]
+        logging.info(f"Searching Reddit for {len(companies)} companies with {len(searches)} combined searches")
+
+        def search(pair):
+            sub_group, group = pair
+            try:
+                return self._search_reddit_group(sub_group, group, min(company["min_ts"] for company in group))
+            except Exception as e:
+                logging.warning(f"Error in combined Reddit search over {len(sub_group)} subreddits: {e}")
+                return {company["ticker"]: {"error": str(e)} for company in group}
+
+        routed = {company["ticker"]: [] for company in companies}
+        for outcome in run_concurrently(search, searches, max_workers or self.max_workers):
+            for ticker, rows in outcome.items():
+                if isinstance(routed[ticker], dict):
+                    continue
+                if isinstance(rows, dict):
+                    # A failed search leaves the ticker incomplete, so its watermark must not move
+                    routed[ticker] = rows
+                    continue
+                routed[ticker].extend(rows)
+
+        results = {
+            "total_articles": 0,
+            "tickers_processed": [],
+            "articles_by_ticker": {}
+        }
+        for ticker, rows in routed.items():
+            if isinstance(rows, list):
+                unique = {row["id"]: row for row in sorted(rows, key=lambda r: r["published_at"])}
+                rows = sorted(unique.values(), key=lambda r: r["published_at"], reverse=True)
+                results["tickers_processed"].append(ticker)
+                results["total_articles"] += len(rows)
+            results["articles_by_ticker"][ticker] = rows
+        return results
+
     def scrape_reddit_single(self, 
                             ticker_data: dict, 
                             last_n_days: int = 30, 
-                            subreddits: Optional[List[str]] = None) -> List[Dict]:
-        """Scrape Reddit for a single ticker"""
+                            subreddits: Optional[List[str]] = None,
+                            since: Optional[datetime] = None) -> Union[List[Dict], Dict]:
+        """
+        Scrape Reddit for a single ticker, keeping posts newer than the window start (or since, if later).
+        A subreddit search that returns REDDIT_SEARCH_LIMIT posts without reaching that bound
+        was cut off: the ticker is reported as an error so its watermark stays put.
+        """
         subs = subreddits or self.SUBREDDITS_TO_SCRAPE
         min_ts = datetime.now(timezone.utc) - timedelta(days=max(1, last_n_days))
+        if since is not None:
+            min_ts = max(min_ts, since)
         
         # Use only the company name, cleaned of corporate suffixes
         company_name = ticker_data.get("name", "")
@@ -97,29 +312,30 @@ class NewsScraper:
                 
                 logging.debug(f"Searching r/{sub} for '{search_term}'")
                 
-                for post in self.reddit.subreddit(sub).search(search_term, sort="new"):
+                returned, reached_min_ts = 0, False
+                for post in self.reddit.subreddit(sub).search(
+                    search_term, sort="new", time_filter=self._reddit_time_filter(min_ts), limit=settings.REDDIT_SEARCH_LIMIT
+                ):
+                    returned += 1
                     created = datetime.fromtimestamp(post.created_utc, tz=timezone.utc)
                     if created < min_ts:
-                        continue
+                        reached_min_ts = True
+                        break  # Results are newest first
 
                     pid, url = f"t3_{post.id}", getattr(post, "url", None)
                     if pid in seen_ids or (url and url in seen_urls):
                         continue
 
-                    rows.append({
-                        "company": company_name,
-                        "subreddit": sub,
-                        "created_utc": created,
-                        "id": pid,
-                        "title": clean_text(post.title),  # Using imported clean_text function
-                        "text": clean_text(post.selftext),
-                        "url": url
-                    })
+                    rows.append(self._reddit_row(post, created, ticker_data.get("ticker"), company_name, sub))
                     seen_ids.add(pid)
                     if url:
                         seen_urls.add(url)
                         
                 logging.debug(f"Found {len([r for r in rows if r['subreddit'] == sub])} posts in r/{sub}")
+                if not reached_min_ts and returned >= settings.REDDIT_SEARCH_LIMIT:
+                    error = f"Reddit search for '{search_term}' in r/{sub} hit the {settings.REDDIT_SEARCH_LIMIT} post limit"
+                    logging.warning(error)
+                    return {"error": error}
             except Exception as e:
                 logging.warning(f"Error scraping Reddit for '{search_term}' in subreddit '{sub}': {e}")
                 continue
@@ -129,10 +345,10 @@ class NewsScraper:
             return []
 
         # Sort and deduplicate results
-        rows.sort(key=lambda x: x["created_utc"], reverse=True)
+        rows.sort(key=lambda x: x["published_at"], reverse=True)
         out, seen = [], set()
         for r in rows:
-            key = (r.get("url"), r["id"], r.get("text"))
+            key = (r.get("url"), r["id"], r.get("content"))
             if key not in seen:
                 seen.add(key)
                 out.append(r)
@@ -143,116 +359,169 @@ class NewsScraper:
     def scrape_reddit(self, 
                      tickers_data: List[Dict], 
                      last_n_days: int = 30, 
-                     subreddits: Optional[List[str]] = None) -> Dict:
-        """Scrape Reddit for multiple tickers"""
-        results = {
-            "total_articles": 0,
-            "tickers_processed": [],
-            "articles_by_ticker": {}
-        }
-        
+                     subreddits: Optional[List[str]] = None,
+                     max_workers: Optional[int] = None,
+                     since: Optional[Dict[str, datetime]] = None,
+                     batched: Optional[bool] = None) -> Dict:
+        """
+        Scrape Reddit for multiple tickers; since maps tickers to per-ticker lower bounds.
+        Uses combined searches (scrape_reddit_batched) unless batched is False.
+        """
         subs = subreddits or self.SUBREDDITS_TO_SCRAPE
-        for ticker_info in tickers_data:
-            ticker = ticker_info["ticker"]
-            articles = self.scrape_reddit_single(ticker_info, last_n_days=last_n_days, subreddits=subs)
-            
-            results["total_articles"] += len(articles)
-            results["tickers_processed"].append(ticker)
-            results["articles_by_ticker"][ticker] = articles
-            
-        return results
+        if settings.REDDIT_BATCHED_SEARCH if batched is None else batched:
+            return self.scrape_reddit_batched(tickers_data, last_n_days=last_n_days, subreddits=subs,
+                                              max_workers=max_workers, since=since)
+        return self._collect(
+            lambda ticker_info: self.scrape_reddit_single(
+                ticker_info, last_n_days=last_n_days, subreddits=subs, since=(since or {}).get(ticker_info["ticker"])
+            ),
+            [(ticker_info["ticker"], ticker_info) for ticker_info in tickers_data],
+            max_workers=max_workers
+        )
+
+    NEWSAPI_PAGE_SIZE = 100
 
-    def scrape_newsapi(self, tickers_data: List[Dict], last_n_days: int = 30) -> Dict:
-        """Scrape NewsAPI for ticker information"""
+    def _scrape_newsapi_ticker(self, ticker_info: Dict, from_date: str, headers: Dict) -> Union[List[Dict], Dict]:
+        """
+        Every article since from_date, newest first. Pages are read until totalResults is
+        reached; when the plan's NEWSAPI_MAX_RESULTS cap stops paging first, the query is
+        repeated with "to" set to the oldest article seen so far. Any failure returns an
+        error, so the ticker's watermark does not move past articles that were not fetched.
+        """
+        ticker = ticker_info.get("ticker", "")
+        company_name = ticker_info.get("name", "")
+        alternate_ticker = ticker_info.get("alternate_ticker", "")
+        
+        query = f"{ticker} OR {company_name}" 
+        if alternate_ticker:
+            query = f"{ticker} OR {company_name} OR {alternate_ticker}"
+
+        articles, to_date = {}, None
+        while True:
+            page, seen, oldest = 1, 0, None
+            while True:
+                params = {
+                    "q": query,
+                    "from": from_date,
+                    "sortBy": "publishedAt",
+                    "language": "en",
+                    "pageSize": self.NEWSAPI_PAGE_SIZE,
+                    "page": page,
+                }
+                if to_date:
+                    params["to"] = to_date
+
+                # Apply rate limiting
+                data = self._make_api_request(
+                    url=self.news_api_url, 
+                    params=params,
+                    headers=headers,
+                    rate_limiter=self.newsapi_limiter,
+                    client=self.newsapi_client
+                )
+                
+                if "error" in data:
+                    return {"error": data["error"]}
+
+                batch = data.get("articles", [])
+                seen += len(batch)
+                for article in batch:
+                    articles.setdefault(article.get("url") or len(articles), article)
+                    if article.get("publishedAt") and (oldest is None or article["publishedAt"] < oldest):
+                        oldest = article["publishedAt"]
+                if not batch or seen >= data.get("totalResults", 0):
+                    return [self._newsapi_row(ticker, article) for article in articles.values()]
+                if (page + 1) * self.NEWSAPI_PAGE_SIZE > settings.NEWSAPI_MAX_RESULTS:
+                    break
+                page += 1
+
+            if oldest is None or oldest == to_date:
+                return {"error": f"NewsAPI results for {ticker} exceed {settings.NEWSAPI_MAX_RESULTS} at {to_date}"}
+            to_date = oldest  # Inclusive: articles at that instant come back and are deduplicated by URL
+
+    @staticmethod
+    def _newsapi_row(ticker: str, article: Dict) -> Dict:
+        return {
+            "ticker": ticker,
+            "title": clean_text(article.get("title", "")),
+            "source": article.get("source", {}).get("name", "unknown"),
+            "content": clean_text(article.get("content", "")),
+            "description": clean_text(article.get("description", "")),
+            "url": article.get("url", None),
+            # NewsAPI has no article id; the URL identifies the article
+            "external_id": article.get("url", None),
+            "published_at": datetime.fromisoformat(article["publishedAt"].replace("Z", "+00:00"))
+            if "publishedAt" in article else None
+        }
+
+    def scrape_newsapi(self,
+                       tickers_data: List[Dict],
+                       last_n_days: int = 30,
+                       max_workers: Optional[int] = None,
+                       since: Optional[Dict[str, datetime]] = None) -> Dict:
+        """
+        Scrape NewsAPI for ticker information, several tickers in flight at once.
+        since maps tickers to a later lower bound on publication time than the window start.
+        """
         if not self.news_api_url or not self.news_api_key:
             return {"error": "NEWS_API_URL or NEWS_API_KEY not configured"}
 
         # NewsAPI free tier allows max 30 days lookback
         last_n_days = max(1, min(last_n_days, 30))
-        
-        results = {
-            "total_articles": 0,
-            "tickers_processed": [],
-            "articles_by_ticker": {}
-        }
+        window_start = datetime.now(timezone.utc) - timedelta(days=last_n_days)
+
+        def from_date(ticker: str) -> str:
+            start = max(window_start, (since or {}).get(ticker) or window_start)
+            return start.strftime("%Y-%m-%dT%H:%M:%S")
 
         headers = {
             "Authorization": f"Bearer {self.news_api_key}"
         }
 
-        for ticker_info in tickers_data:
-            ticker = ticker_info.get("ticker", "")
-            company_name = ticker_info.get("name", "")
-            alternate_ticker = ticker_info.get("alternate_ticker", "")
-            
-            query = f"{ticker} OR {company_name}" 
-            if alternate_ticker:
-                query = f"{ticker} OR {company_name} OR {alternate_ticker}"
-                
-            params = {
-                "q": query,
-                "from": (datetime.now(timezone.utc) - timedelta(days=last_n_days)).date().isoformat(),
-                "sortBy": "relevancy",
-                "language": "en",
-                "pageSize": 100,
-            }
-            
-            # Apply rate limiting
-            data = self._make_api_request(
-                url=self.news_api_url, 
-                params=params,
-                headers=headers,
-                rate_limiter=self.newsapi_limiter
-            )
-            
-            if "error" in data:
-                results["articles_by_ticker"][ticker] = {"error": data["error"]}
-                continue
-                
-            articles = data.get("articles", [])
-            processed_articles = []
-            
-            for article in articles:
-                processed_article = {
-                    "ticker": ticker,
-                    "title": clean_text(article.get("title", "")),
-                    "source": article.get("source", {}).get("name", "unknown"),
-                    "content": clean_text(article.get("content", "")),
-                    "description": clean_text(article.get("description", "")),
-                    "url": article.get("url", None),
-                    "published_at": datetime.fromisoformat(article["publishedAt"].replace("Z", "+00:00"))
-                    if "publishedAt" in article else None
-                }
-                processed_articles.append(processed_article)
-            
-            # Add the processed articles to results
-            results["articles_by_ticker"][ticker] = processed_articles
-            results["tickers_processed"].append(ticker)
-            results["total_articles"] += len(processed_articles)
-            
-        return results
+        return self._collect(
+            lambda ticker_info: self._scrape_newsapi_ticker(ticker_info, from_date(ticker_info.get("ticker", "")), headers),
+            [(ticker_info.get("ticker", ""), ticker_info) for ticker_info in tickers_data],
+            max_workers=max_workers
+        )
 
-    def scrape_polygon(self, 
-                      tickers: List[str], 
-                      start_date: date, 
-                      end_date: Optional[date] = None, 
-                      limit: int = 1000) -> Dict:
-        """Scrape Polygon.io API for news"""
-        results = {
-            "total_articles": 0,
-            "tickers_processed": [],
-            "articles_by_ticker": {}
+    @staticmethod
+    def _process_polygon_article(article: Dict, ticker: str) -> Dict:
+        insights = article.get("insights", [])
+        matching_insight = next(
+            (insight for insight in insights if insight.get("ticker") == ticker), 
+            None
+        ) 
+
+        return {
+            "ticker": ticker,
+            "title": clean_text(article.get("title", "")),
+            "source": article.get("publisher", {}).get("homepage_url", "unknown"),
+            "content": clean_text(article.get("description", "")),
+            "description": clean_text(matching_insight.get("sentiment_reasoning", "")) if matching_insight else "",
+            "url": article.get("url", None),
+            "external_id": article.get("id", None),
+            "keywords": matching_insight.get("keywords", []) if matching_insight else [],
+            "published_at": datetime.fromisoformat(article["published_utc"].replace("Z", "+00:00"))
+            if "published_utc" in article else None
         }
-        if not self.polygon_api_url or not self.polygon_api_key:
-            return {"error": "POLYGON_API_URL or POLYGON_API_KEY not configured"}
-            
+
+    def iter_polygon_pages(self,
+                           ticker: str,
+                           start_date: date,
+                           end_date: date,
+                           limit: int = 1000,
+                           next_url: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yield Polygon news pages for a ticker as {"articles", "next_url"}, following the
+        next_url cursor until the date range is exhausted. Pass a saved next_url to resume
+        a paginated fetch. A failed request yields {"error": ...} and ends the iteration.
+        """
         headers = {
             "Authorization": f"Bearer {self.polygon_api_key}"
         }
-
-        end_date = end_date or date.today()
-
-        for ticker in tickers:
+        url, params = next_url, None
+        if url is None:
+            url = self.polygon_api_url
             params = {
                 "ticker": ticker,
                 "published_utc.gte": start_date.isoformat(),
@@ -261,44 +530,50 @@ class NewsScraper:
                 "order": "desc",
                 "limit": min(1000, limit),
             }
-            
-            # Apply rate limiting
+
+        while url:
+            # The cursor URL already carries the query, so params are only sent on the first page
             data = self._make_api_request(
-                url=self.polygon_api_url,
+                url=url,
                 params=params,
                 headers=headers,
-                rate_limiter=self.polygon_limiter
+                rate_limiter=self.polygon_limiter,
+                client=self.polygon_client
             )
-            
             if "error" in data:
-                results["articles_by_ticker"][ticker] = {"error": data["error"]}
-                continue
-            
-            articles = data.get("results", [])
-            processed_articles = []
-            
-            for article in articles:
-                insights = article.get("insights", [])
-                matching_insight = next(
-                    (insight for insight in insights if insight.get("ticker") == ticker), 
-                    None
-                ) 
-
-                processed_article = {
-                    "ticker": ticker,
-                    "title": clean_text(article.get("title", "")),
-                    "source": article.get("publisher", {}).get("homepage_url", "unknown"),
-                    "content": clean_text(article.get("description", "")),
-                    "description": clean_text(matching_insight.get("sentiment_reasoning", "")) if matching_insight else "",
-                    "url": article.get("url", None),
-                    "keywords": matching_insight.get("keywords", []) if matching_insight else [],
-                    "published_at": datetime.fromisoformat(article["published_utc"].replace("Z", "+00:00"))
-                    if "published_utc" in article else None
-                }
-                processed_articles.append(processed_article)
+                yield {"error": data["error"]}
+                return
+            url, params = data.get("next_url"), None
+            yield {
+                "articles": [self._process_polygon_article(article, ticker) for article in data.get("results", [])],
+                "next_url": url,
+            }
 
-            results["articles_by_ticker"][ticker] = processed_articles
-            results["tickers_processed"].append(ticker)
-            results["total_articles"] += len(processed_articles)
+    def _scrape_polygon_ticker(self, ticker: str, start_date: date, end_date: date, limit: int) -> Union[List[Dict], Dict]:
+        processed_articles = []
+        for page in self.iter_polygon_pages(ticker, start_date, end_date, limit=limit):
+            if "error" in page:
+                return {"error": page["error"]}
+            processed_articles.extend(page["articles"])
+        return processed_articles
+
+    def scrape_polygon(self, 
+                      tickers: List[str], 
+                      start_date: date, 
+                      end_date: Optional[date] = None, 
+                      limit: int = 1000,
+                      max_workers: Optional[int] = None) -> Dict:
+        """
+        Scrape Polygon.io API for news, several tickers in flight at once.
+        All pages are fetched for each ticker; limit is the page size (at most 1000).
+        """
+        if not self.polygon_api_url or not self.polygon_api_key:
+            return {"error": "POLYGON_API_URL or POLYGON_API_KEY not configured"}
 
-        return results
\ No newline at end of file
+        end_date = end_date or date.today()
+
+        return self._collect(
+            lambda ticker: self._scrape_polygon_ticker(ticker, start_date, end_date, limit),
+            [(ticker, ticker) for ticker in tickers],
+            max_workers=max_workers
+        )
@@ -1,61 +1,183 @@
 from transformers import AutoTokenizer, AutoModel, AutoModelForSequenceClassification, AutoModelForSeq2SeqLM
 import torch
-from typing import List
+from typing import Callable, List, Dict, Iterator, Optional, Tuple
+import logging
+import threading
 
 from app.config import settings
+from app.services.inference_cache import InferenceCache, get_inference_cache
 
 class NLPTasks:
-    semantic_model_name = "sentence-transformers/all-MiniLM-L6-v2"
-    semantic_tokenizer = AutoTokenizer.from_pretrained(semantic_model_name)
-    semantic_model = AutoModel.from_pretrained(semantic_model_name)
+    """
+    Inference helpers around MiniLM, FinBERT and BART-large.
 
+    Models are loaded on first use, not at import time, so processes that never run
+    inference (e.g. read-only API replicas) never hold the weights.
+    """
+    semantic_model_name = "sentence-transformers/all-MiniLM-L6-v2"
     sentiment_model_name = "ProsusAI/finbert"
-    sentiment_tokenizer = AutoTokenizer.from_pretrained(sentiment_model_name)
-    sentiment_model = AutoModelForSequenceClassification.from_pretrained(sentiment_model_name)
-    
     # BART-large for keyword generation (without pipeline)
     keyword_model_name = "facebook/bart-large"
-    keyword_tokenizer = AutoTokenizer.from_pretrained(keyword_model_name)
-    keyword_model = AutoModelForSeq2SeqLM.from_pretrained(keyword_model_name)
+
+    sentiment_labels = ["negative", "neutral", "positive"]
+
+    model_specs = {
+        "semantic": (semantic_model_name, AutoModel),
+        "sentiment": (sentiment_model_name, AutoModelForSequenceClassification),
+        "keyword": (keyword_model_name, AutoModelForSeq2SeqLM),
+    }
 
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    semantic_model.to(device)
-    sentiment_model.to(device)
-    keyword_model.to(device)
+
+    # Dynamic INT8 quantization of Linear layers only pays off on CPU; BART generation is left in FP32
+    quantizable_kinds = ("semantic", "sentiment")
+
+    _loaded_models: Dict[Tuple[str, bool], Tuple] = {}
+    _load_locks = {kind: threading.Lock() for kind in model_specs}
+
+    @staticmethod
+    def _use_int8(kind: str, quantized: Optional[bool] = None) -> bool:
+        quantized = settings.NLP_QUANTIZE_INT8 if quantized is None else quantized
+        return quantized and kind in NLPTasks.quantizable_kinds and NLPTasks.device.type == "cpu"
+
+    @staticmethod
+    def model_key(kind: str, task: str, quantized: Optional[bool] = None) -> str:
+        """Cache namespace for a task's outputs, distinct per model and precision"""
+        model_name = NLPTasks.model_specs[kind][0]
+        precision = ":int8" if NLPTasks._use_int8(kind, quantized) else ""
+        return f"{model_name}{precision}:{task}"
+
+    @staticmethod
+    def _load(kind: str, quantized: Optional[bool] = None) -> Tuple:
+        """Return (tokenizer, model) for a model kind, loading it once in a thread-safe way"""
+        key = (kind, NLPTasks._use_int8(kind, quantized))
+        loaded = NLPTasks._loaded_models.get(key)
+        if loaded is not None:
+            return loaded
+        with NLPTasks._load_locks[kind]:
+            # Another thread may have finished loading while we waited for the lock
+            loaded = NLPTasks._loaded_models.get(key)
+            if loaded is None:
+                model_name, model_class = NLPTasks.model_specs[kind]
+                logging.info(f"Loading {kind} model '{model_name}' on {NLPTasks.device}{' (int8)' if key[1] else ''}")
+                tokenizer = AutoTokenizer.from_pretrained(model_name)
+                model = model_class.from_pretrained(model_name)
+                model.to(NLPTasks.device)
+                model.eval()
+                if key[1]:
+                    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                loaded = (tokenizer, model)
+                NLPTasks._loaded_models[key] = loaded
+        return loaded
+
+    @staticmethod
+    def warm_up(kinds: Optional[List[str]] = None) -> List[str]:
+        """Eagerly load the given model kinds (all of them by default)"""
+        kinds = kinds or list(NLPTasks.model_specs)
+        for kind in kinds:
+            if kind not in NLPTasks.model_specs:
+                logging.warning(f"Unknown model kind '{kind}', skipping warm-up")
+                continue
+            NLPTasks._load(kind)
+        return [kind for kind in kinds if kind in NLPTasks.model_specs]
+
+    @staticmethod
+    def _length_batches(tokenizer,
+                        texts: List[str],
+                        max_length: Optional[int] = None,
+                        max_batch_size: Optional[int] = None,
+                        max_batch_tokens: Optional[int] = None) -> Iterator[Tuple[List[int], Dict[str, torch.Tensor]]]:
+        """Tokenize texts once and yield (indices, inputs) batches of similar token length"""
+        encodings = tokenizer(texts, truncation=True, max_length=max_length)
+        features = [{key: encodings[key][i] for key in encodings.keys()} for i in range(len(texts))]
+        return NLPTasks._feature_batches(tokenizer, features, max_batch_size, max_batch_tokens)
+
+    @staticmethod
+    def _feature_batches(tokenizer,
+                         features: List[Dict[str, List[int]]],
+                         max_batch_size: Optional[int] = None,
+                         max_batch_tokens: Optional[int] = None) -> Iterator[Tuple[List[int], Dict[str, torch.Tensor]]]:
+        """
+        Sort tokenized features by length and yield (indices, inputs) batches.
+
+        Each batch is padded only to its longest member and is closed when it reaches
+        max_batch_size texts or when its padded size would exceed max_batch_tokens.
+        """
+        max_batch_size = max_batch_size or settings.NLP_MAX_BATCH_SIZE
+        max_batch_tokens = max_batch_tokens or settings.NLP_MAX_BATCH_TOKENS
+        lengths = [len(feature["input_ids"]) for feature in features]
+        order = sorted(range(len(features)), key=lambda i: lengths[i])
+
+        def pad(indices: List[int]) -> Dict[str, torch.Tensor]:
+            inputs = tokenizer.pad([features[i] for i in indices], padding="longest", return_tensors="pt")
+            return {k: v.to(NLPTasks.device) for k, v in inputs.items()}
+
+        batch, longest = [], 0
+        for i in order:
+            padded_length = max(longest, lengths[i])
+            if batch and (len(batch) >= max_batch_size or padded_length * (len(batch) + 1) > max_batch_tokens):
+                yield batch, pad(batch)
+                batch, padded_length = [], lengths[i]
+            batch.append(i)
+            longest = padded_length
+        if batch:
+            yield batch, pad(batch)
+
+    @staticmethod
+    def _cached(model: str, texts: List[str], compute: Callable[[List[str]], List]) -> List:
+        """
+        Serve texts from the inference cache and run compute() only on the misses.
+
+        Texts that normalize to the same content are computed once, even within a batch.
+        """
+        if not texts:
+            return []
+        cache = get_inference_cache()
+        if cache is None:
+            return compute(texts)
+        keys = [InferenceCache.make_key(text, model) for text in texts]
+        results = cache.get_many(keys)
+        missing = {key: text for key, text in zip(keys, texts) if key not in results}
+        if missing:
+            computed = dict(zip(missing, compute(list(missing.values()))))
+            cache.set_many(model, computed)
+            results.update(computed)
+        return [results[key] for key in keys]
+
+    @staticmethod
+    def generate_semantic_embedding_batch(texts: List[str],
+                                          max_batch_size: Optional[int] = None,
+                                          max_batch_tokens: Optional[int] = None,
+                                          use_cache: bool = True,
+                                          quantized: Optional[bool] = None) -> List[List[float]]:
+        """Mean-pooled MiniLM embeddings for many texts, in input order"""
+        def compute(batch_texts: List[str]) -> List[List[float]]:
+            tokenizer, model = NLPTasks._load("semantic", quantized)
+            embeddings: List[Optional[List[float]]] = [None] * len(batch_texts)
+            for indices, inputs in NLPTasks._length_batches(tokenizer, batch_texts,
+                                                            max_batch_size=max_batch_size,
+                                                            max_batch_tokens=max_batch_tokens):
+                with torch.no_grad():
+                    outputs = model(**inputs)
+                # Mean over real tokens only, so padding does not change the embedding
+                mask = inputs["attention_mask"].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+                pooled = (outputs.last_hidden_state * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+                for i, embedding in zip(indices, pooled.tolist()):
+                    embeddings[i] = embedding
+            return embeddings
+
+        if not use_cache:
+            return compute(texts) if texts else []
+        return NLPTasks._cached(NLPTasks.model_key("semantic", "embedding", quantized), texts, compute)
 
     @staticmethod
     def generate_semantic_embedding(text: str) -> List[float]:
-        inputs = NLPTasks.semantic_tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-        inputs = {k: v.to(NLPTasks.device) for k, v in inputs.items()}
-        with torch.no_grad():
-            outputs = NLPTasks.semantic_model(**inputs)
-        embedding = outputs.last_hidden_state.mean(dim=1).squeeze().tolist()
-        return embedding
-
-    @staticmethod
-    def summarize_into_keywords(content: str, top_n=5) -> List[str]:
-        inputs = NLPTasks.keyword_tokenizer(
-            content,
-            return_tensors="pt",
-            truncation=True,
-            padding=True,
-            max_length=512
-        )
-        inputs = {k: v.to(NLPTasks.device) for k, v in inputs.items()}
-
-        with torch.no_grad():
-            summary_ids = NLPTasks.keyword_model.generate(
-                **inputs,
-                max_length=30,
-                min_length=10,
-                num_return_sequences=2,
-                do_sample=True
-            )
-
-        outputs = NLPTasks.keyword_tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
-        
+        return NLPTasks.generate_semantic_embedding_batch([text])[0]
+
+    @staticmethod
+    def _parse_keywords(generated_texts: List[str], top_n: int) -> List[str]:
         keywords = []
-        for generated_text in outputs:
+        for generated_text in generated_texts:
             generated_text = generated_text.strip()
             for delimiter in [',', ';', '-', '•']:
                 if delimiter in generated_text:
@@ -78,16 +200,143 @@ class NLPTasks:
                     break
         return unique_keywords[:top_n]
 
+    @staticmethod
+    def generate_keywords_batch(contents: List[str],
+                                top_n=5,
+                                max_batch_size: Optional[int] = None,
+                                max_batch_tokens: Optional[int] = None) -> List[List[str]]:
+        """BART keyword generation for many texts, in input order (sampled, not deterministic)"""
+        num_return_sequences = 2
+
+        def compute(batch_contents: List[str]) -> List[List[str]]:
+            tokenizer, model = NLPTasks._load("keyword")
+            keywords: List[Optional[List[str]]] = [None] * len(batch_contents)
+            for indices, inputs in NLPTasks._length_batches(tokenizer, batch_contents,
+                                                            max_length=512,
+                                                            max_batch_size=max_batch_size,
+                                                            max_batch_tokens=max_batch_tokens):
+                with torch.no_grad():
+                    summary_ids = model.generate(
+                        **inputs,
+                        max_length=30,
+                        min_length=10,
+                        num_return_sequences=num_return_sequences,
+                        do_sample=True
+                    )
+                outputs = tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+                # generate() returns num_return_sequences consecutive rows per input
+                for position, i in enumerate(indices):
+                    start = position * num_return_sequences
+                    keywords[i] = NLPTasks._parse_keywords(outputs[start:start + num_return_sequences], top_n)
+            return keywords
+
+        return NLPTasks._cached(NLPTasks.model_key("keyword", f"keywords:{top_n}"), contents, compute)
+
+    @staticmethod
+    def summarize_into_keywords_batch(contents: List[str],
+                                      top_n=5,
+                                      backend: Optional[str] = None,
+                                      document_embeddings: Optional[List[List[float]]] = None) -> List[List[str]]:
+        """
+        Keywords for many texts with the configured backend (KEYWORD_BACKEND by default).
+
+        document_embeddings, when already computed by generate_semantic_embedding_batch,
+        are reused by the extractive backend instead of embedding the texts again.
+        """
+        from app.services.keyword_extraction import get_keyword_backend
+        keyword_backend = get_keyword_backend(backend or settings.KEYWORD_BACKEND)
+        return keyword_backend.extract(contents, top_n=top_n, document_embeddings=document_embeddings)
+
+    @staticmethod
+    def summarize_into_keywords(content: str, top_n=5, backend: Optional[str] = None) -> List[str]:
+        return NLPTasks.summarize_into_keywords_batch([content], top_n=top_n, backend=backend)[0]
+
+    @staticmethod
+    def _sentiment_windows(tokenizer, content_ids: List[int]) -> List[Dict[str, List[int]]]:
+        """Split a tokenized document into overlapping windows that fit FinBERT's input size"""
+        # BERT position embeddings cap inputs at 512 tokens whatever the tokenizer config says
+        window_size = min(tokenizer.model_max_length, 512) - tokenizer.num_special_tokens_to_add()
+        stride = min(settings.SENTIMENT_WINDOW_STRIDE, window_size)
+        windows = []
+        start = 0
+        while True:
+            window_ids = content_ids[start:start + window_size]
+            windows.append({
+                "input_ids": tokenizer.build_inputs_with_special_tokens(window_ids),
+                "token_type_ids": tokenizer.create_token_type_ids_from_sequences(window_ids),
+                "attention_mask": [1] * (len(window_ids) + tokenizer.num_special_tokens_to_add()),
+            })
+            start += stride
+            if start + window_size - stride >= len(content_ids) or len(windows) >= settings.SENTIMENT_MAX_WINDOWS:
+                break
+        return windows
+
+    @staticmethod
+    def analyze_sentiment_batch(contents: List[str],
+                                max_batch_size: Optional[int] = None,
+                                max_batch_tokens: Optional[int] = None,
+                                chunked: Optional[bool] = None,
+                                use_cache: bool = True,
+                                quantized: Optional[bool] = None) -> List[dict]:
+        """
+        FinBERT label probabilities for many texts, in input order.
+
+        With chunked (SENTIMENT_CHUNKING by default), documents longer than FinBERT's
+        512-token limit are split into overlapping windows instead of being truncated.
+        The windows of all documents are scored in shared batches, and each document
+        score is the token-count-weighted mean of its window probabilities.
+        """
+        chunked = settings.SENTIMENT_CHUNKING if chunked is None else chunked
+
+        def to_scores(row: List[float]) -> dict:
+            return {label: float(row[j]) for j, label in enumerate(NLPTasks.sentiment_labels)}
+
+        def compute(batch_contents: List[str]) -> List[dict]:
+            tokenizer, model = NLPTasks._load("sentiment", quantized)
+            scores: List[Optional[dict]] = [None] * len(batch_contents)
+            for indices, inputs in NLPTasks._length_batches(tokenizer, batch_contents,
+                                                            max_batch_size=max_batch_size,
+                                                            max_batch_tokens=max_batch_tokens):
+                with torch.no_grad():
+                    outputs = model(**inputs)
+                probs = torch.nn.functional.softmax(outputs.logits, dim=-1).tolist()
+                for i, row in zip(indices, probs):
+                    scores[i] = to_scores(row)
+            return scores
+
+        def compute_chunked(batch_contents: List[str]) -> List[dict]:
+            tokenizer, model = NLPTasks._load("sentiment", quantized)
+            content_ids = tokenizer(batch_contents, add_special_tokens=False, verbose=False)["input_ids"]
+            windows, owners = [], []
+            for doc_index, ids in enumerate(content_ids):
+                for window in NLPTasks._sentiment_windows(tokenizer, ids):
+                    windows.append(window)
+                    owners.append(doc_index)
+
+            weighted = torch.zeros(len(batch_contents), len(NLPTasks.sentiment_labels))
+            weights = torch.zeros(len(batch_contents))
+            for indices, inputs in NLPTasks._feature_batches(tokenizer, windows, max_batch_size, max_batch_tokens):
+                with torch.no_grad():
+                    outputs = model(**inputs)
+                probs = torch.nn.functional.softmax(outputs.logits, dim=-1).cpu()
+                window_owners = torch.tensor([owners[i] for i in indices])
+                window_lengths = inputs["attention_mask"].sum(dim=1).cpu().to(probs.dtype)
+                weighted.index_add_(0, window_owners, probs * window_lengths.unsqueeze(-1))
+                weights.index_add_(0, window_owners, window_lengths)
+            combined = weighted / weights.clamp(min=1).unsqueeze(-1)
+            return [to_scores(row) for row in combined.tolist()]
+
+        if chunked:
+            task, compute = f"sentiment-chunked:{settings.SENTIMENT_WINDOW_STRIDE}", compute_chunked
+        else:
+            task = "sentiment"
+        if not use_cache:
+            return compute(contents) if contents else []
+        return NLPTasks._cached(NLPTasks.model_key("sentiment", task, quantized), contents, compute)
+
     @staticmethod
     def analyze_sentiment(content: str) -> dict:
-        inputs = NLPTasks.sentiment_tokenizer(content, return_tensors="pt", truncation=True, padding=True)
-        inputs = {k: v.to(NLPTasks.device) for k, v in inputs.items()}
-        with torch.no_grad():
-            outputs = NLPTasks.sentiment_model(**inputs)
-        probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
-        labels = ["negative", "neutral", "positive"]
-        scores = {label: float(probs[0][i]) for i, label in enumerate(labels)}
-        return scores
+        return NLPTasks.analyze_sentiment_batch([content])[0]
 
     @staticmethod
     def classify_sentiment(scores: dict) -> str:
@@ -20,7 +20,13 @@ class PriceScraper:
         if start_date is None:
             start_date = "2000-01-01"
         df = yf.download(ticker_list, start=start_date, end=end_date, auto_adjust=True, interval=interval)
-        price_data = {ticker: df.xs(ticker, level=1, axis=1) for ticker in ticker_list}
+        if df.empty:
+            return {}
+        if not isinstance(df.columns, pd.MultiIndex):
+            # Older yfinance versions return flat columns for a single ticker
+            df = pd.concat({ticker_list[0]: df}, axis=1).swaplevel(0, 1, axis=1)
+        available = set(df.columns.get_level_values(1))
+        price_data = {ticker: df.xs(ticker, level=1, axis=1) for ticker in ticker_list if ticker in available}
         return price_data
     
 
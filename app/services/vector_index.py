@@ -0,0 +1,336 @@
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from pymongo import ASCENDING
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within a process
+    fcntl = None
+
+from app.config import settings
+from app.models import news_collection, company_collection
+
+EPOCH = date(1970, 1, 1)
+NO_DATE = np.iinfo(np.int32).min
+
+
+def to_day(value) -> int:
+    """Days since epoch for a date/datetime/ISO string, NO_DATE when unknown"""
+    if value is None:
+        return NO_DATE
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - EPOCH).days
+
+
+class VectorIndex:
+    """
+    Append-only cosine-similarity index stored as flat binary files and read through np.memmap.
+
+    Vectors are L2-normalized float32 rows, so a search is one matrix-vector product over
+    the (optionally ticker/date filtered) rows followed by an argpartition for the top k.
+    Each row carries an id, a ticker and a publication day so results can be filtered
+    without touching Mongo, and a live flag: appending an id again (an article re-embedded
+    after its text changed) clears the flag of its earlier row, which searches then skip.
+
+    Writers (sync_news, sync_companies) hold exclusive(), a lock file shared across
+    processes. Readers reopen the files when state.json changes (refresh), so every worker
+    sees what another process appended.
+    """
+
+    id_dtype = np.dtype("S24")
+    ticker_dtype = np.dtype("S16")
+    day_dtype = np.dtype(np.int32)
+    live_dtype = np.dtype(np.uint8)
+    columns = ("vectors.f32", "ids.bin", "tickers.bin", "days.bin", "live.bin")
+    search_block_rows = 1 << 18
+
+    def __init__(self, directory: str, dim: int = 384):
+        self.directory = directory
+        self.dim = dim
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self.state = self._read_state()
+        self._open()
+        if len(self) and not os.path.exists(self._path("live.bin")):
+            self._write_live_flags()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_state(self) -> Dict:
+        try:
+            with open(self._path("state.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"count": 0, "dim": self.dim, "synced_until": None}
+
+    def _write_state(self):
+        tmp_path = self._path("state.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self._path("state.json"))
+
+    def _state_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self._path("state.json"))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _memmap(self, name: str, dtype: np.dtype, shape: Tuple[int, ...]) -> np.ndarray:
+        if self.state["count"] == 0 or not os.path.exists(self._path(name)):
+            return np.ones(shape, dtype=dtype) if name == "live.bin" else np.empty(shape, dtype=dtype)
+        return np.memmap(self._path(name), dtype=dtype, mode="r", shape=shape)
+
+    def _open(self):
+        # Files may hold a partially written tail after a crash; state.json's count is authoritative
+        count = self.state["count"]
+        self.vectors = self._memmap("vectors.f32", np.dtype(np.float32), (count, self.dim))
+        self.ids = self._memmap("ids.bin", self.id_dtype, (count,))
+        self.tickers = self._memmap("tickers.bin", self.ticker_dtype, (count,))
+        self.days = self._memmap("days.bin", self.day_dtype, (count,))
+        self.live = self._memmap("live.bin", self.live_dtype, (count,))
+        self._version = self._state_version()
+        # Row of each id, built on the first append of this process and kept up to date by it
+        self._positions: Optional[Dict[bytes, int]] = None
+
+    def _write_live_flags(self):
+        """One-off for indexes written before live flags: keep the last row of each id"""
+        with self.exclusive():
+            if os.path.exists(self._path("live.bin")):
+                return
+            ids = np.asarray(self.ids)
+            _, from_end = np.unique(ids[::-1], return_index=True)
+            live = np.zeros(len(ids), dtype=self.live_dtype)
+            live[len(ids) - 1 - from_end] = 1
+            live.tofile(self._path("live.bin"))
+            self._open()
+
+    def refresh(self):
+        """Reopen the files if another process changed the index since they were opened"""
+        if self._state_version() != self._version:
+            with self._lock:
+                self.state = self._read_state()
+                self._open()
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the index for writing, across threads and processes, with the latest state loaded"""
+        with self._lock:
+            with open(self._path("lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self.refresh()
+                    yield self
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        return self.state["count"]
+
+    def reset(self):
+        with self._lock:
+            for name in self.columns:
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self.state = {"count": 0, "dim": self.dim, "synced_until": None}
+            self._write_state()
+            self._open()
+
+    def append(self, rows: Iterable[Tuple[str, Optional[str], int, List[float]]], synced_until: Optional[str] = None) -> int:
+        """
+        Append (id, ticker, day, vector) rows and advance the sync watermark, clearing the
+        live flag of earlier rows with the same id. Callers hold exclusive().
+        """
+        rows = [row for row in rows if row[3] is not None and len(row[3]) == self.dim]
+        with self._lock:
+            count = self.state["count"]
+            positions = self._positions
+            if rows:
+                if positions is None:
+                    positions = {key: position for position, key in enumerate(np.asarray(self.ids).tolist())}
+                keys = [str(row[0]).encode() for row in rows]
+                live = np.ones(len(rows), dtype=self.live_dtype)
+                superseded = []
+                for offset, key in enumerate(keys):
+                    previous = positions.get(key)
+                    if previous is not None and previous >= count:
+                        live[previous - count] = 0  # Repeated within this batch
+                    elif previous is not None:
+                        superseded.append(previous)
+                    positions[key] = count + offset
+
+                vectors = np.asarray([row[3] for row in rows], dtype=np.float32)
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                vectors /= np.where(norms == 0, 1, norms)
+                columns = {
+                    "vectors.f32": vectors,
+                    "ids.bin": np.asarray(keys, dtype=self.id_dtype),
+                    "tickers.bin": np.asarray([(row[1] or "").encode() for row in rows], dtype=self.ticker_dtype),
+                    "days.bin": np.asarray([row[2] for row in rows], dtype=self.day_dtype),
+                    "live.bin": live,
+                }
+                for name, values in columns.items():
+                    row_bytes = values.itemsize * (self.dim if name == "vectors.f32" else 1)
+                    with open(self._path(name), "ab") as f:
+                        # Drop any tail left by an interrupted append before writing
+                        f.truncate(count * row_bytes)
+                        f.write(values.tobytes())
+                if superseded:
+                    flags = np.memmap(self._path("live.bin"), dtype=self.live_dtype, mode="r+", shape=(count,))
+                    flags[superseded] = 0
+                    flags.flush()
+                    del flags
+                self.state["count"] = count + len(rows)
+            if synced_until is not None:
+                self.state["synced_until"] = synced_until
+            self._write_state()
+            self._open()
+            self._positions = positions
+        return len(rows)
+
+    def search(self,
+               query: List[float],
+               k: int = 10,
+               ticker: Optional[str] = None,
+               start_date: Optional[date] = None,
+               end_date: Optional[date] = None,
+               exclude_id: Optional[str] = None) -> List[Dict]:
+        """Top-k live rows by cosine similarity, optionally restricted to a ticker and a date range"""
+        vectors, ids, tickers, days, live = self.vectors, self.ids, self.tickers, self.days, self.live
+        if len(ids) == 0:
+            return []
+        q = np.asarray(query, dtype=np.float32)
+        q /= np.linalg.norm(q) or 1.0
+
+        mask = None
+        if ticker:
+            mask = tickers == ticker.encode()
+        if start_date:
+            day_mask = days >= to_day(start_date)
+            mask = day_mask if mask is None else mask & day_mask
+        if end_date:
+            day_mask = (days <= to_day(end_date)) & (days != NO_DATE)
+            mask = day_mask if mask is None else mask & day_mask
+        if exclude_id:
+            id_mask = ids != str(exclude_id).encode()
+            mask = id_mask if mask is None else mask & id_mask
+
+        if mask is None:
+            rows = None
+            scores = np.concatenate([
+                vectors[start:start + self.search_block_rows] @ q
+                for start in range(0, len(vectors), self.search_block_rows)
+            ])
+            dead = np.asarray(live) == 0
+            scores[dead] = -np.inf
+            available = len(scores) - int(np.count_nonzero(dead))
+        else:
+            rows = np.flatnonzero(mask & (np.asarray(live) != 0))
+            scores = np.asarray(vectors[rows]) @ q
+            available = len(scores)
+        if available == 0:
+            return []
+
+        k = min(k, available)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        positions = top if rows is None else rows[top]
+        return [
+            {
+                "id": ids[p].decode(),
+                "ticker": tickers[p].decode() or None,
+                "date": date.fromordinal(EPOCH.toordinal() + int(days[p])) if days[p] != NO_DATE else None,
+                "score": float(scores[i]),
+            }
+            for i, p in zip(top, positions)
+        ]
+
+
+class EmbeddingIndexes:
+    """News and company indexes under VECTOR_INDEX_DIR, kept in sync with Mongo"""
+
+    _news: Optional[VectorIndex] = None
+    _companies: Optional[VectorIndex] = None
+    _sync_lock = threading.Lock()
+
+    @staticmethod
+    def news() -> VectorIndex:
+        if EmbeddingIndexes._news is None:
+            EmbeddingIndexes._news = VectorIndex(os.path.join(settings.VECTOR_INDEX_DIR, "news"))
+        EmbeddingIndexes._news.refresh()
+        return EmbeddingIndexes._news
+
+    @staticmethod
+    def companies() -> VectorIndex:
+        if EmbeddingIndexes._companies is None:
+            EmbeddingIndexes._companies = VectorIndex(os.path.join(settings.VECTOR_INDEX_DIR, "companies"))
+        EmbeddingIndexes._companies.refresh()
+        return EmbeddingIndexes._companies
+
+    @staticmethod
+    def sync_news(full: bool = False, batch_size: int = 5000) -> int:
+        """
+        Append articles embedded since the last sync, ordered by sentiment.updated_at.
+        A re-embedded article gets a new row that supersedes its old one. Rows of articles
+        since deleted from Mongo stay until a rebuild; with full=True the index is dropped
+        and rebuilt from scratch.
+        """
+        index = EmbeddingIndexes.news()
+        with EmbeddingIndexes._sync_lock, index.exclusive():
+            if full:
+                index.reset()
+            # Leave a settle margin so chunks still being bulk-written are picked up next time
+            updated_at = {"$ne": None, "$lte": datetime.utcnow() - timedelta(minutes=1)}
+            if index.state["synced_until"]:
+                updated_at["$gt"] = datetime.fromisoformat(index.state["synced_until"])
+            cursor = news_collection.find(
+                {"embedding": {"$ne": None}, "sentiment.updated_at": updated_at},
+                {"embedding": 1, "ticker": 1, "published_at": 1, "sentiment.updated_at": 1}
+            ).sort("sentiment.updated_at", ASCENDING).batch_size(batch_size)
+
+            # The watermark only advances once the whole cursor is consumed: an interrupted
+            # sync re-appends some rows rather than skipping articles sharing a timestamp
+            added, rows, watermark = 0, [], None
+            for doc in cursor:
+                rows.append((str(doc["_id"]), doc.get("ticker"), to_day(doc.get("published_at")), doc["embedding"]))
+                watermark = doc["sentiment"]["updated_at"]
+                if len(rows) >= batch_size:
+                    added += index.append(rows)
+                    rows = []
+            added += index.append(rows, synced_until=watermark.isoformat() if watermark else None)
+        logging.info(f"News vector index synced: {added} new vectors, {len(index)} total")
+        return added
+
+    @staticmethod
+    def sync_companies() -> int:
+        """Rebuild the (small) company index from company_collection"""
+        index = EmbeddingIndexes.companies()
+        with EmbeddingIndexes._sync_lock, index.exclusive():
+            index.reset()
+            rows = [
+                (doc["symbol"], doc["symbol"], NO_DATE, doc["embedding"])
+                for doc in company_collection.find({"embedding": {"$ne": None}}, {"symbol": 1, "embedding": 1})
+            ]
+            added = index.append(rows)
+        logging.info(f"Company vector index rebuilt with {added} vectors")
+        return added
+
+    @staticmethod
+    def sync(full: bool = False) -> Dict:
+        """Sync both indexes; run as a background job at startup and from POST /search/sync_index"""
+        added = EmbeddingIndexes.sync_news(full=full)
+        companies = EmbeddingIndexes.sync_companies()
+        return {"news_added": added, "news_total": len(EmbeddingIndexes.news()), "companies_total": companies}
@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.correlation_engine import (
+    daily_changes, fold_changes, observation_sums, rolling_correlations, unfold_changes
+)
+
+WINDOWS = [0, 5, 20]
+
+
+def observations(days: int, seed: int = 0, ticker: str = "AAA") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=days)
+    return pd.DataFrame({
+        "ticker": ticker,
+        "date": [date(2020, 1, 1) + timedelta(days=day) for day in range(days)],
+        "x": x,
+        "y": 0.3 * x + rng.normal(size=days) * 0.01,
+    })
+
+
+def folded(history: pd.DataFrame, new: pd.DataFrame, buffer: int):
+    """Fold new observations onto the running state of history"""
+    sums = observation_sums(history)
+    return fold_changes(len(history), sums, history.tail(buffer), new, WINDOWS)
+
+
+def assert_same(actual: pd.DataFrame, expected: pd.DataFrame):
+    key = ["ticker", "date", "window_size"]
+    merged = expected.merge(actual, on=key, how="outer", suffixes=("_expected", "_actual"), indicator=True)
+    assert (merged["_merge"] == "both").all()
+    np.testing.assert_allclose(merged["correlation_coefficient_actual"],
+                               merged["correlation_coefficient_expected"], atol=1e-9)
+
+
+def test_daily_changes_between_common_dates():
+    day = [date(2024, 1, d) for d in range(1, 8)]
+    sentiment = pd.DataFrame({
+        "ticker": ["BBB", "AAA", "AAA", "AAA", "AAA", "BBB", "AAA"],
+        "date": [day[0], day[3], day[0], day[1], day[4], day[1], day[6]],
+        "sentiment_score": [0.5, 0.4, 0.1, 0.3, -0.2, 0.7, 0.0],
+    })
+    prices = pd.DataFrame({
+        "ticker": ["AAA"] * 5 + ["BBB"] * 2,
+        "date": [day[0], day[1], day[3], day[4], day[5], day[0], day[1]],
+        "close_price": [100.0, 0.0, 50.0, 55.0, 60.0, 20.0, 21.0],
+    })
+
+    changes = daily_changes(sentiment, prices)
+
+    # AAA has common dates Jan 1, 2, 4 and 5: Jan 1 has no predecessor and Jan 4 follows a 0 close
+    assert list(changes["ticker"]) == ["AAA", "AAA", "BBB"]
+    assert list(changes["date"]) == [day[1], day[4], day[1]]
+    np.testing.assert_allclose(changes["x"], [0.3 - 0.1, -0.2 - 0.4, 0.7 - 0.5])
+    np.testing.assert_allclose(changes["y"], [-1.0, 0.1, 0.05])
+
+
+def test_rolling_correlations_match_pandas():
+    changes = pd.concat([observations(90, seed=1, ticker="AAA"), observations(7, seed=2, ticker="BBB"),
+                         observations(40, seed=3, ticker="CCC")], ignore_index=True)
+    # Large offsets would break naive uncentered sums
+    changes["x"] = changes["x"] + 1e4
+
+    actual = rolling_correlations(changes, WINDOWS)
+
+    frames = []
+    for ticker, group in changes.groupby("ticker"):
+        for window in WINDOWS:
+            rolling = group["x"].expanding(2) if window == 0 else group["x"].rolling(window)
+            frames.append(pd.DataFrame({
+                "ticker": ticker,
+                "date": group["date"],
+                "window_size": window,
+                "correlation_coefficient": rolling.corr(group["y"]),
+            }).dropna())
+    expected = pd.concat(frames, ignore_index=True)
+    assert_same(actual, expected)
+    assert actual["window_size"].dtype.kind == "i"
+
+
+def test_rolling_correlations_without_variance_are_zero():
+    changes = observations(10).assign(x=1.0)
+    correlations = rolling_correlations(changes, [0, 5])
+    assert len(correlations) == 9 + 6
+    assert (correlations["correlation_coefficient"] == 0).all()
+    assert rolling_correlations(changes.iloc[0:0], WINDOWS).empty
+
+
+@pytest.mark.parametrize("split", [0, 1, 3, 19, 60, 119])
+def test_fold_matches_full_computation(split):
+    changes = observations(120)
+    history, new = changes.iloc[:split], changes.iloc[split:]
+    correlations, n, sums = folded(history, new, buffer=max(WINDOWS) - 1)
+
+    expected = rolling_correlations(changes, WINDOWS)
+    assert_same(correlations, expected[expected["date"].isin(set(new["date"]))])
+    assert n == len(changes)
+    for name, value in observation_sums(changes).items():
+        assert sums[name] == pytest.approx(value, rel=1e-12, abs=1e-12)
+
+
+def test_fold_without_new_observations_keeps_state():
+    changes = observations(30)
+    correlations, n, sums = folded(changes, changes.iloc[0:0], buffer=20)
+    assert correlations.empty
+    assert n == 30
+    assert sums == observation_sums(changes)
+
+
+@pytest.mark.parametrize("revised", [1, 4, 19])
+def test_unfold_then_fold_revises_recent_observations(revised):
+    changes = observations(200)
+    n, sums = len(changes), observation_sums(changes)
+
+    # Revise the last `revised` observations: take them out, fold the new values in
+    revision = changes.iloc[-revised:].assign(x=lambda frame: frame["x"] + 1.0)
+    n, sums = unfold_changes(n, sums, changes.iloc[-revised:])
+    kept = changes.iloc[:-revised]
+    correlations, n, sums = fold_changes(n, sums, kept.tail(max(WINDOWS) - 1), revision, WINDOWS)
+
+    updated = pd.concat([kept, revision], ignore_index=True)
+    expected = rolling_correlations(updated, WINDOWS)
+    assert_same(correlations, expected[expected["date"].isin(set(revision["date"]))])
+    assert n == len(updated)
+    for name, value in observation_sums(updated).items():
+        assert sums[name] == pytest.approx(value, rel=1e-9, abs=1e-9)
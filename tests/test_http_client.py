@@ -0,0 +1,140 @@
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.config import settings
+from app.services.http_client import HttpClient
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers each path with the next (status, headers) of its script, 200 once it runs out"""
+
+    def do_GET(self):
+        script = self.server.scripts.get(self.path.split("?")[0], [])
+        self.server.hits.append(self.path)
+        status, headers = script.pop(0) if script else (200, {})
+        body = b'{"ok": true}'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+    httpd.scripts, httpd.hits = {}, []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url(httpd, path: str) -> str:
+    return f"http://127.0.0.1:{httpd.server_address[1]}{path}"
+
+
+def endpoint(httpd, path: str) -> str:
+    return f"127.0.0.1:{httpd.server_address[1]}{path}"
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.calls = 0
+
+    def wait_if_needed(self):
+        self.calls += 1
+
+
+def client(max_retries: int = 3):
+    sleeps = []
+    return HttpClient("test", max_retries=max_retries, backoff_base=0.5, backoff_max=4, timeout=5,
+                      sleep=sleeps.append), sleeps
+
+
+def test_retries_until_success(server):
+    server.scripts["/flaky"] = [(503, {}), (502, {}), (200, {})]
+    http, sleeps = client()
+    limiter = CountingLimiter()
+
+    response = http.get(url(server, "/flaky"), params={"q": "x"}, rate_limiter=limiter)
+
+    assert response.json() == {"ok": True}
+    assert len(server.hits) == 3
+    assert limiter.calls == 3  # every attempt is charged to the rate limiter
+    # Full-jitter backoff: attempt n waits at most min(backoff_max, base * 2 ** n)
+    assert len(sleeps) == 2 and 0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0
+    stats = http.metrics()[endpoint(server, "/flaky")]
+    assert (stats["requests"], stats["retries"], stats["errors"]) == (3, 2, 0)
+    assert stats["latency_avg_ms"] is not None and stats["latency_max_ms"] >= stats["latency_avg_ms"]
+
+
+def test_retry_after_seconds_and_date(server):
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    server.scripts["/limited"] = [(429, {"Retry-After": "7"}), (429, {"Retry-After": later}), (200, {})]
+    http, sleeps = client()
+
+    http.get(url(server, "/limited"))
+
+    assert sleeps[0] == 7
+    assert 25 <= sleeps[1] <= 30
+
+
+def test_retry_after_is_capped(server):
+    server.scripts["/limited"] = [(429, {"Retry-After": str(settings.HTTP_RETRY_AFTER_MAX * 10)}), (200, {})]
+    http, sleeps = client()
+
+    http.get(url(server, "/limited"))
+
+    assert sleeps == [settings.HTTP_RETRY_AFTER_MAX]
+
+
+def test_gives_up_with_last_error(server):
+    server.scripts["/down"] = [(500, {})] * 10
+    http, sleeps = client(max_retries=2)
+
+    with pytest.raises(requests.HTTPError) as raised:
+        http.get(url(server, "/down"))
+
+    assert raised.value.response.status_code == 500
+    assert len(server.hits) == 3 and len(sleeps) == 2
+    stats = http.metrics()[endpoint(server, "/down")]
+    assert (stats["requests"], stats["retries"], stats["errors"]) == (3, 2, 1)
+
+
+def test_client_errors_are_not_retried(server):
+    server.scripts["/missing"] = [(404, {})]
+    http, sleeps = client()
+
+    with pytest.raises(requests.HTTPError) as raised:
+        http.get(url(server, "/missing"))
+
+    assert raised.value.response.status_code == 404
+    assert len(server.hits) == 1 and sleeps == []
+    stats = http.metrics()[endpoint(server, "/missing")]
+    assert (stats["requests"], stats["retries"], stats["errors"]) == (1, 0, 1)
+
+
+def test_connection_errors_are_retried():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]  # Nothing listens once the socket is closed
+    http, sleeps = client(max_retries=2)
+
+    with pytest.raises(requests.ConnectionError):
+        http.get(f"http://127.0.0.1:{port}/gone")
+
+    assert len(sleeps) == 2
+    stats = http.metrics()[f"127.0.0.1:{port}/gone"]
+    assert (stats["requests"], stats["retries"], stats["errors"]) == (3, 2, 1)
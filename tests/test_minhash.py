@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.services.minhash import MinHasher
+
+
+def random_words(rng: random.Random, count: int):
+    return [f"w{rng.randrange(10 ** 9)}" for _ in range(count)]
+
+
+def jaccard(hasher: MinHasher, first: str, second: str) -> float:
+    a, b = hasher.shingles(first), hasher.shingles(second)
+    return len(a & b) / len(a | b)
+
+
+@pytest.mark.parametrize("overlap", [0, 50, 100, 150, 190])
+def test_similarity_estimates_jaccard(overlap):
+    hasher = MinHasher()
+    rng = random.Random(overlap)
+    errors = []
+    for _ in range(30):
+        words = random_words(rng, 400 - overlap)
+        first, second = " ".join(words[:200]), " ".join(words[200 - overlap:])
+        estimate = hasher.similarity(hasher.signature(first), hasher.signature(second))
+        errors.append(estimate - jaccard(hasher, first, second))
+    # 128 permutations: the standard error is at most 0.045
+    assert abs(np.mean(errors)) < 0.03
+    assert max(abs(error) for error in errors) < 0.2
+
+
+def test_permutations_pick_different_shingles():
+    hasher = MinHasher()
+    shingles = sorted(hasher.shingles(" ".join(random_words(random.Random(0), 300))))
+    signatures = np.stack([hasher.signature(shingle) for shingle in shingles])
+    # For each permutation, the shingle holding the minimum
+    assert len(set(signatures.argmin(axis=0).tolist())) > 64
+
+
+def test_similarity_of_identical_and_disjoint_texts():
+    hasher = MinHasher()
+    rng = random.Random(1)
+    text = " ".join(random_words(rng, 100))
+    assert hasher.similarity(hasher.signature(text), hasher.signature(text)) == 1.0
+    other = " ".join(random_words(rng, 100))
+    assert hasher.similarity(hasher.signature(text), hasher.signature(other)) < 0.1
+
+
+def test_signature_is_deterministic_and_banded():
+    text = "Total reports record quarterly profit on higher refining margins"
+    first, second = MinHasher(), MinHasher()
+    assert np.array_equal(first.signature(text), second.signature(text))
+    assert len(first.band_keys(first.signature(text))) == first.bands
+    assert first.signature("") is None